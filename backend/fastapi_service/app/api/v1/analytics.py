@@ -1,22 +1,58 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.api.v1.params import CountryCodeParam, IndicatorCodeParam, OptionalYearParam, YearParam
+from app.api.v1.params import (
+    MAX_SAFE_YEAR,
+    BootstrapParam,
+    ConfidenceParam,
+    CountryCodeParam,
+    FillParam,
+    IndicatorCodeParam,
+    OptionalYearParam,
+    YearParam,
+    fill_method,
+    split_country_codes,
+    split_indicator_codes,
+)
 from app.db import get_db
 from app.deps import require_agreement
 from app.schemas import (
     ChartExplainRequest,
     ChartExplainResponse,
+    CorrelationMatrixResponse,
     CorrelationResponse,
+    CrossSectionCorrelationResponse,
     GiniResponse,
+    LagCorrelationResponse,
     LorenzResponse,
+    Mover,
+    MoversResponse,
+    RollingCorrelationResponse,
+    SimilarCountriesResponse,
+    SimilarCountry,
 )
 from app.services.analytics import get_lorenz_segments, get_or_create_lorenz_result
 from app.services.chart_explainer import explain_chart as explain_chart_service
-from app.services.correlation import correlation_for_country
+from app.services.chart_explainer import explain_chart_stream as explain_chart_stream_service
+from app.services.correlation import (
+    correlation_for_country,
+    correlation_matrix,
+    cross_section_correlation,
+    lagged_correlation_for_country,
+    rolling_correlation_for_country,
+)
+from app.services.movers import top_movers
+from app.services.similarity import feature_index, nearest_countries
 
 router = APIRouter(tags=["analytics"])
 
+MATRIX_MAX_COUNTRIES = 25
+MATRIX_MAX_INDICATORS = 20
+SIMILAR_MAX_INDICATORS = 20
+
 
 @router.get("/lorenz", response_model=LorenzResponse)
 def lorenz_curve(
@@ -59,20 +95,196 @@ def correlation(
     indicator_b: IndicatorCodeParam,
     start_year: OptionalYearParam = None,
     end_year: OptionalYearParam = None,
+    confidence: ConfidenceParam = 0.95,
+    bootstrap: BootstrapParam = 0,
+    fill: FillParam = "none",
     db: Session = Depends(get_db),
     _: dict = Depends(require_agreement),
 ):
     if start_year is not None and end_year is not None and start_year > end_year:
         raise HTTPException(status_code=400, detail="start_year must be <= end_year")
-    result = correlation_for_country(db, country, indicator_a, indicator_b, start_year, end_year)
+    result = correlation_for_country(
+        db, country, indicator_a, indicator_b, start_year, end_year, confidence, bootstrap, fill_method(fill)
+    )
     if not result:
         raise HTTPException(status_code=404, detail="Correlation not available")
     return CorrelationResponse(**result)
 
 
+@router.get("/correlation/matrix", response_model=list[CorrelationMatrixResponse])
+def correlation_matrix_view(
+    countries: str = Query(..., description="Comma-separated country codes, e.g. KZ,RU,US"),
+    indicators: str = Query(..., description="Comma-separated indicator codes"),
+    start_year: OptionalYearParam = None,
+    end_year: OptionalYearParam = None,
+    confidence: ConfidenceParam = 0.95,
+    db: Session = Depends(get_db),
+    _: dict = Depends(require_agreement),
+):
+    if start_year is not None and end_year is not None and start_year > end_year:
+        raise HTTPException(status_code=400, detail="start_year must be <= end_year")
+    country_codes = split_country_codes(countries, MATRIX_MAX_COUNTRIES)
+    indicator_codes = split_indicator_codes(indicators, MATRIX_MAX_INDICATORS)
+    if len(indicator_codes) < 2:
+        raise HTTPException(status_code=400, detail="At least two indicators are required")
+    results = correlation_matrix(db, country_codes, indicator_codes, start_year, end_year, confidence)
+    return [CorrelationMatrixResponse(**item) for item in results]
+
+
+@router.get("/correlation/cross-section", response_model=CrossSectionCorrelationResponse)
+def correlation_cross_section(
+    indicator_a: IndicatorCodeParam,
+    indicator_b: IndicatorCodeParam,
+    year: YearParam,
+    tolerance: int = Query(0, ge=0, le=5, description="Use the nearest year within ±tolerance when a value is missing."),
+    include_points: bool = Query(False, description="Return the scatter points per country."),
+    confidence: ConfidenceParam = 0.95,
+    bootstrap: BootstrapParam = 0,
+    db: Session = Depends(get_db),
+    _: dict = Depends(require_agreement),
+):
+    result = cross_section_correlation(
+        db, indicator_a, indicator_b, year, tolerance, include_points, confidence, bootstrap
+    )
+    return CrossSectionCorrelationResponse(**result)
+
+
+@router.get("/correlation/rolling", response_model=RollingCorrelationResponse)
+def correlation_rolling(
+    country: CountryCodeParam,
+    indicator_a: IndicatorCodeParam,
+    indicator_b: IndicatorCodeParam,
+    window: int = Query(10, ge=3, le=30, description="Window length in years."),
+    start_year: OptionalYearParam = None,
+    end_year: OptionalYearParam = None,
+    confidence: ConfidenceParam = 0.95,
+    db: Session = Depends(get_db),
+    _: dict = Depends(require_agreement),
+):
+    if start_year is not None and end_year is not None and start_year > end_year:
+        raise HTTPException(status_code=400, detail="start_year must be <= end_year")
+    result = rolling_correlation_for_country(
+        db, country, indicator_a, indicator_b, window, start_year, end_year, confidence
+    )
+    return RollingCorrelationResponse(**result)
+
+
+@router.get("/correlation/lag", response_model=LagCorrelationResponse)
+def correlation_lag(
+    country: CountryCodeParam,
+    indicator_a: IndicatorCodeParam,
+    indicator_b: IndicatorCodeParam,
+    max_lag: int = Query(5, ge=1, le=10, description="Evaluate lags from -max_lag to +max_lag years."),
+    start_year: OptionalYearParam = None,
+    end_year: OptionalYearParam = None,
+    confidence: ConfidenceParam = 0.95,
+    db: Session = Depends(get_db),
+    _: dict = Depends(require_agreement),
+):
+    if start_year is not None and end_year is not None and start_year > end_year:
+        raise HTTPException(status_code=400, detail="start_year must be <= end_year")
+    result = lagged_correlation_for_country(
+        db, country, indicator_a, indicator_b, max_lag, start_year, end_year, confidence
+    )
+    return LagCorrelationResponse(**result)
+
+
+@router.get("/movers", response_model=MoversResponse)
+def movers(
+    indicator: IndicatorCodeParam,
+    start_year: YearParam,
+    end_year: YearParam,
+    metric: Literal["abs", "pct", "cagr"] = Query("abs", description="abs difference, pct change or cagr (% a year)"),
+    tolerance: int = Query(
+        0, ge=0, le=5, description="Use the nearest year within ±tolerance when a value is missing."
+    ),
+    order: Literal["desc", "asc"] = Query("desc", description="desc: largest increases first; asc: largest falls"),
+    limit: int = Query(10, ge=1, le=300),
+    db: Session = Depends(get_db),
+    _: dict = Depends(require_agreement),
+):
+    """Countries ranked by the change of `indicator` between `start_year` and `end_year`."""
+    if start_year >= end_year:
+        raise HTTPException(status_code=400, detail="start_year must be < end_year")
+    items, ranked, cached = top_movers(db, indicator, start_year, end_year, metric, tolerance, limit, order)
+    return MoversResponse(
+        indicator=indicator,
+        start_year=start_year,
+        end_year=end_year,
+        metric=metric,
+        tolerance=tolerance,
+        order=order,
+        ranked=ranked,
+        cached=cached,
+        items=[Mover(**item) for item in items],
+    )
+
+
+@router.get("/countries/{code}/similar", response_model=SimilarCountriesResponse)
+def similar_countries(
+    code: str = Path(..., pattern=r"^[A-Za-z0-9-]{2,8}$", description="Country code to find neighbours for"),
+    indicators: str = Query(..., description="Comma-separated indicator codes forming the profile"),
+    year: OptionalYearParam = None,
+    max_lag: int | None = Query(
+        None, ge=0, le=60, description="Oldest accepted value is year - max_lag (any age when omitted)"
+    ),
+    k: int = Query(10, ge=1, le=50, description="Number of neighbours"),
+    metric: Literal["euclidean", "cosine"] = "euclidean",
+    db: Session = Depends(get_db),
+    _: dict = Depends(require_agreement),
+):
+    """
+    Countries whose standardised indicator profile as of `year` (latest values by default) is
+    closest to `code`. Only countries with a value for every indicator take part.
+    """
+    indicator_codes = split_indicator_codes(indicators, SIMILAR_MAX_INDICATORS)
+    country_code = code.upper()
+    year = year if year is not None else MAX_SAFE_YEAR
+    index, cached = feature_index(db, indicator_codes, year, max_lag)
+    neighbours = nearest_countries(index, country_code, k, metric)
+    if neighbours is None:
+        raise HTTPException(status_code=404, detail=f"No value of every indicator for {country_code} as of {year}")
+    return SimilarCountriesResponse(
+        country=country_code,
+        indicators=indicator_codes,
+        year=year,
+        metric=metric,
+        values=index.values[index.position(country_code)].tolist(),
+        candidates=len(index.countries),
+        cached=cached,
+        neighbours=[
+            SimilarCountry(country=index.countries[position], distance=distance, values=index.values[position].tolist())
+            for position, distance in neighbours
+        ],
+    )
+
+
 @router.post("/analytics/chart/explain", response_model=ChartExplainResponse)
-def explain_chart(payload: ChartExplainRequest, _: dict = Depends(require_agreement)):
+def explain_chart(
+    payload: ChartExplainRequest, db: Session = Depends(get_db), _: dict = Depends(require_agreement)
+):
+    try:
+        return explain_chart_service(payload, db)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+@router.post("/analytics/chart/explain/stream")
+def explain_chart_stream(
+    payload: ChartExplainRequest, db: Session = Depends(get_db), _: dict = Depends(require_agreement)
+):
+    """
+    The explanation as server-sent events: `meta`, then `token` chunks relayed from the provider as
+    they are generated, and a final `done` with the complete response. If the provider is slow to
+    start, a `fallback` event with the local data summary comes first.
+    """
     try:
-        return explain_chart_service(payload)
+        events = explain_chart_stream_service(payload, db)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        # Proxies must not buffer the stream, or tokens arrive all at once.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -3,7 +3,8 @@ from sqlalchemy.orm import Session
 
 from app.db import get_db
 from app.models import Country, Indicator
-from app.schemas import CountryRead, IndicatorRead
+from app.schemas import CountryGroupRead, CountryRead, IndicatorRead
+from app.services.groups import load_group_catalog
 
 router = APIRouter(tags=["catalog"])
 
@@ -204,6 +205,12 @@ def list_countries(db: Session = Depends(get_db)):
     return result
 
 
+@router.get("/country-groups", response_model=list[CountryGroupRead])
+def list_country_groups():
+    """Regions and income groups usable as country codes in /observations (aggregates of their members)."""
+    return [CountryGroupRead(**group) for group in load_group_catalog().values()]
+
+
 @router.get("/indicators", response_model=list[IndicatorRead])
 def list_indicators(db: Session = Depends(get_db)):
     rows = db.query(Indicator).order_by(Indicator.code).all()
@@ -1,30 +1,107 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
-from app.api.v1.params import CountryCodeParam, IndicatorCodeParam
+from app.api.v1.params import (
+    CountryCodeParam,
+    IndicatorCodeParam,
+    split_indicator_codes,
+    split_quantiles,
+    validate_country_codes,
+    validate_indicator_codes,
+    validate_quantiles,
+)
+from app.core.config import FORECAST_PRECOMPUTE_HORIZON, FORECAST_PRECOMPUTE_MODEL
 from app.db import get_db
-from app.deps import require_agreement
+from app.deps import require_agreement, require_roles
 from app.models import Country, Indicator
-from app.models_forecast import ForecastPoint, ForecastRun
-from app.schemas import ForecastPointSchema, ForecastRequest, ForecastResponse, ForecastSeries
-from app.services.forecasting import backtest_linear, linear_forecast, run_forecast, sanitize_training_series
+from app.models_forecast import ForecastPoint, ForecastPrecomputeRun, ForecastRun
+from app.schemas import (
+    ForecastBatchRequest,
+    ForecastBatchResponse,
+    ForecastIntervalMethod,
+    ForecastModelName,
+    ForecastPointSchema,
+    ForecastPrecomputeRunRead,
+    ForecastRequest,
+    ForecastResponse,
+    ForecastSeries,
+)
+from app.services.compute import get_executor
+from app.services.forecasting import (
+    ARX_MODEL,
+    BOOTSTRAP_PATHS,
+    MIN_TRAINING_POINTS,
+    PANEL_MODEL,
+    ArxOptions,
+    IntervalOptions,
+    compact_forecast_runs,
+    compute_forecasts,
+    precompute_forecasts,
+    run_arx_forecast,
+    run_batch_forecast,
+    run_forecast,
+    sanitize_training_series,
+)
 from app.services.world_bank import fetch_indicator_series
 
 router = APIRouter(tags=["forecast"])
 
+BATCH_MAX_COUNTRIES = 250
+BATCH_MAX_INDICATORS = 20
+ARX_MAX_DRIVERS = 5
+
+
+def require_compute_capacity():
+    """
+    Turn a request away while every forecast worker is busy and the queue is full.
+
+    Only for work that cannot be answered from a stored run (the live World Bank fallback), so
+    the fetch is skipped; stored-run paths reach the pool through `run_jobs`, which raises
+    `ComputeSaturated` only when something actually has to be computed.
+    """
+    executor = get_executor()
+    if executor is not None and executor.saturated():
+        raise HTTPException(
+            status_code=503,
+            detail="Forecast workers are busy",
+            headers={"Retry-After": str(executor.retry_after)},
+        )
+
 
 @router.post("/forecast", response_model=ForecastResponse)
 def create_forecast(
     country: CountryCodeParam,
     indicator: IndicatorCodeParam,
     horizon_years: int = Query(5, ge=1, le=20),
+    model: ForecastModelName = Query("linear_trend", description="Model name, or `auto` to pick by backtest RMSE"),
+    interval: ForecastIntervalMethod = Query("normal", description="`bootstrap` simulates paths from residuals"),
+    quantiles: str | None = Query(None, description="Comma-separated quantiles for bootstrap, e.g. 0.1,0.5,0.9"),
+    paths: int = Query(BOOTSTRAP_PATHS, ge=100, le=20000),
+    refit: bool = Query(False, description="Refit the trend on every bootstrap path"),
+    drivers: str | None = Query(None, description="Comma-separated driver indicators for model=arx"),
+    target_lags: int = Query(1, ge=1, le=3),
+    driver_lags: int = Query(1, ge=1, le=3),
     db: Session = Depends(get_db),
     _: dict = Depends(require_agreement),
 ):
-    result = run_forecast(db, country, indicator, horizon_years)
+    options = IntervalOptions(method=interval, quantiles=split_quantiles(quantiles), paths=paths, refit=refit)
+    if model in (PANEL_MODEL, ARX_MODEL):
+        _reject_bootstrap(model, options)
+        if model == ARX_MODEL:
+            driver_codes = split_indicator_codes(drivers, ARX_MAX_DRIVERS) if drivers else []
+            arx = _arx_options(driver_codes, target_lags, driver_lags, {}, [indicator])
+            forecasts, _ = run_arx_forecast(db, [country], [indicator], horizon_years, arx)
+        else:
+            forecasts, _ = run_batch_forecast(db, [country], [indicator], horizon_years, PANEL_MODEL)
+        # These models need the stored cross-indicator/cross-country panel: no live fallback.
+        if not forecasts:
+            raise HTTPException(status_code=400, detail="Not enough data to forecast")
+        return _batch_item_response(forecasts[0])
+    result = run_forecast(db, country, indicator, horizon_years, model, options)
     if result:
         return ForecastResponse.from_run(result.run, result.points, country, indicator)
 
+    require_compute_capacity()
     try:
         series = fetch_indicator_series(country.upper(), indicator)
     except Exception as exc:
@@ -33,38 +110,81 @@ def create_forecast(
     years = [row["year"] for row in series]
     values = [row["value"] for row in series]
     years, values = sanitize_training_series(years, values)
-    if len(values) < 8:
+    if len(values) < MIN_TRAINING_POINTS:
         raise HTTPException(status_code=400, detail="Not enough data to forecast")
 
-    future_years, predictions, std = linear_forecast(values, years, horizon_years)
-    backtest = backtest_linear(values, years, test_points=5) or {}
-    metrics = f"residual_std={std:.4f}"
-    if backtest:
-        metrics = f"{metrics}; backtest_points={backtest.get('points')}; mae={backtest.get('mae'):.4f}; rmse={backtest.get('rmse'):.4f}"
-    points = [
-        ForecastPointSchema(
-            year=year,
-            value=float(value),
-            lower=float(value - 1.96 * std),
-            upper=float(value + 1.96 * std),
-        )
-        for year, value in zip(future_years, predictions)
-    ]
-
+    result = compute_forecasts([(years, values)], horizon_years, model, options)[0]
     return ForecastResponse(
         country=country.upper(),
         indicator=indicator,
-        model_name="linear_trend",
+        model_name=result["model_name"],
         horizon_years=horizon_years,
-        assumptions=(
-            "Linear trend on recent historical values (up to last 25 years); "
-            "training values winsorized at 5th/95th percentile; residual std used for intervals."
-        ),
-        metrics=metrics,
-        points=points,
+        assumptions=result["assumptions"],
+        metrics=result["metrics"],
+        points=[ForecastPointSchema(**point) for point in result["points"]],
+    )
+
+
+def _batch_item_response(item) -> ForecastResponse:
+    return ForecastResponse(
+        country=item.country,
+        indicator=item.indicator,
+        model_name=item.model_name,
+        horizon_years=item.horizon_years,
+        assumptions=item.assumptions,
+        metrics=item.metrics,
+        points=[ForecastPointSchema(**point) for point in item.points],
     )
 
 
+def _reject_bootstrap(model: str, options: IntervalOptions):
+    if model in (PANEL_MODEL, ARX_MODEL) and options.method != "normal":
+        raise HTTPException(status_code=400, detail=f"Bootstrap intervals are not available for the {model} model")
+
+
+def _arx_options(
+    drivers: list[str], target_lags: int, driver_lags: int, scenario: dict, targets: list[str]
+) -> ArxOptions:
+    if not drivers:
+        raise HTTPException(status_code=400, detail="model=arx requires at least one driver indicator")
+    drivers = validate_indicator_codes(drivers, ARX_MAX_DRIVERS)
+    overlap = sorted(set(drivers) & set(targets))
+    if overlap:
+        raise HTTPException(status_code=400, detail=f"Drivers must differ from the target: {', '.join(overlap)}")
+    unknown = sorted(set(scenario) - set(drivers))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Scenario for unknown drivers: {', '.join(unknown)}")
+    overrides = tuple(
+        (driver, int(year), float(value)) for driver, path in scenario.items() for year, value in path.items()
+    )
+    return ArxOptions(drivers=tuple(drivers), target_lags=target_lags, driver_lags=driver_lags, scenario=overrides)
+
+
+@router.post("/forecast/batch", response_model=ForecastBatchResponse)
+def create_batch_forecast(
+    payload: ForecastBatchRequest,
+    db: Session = Depends(get_db),
+    _: dict = Depends(require_agreement),
+):
+    countries = validate_country_codes(payload.countries, BATCH_MAX_COUNTRIES)
+    indicators = validate_indicator_codes(payload.indicators, BATCH_MAX_INDICATORS)
+    options = IntervalOptions(
+        method=payload.interval,
+        quantiles=validate_quantiles(payload.quantiles),
+        paths=payload.paths,
+        refit=payload.refit,
+    )
+    _reject_bootstrap(payload.model, options)
+    if payload.model == ARX_MODEL:
+        arx = _arx_options(payload.drivers, payload.target_lags, payload.driver_lags, payload.scenario, indicators)
+        forecasts, skipped = run_arx_forecast(db, countries, indicators, payload.horizon_years, arx)
+    else:
+        forecasts, skipped = run_batch_forecast(
+            db, countries, indicators, payload.horizon_years, payload.model, options
+        )
+    return ForecastBatchResponse(forecasts=[_batch_item_response(item) for item in forecasts], skipped=skipped)
+
+
 @router.get("/forecast/latest", response_model=ForecastResponse)
 def latest_forecast(
     country: CountryCodeParam,
@@ -92,3 +212,35 @@ def latest_forecast(
         .all()
     )
     return ForecastResponse.from_run(run, points, country_row.code, indicator_row.code)
+
+
+@router.post("/forecast/compact")
+def compact_forecasts(
+    keep: int = Query(1, ge=1, le=20),
+    db: Session = Depends(get_db),
+    __: dict = Depends(require_agreement),
+    _: dict = Depends(require_roles("admin")),
+):
+    return compact_forecast_runs(db, keep=keep)
+
+
+@router.post("/forecast/precompute", response_model=ForecastPrecomputeRunRead)
+def precompute_forecast_runs(
+    horizon_years: int = Query(FORECAST_PRECOMPUTE_HORIZON, ge=1, le=20),
+    model: ForecastModelName = Query(FORECAST_PRECOMPUTE_MODEL),
+    db: Session = Depends(get_db),
+    __: dict = Depends(require_agreement),
+    _: dict = Depends(require_roles("admin")),
+):
+    if model == ARX_MODEL:
+        raise HTTPException(status_code=400, detail="model=arx needs drivers and cannot be precomputed")
+    return precompute_forecasts(db, horizon=horizon_years, model_name=model)
+
+
+@router.get("/forecast/precompute/runs", response_model=list[ForecastPrecomputeRunRead])
+def list_precompute_runs(
+    db: Session = Depends(get_db),
+    __: dict = Depends(require_agreement),
+    _: dict = Depends(require_roles("researcher", "admin")),
+):
+    return db.query(ForecastPrecomputeRun).order_by(ForecastPrecomputeRun.id.desc()).limit(100).all()
@@ -1,8 +1,19 @@
 from fastapi import APIRouter
 
+from app.services.compute import get_executor
+
 router = APIRouter(tags=["health"])
 
 
 @router.get("/health")
 def healthcheck():
     return {"status": "ok"}
+
+
+@router.get("/health/compute")
+def compute_health():
+    """Forecast pool load: busy workers, jobs waiting (`queue_depth`) and rejection counters."""
+    executor = get_executor()
+    if executor is None:
+        return {"enabled": False}
+    return {"enabled": True, **executor.stats()}
@@ -2,46 +2,112 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 
+import numpy as np
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import case, func
 from sqlalchemy.orm import Session
 
-from app.api.v1.params import CountryCodeParam, OptionalYearParam, YearParam
+from app.api.v1.params import CountryCodeParam, OptionalYearParam, YearParam, split_country_codes
+from app.core.config import WORLD_BANK_LIVE_DEADLINE_SECONDS, WORLD_BANK_LIVE_WORKERS
 from app.db import get_db
 from app.deps import require_agreement
 from app.models import Country, Indicator, Observation
-from app.schemas import GiniRankingRow, GiniTrendMeta, GiniTrendPoint, GiniTrendResponse
-from app.services.world_bank import fetch_indicator_series
+from app.schemas import GiniRankingRow, GiniTrendMeta, GiniTrendResponse
+from app.services.world_bank import fetch_indicator_series, fetch_indicator_series_many
 
 router = APIRouter(tags=["inequality"])
 
 GINI_INDICATOR = "SI.POV.GINI"
+RANKING_MAX_COUNTRIES = 300
+TRENDS_MAX_COUNTRIES = 50
 
 
-def _load_series(db: Session, country_code: str, indicator_code: str):
+def _stored_trends(
+    db: Session, country_codes: list[str], start_year: int | None, end_year: int | None
+) -> dict[str, list[dict]]:
     """
-    Prefer cached DB observations if present, otherwise fallback to World Bank.
+    Gini points per country within the year bounds, in one query.
+
+    The bounds are applied in SQL and `yoy_change` is computed there with `LAG()` over the
+    bounded rows, so the first point in range has no YoY, as before.
     """
-    country_row = db.query(Country).filter(Country.code == country_code.upper()).first()
-    indicator_row = db.query(Indicator).filter(Indicator.code == indicator_code).first()
-    if country_row and indicator_row:
-        observations = (
-            db.query(Observation)
-            .filter(Observation.country_id == country_row.id)
-            .filter(Observation.indicator_id == indicator_row.id)
-            .order_by(Observation.year)
-            .all()
-        )
-        if observations:
-            return (
-                [{"year": row.year, "value": row.value} for row in observations],
-                GiniTrendMeta(source="cache_db", fetched_at=None),
-            )
-
-    series = fetch_indicator_series(country_code.upper(), indicator_code)
-    return (
-        [{"year": row["year"], "value": row["value"]} for row in series],
-        GiniTrendMeta(source="world_bank_live", fetched_at=datetime.now(timezone.utc).isoformat()),
+    previous = func.lag(Observation.value).over(partition_by=Observation.country_id, order_by=Observation.year)
+    query = (
+        db.query(Country.code, Observation.year, Observation.value, Observation.value - previous)
+        .join(Country, Country.id == Observation.country_id)
+        .join(Indicator, Indicator.id == Observation.indicator_id)
+        .filter(Indicator.code == GINI_INDICATOR)
+        .filter(Country.code.in_(country_codes))
+        .filter(Observation.value.isnot(None), Observation.is_estimate.isnot(True))
+    )
+    if start_year is not None:
+        query = query.filter(Observation.year >= start_year)
+    if end_year is not None:
+        query = query.filter(Observation.year <= end_year)
+    trends: dict[str, list[dict]] = {}
+    for code, year, value, yoy in query.order_by(Country.code, Observation.year):
+        trends.setdefault(code, []).append({"year": year, "value": value, "yoy_change": yoy})
+    return trends
+
+
+def _countries_with_data(db: Session, indicator_code: str, country_codes: list[str]) -> set[str]:
+    if not country_codes:
+        return set()
+    rows = (
+        db.query(Country.code)
+        .join(Observation, Observation.country_id == Country.id)
+        .join(Indicator, Indicator.id == Observation.indicator_id)
+        .filter(Indicator.code == indicator_code)
+        .filter(Country.code.in_(country_codes))
+        .distinct()
+        .all()
+    )
+    return {row[0] for row in rows}
+
+
+def _live_trend(series: list[dict], start_year: int | None, end_year: int | None) -> list[dict]:
+    """Bound a World Bank series and add YoY changes with one NumPy diff."""
+    series = [
+        row
+        for row in series
+        if (start_year is None or row["year"] >= start_year) and (end_year is None or row["year"] <= end_year)
+    ]
+    changes = np.diff([row["value"] for row in series]) if len(series) > 1 else []
+    return [
+        {"year": row["year"], "value": row["value"], "yoy_change": float(changes[idx - 1]) if idx else None}
+        for idx, row in enumerate(series)
+    ]
+
+
+def _gini_trends(
+    db: Session, country_codes: list[str], start_year: int | None, end_year: int | None
+) -> list[GiniTrendResponse]:
+    """
+    Trends for several countries: stored series from one query, World Bank fetched concurrently
+    for countries without stored Gini data. Countries that fail or miss the deadline come back
+    empty with source `unavailable`.
+    """
+    stored = _stored_trends(db, country_codes, start_year, end_year)
+    empty = [code for code in country_codes if code not in stored]
+    # Stored data outside the year range still counts as cached, like the unbounded lookup did.
+    cached = _countries_with_data(db, GINI_INDICATOR, empty)
+    misses = [code for code in empty if code not in cached]
+    live = fetch_indicator_series_many(
+        misses, GINI_INDICATOR, WORLD_BANK_LIVE_DEADLINE_SECONDS, WORLD_BANK_LIVE_WORKERS
     )
+    fetched_at = datetime.now(timezone.utc).isoformat()
+
+    responses = []
+    for code in country_codes:
+        if code in live:
+            points = _live_trend(live[code], start_year, end_year)
+            meta = GiniTrendMeta(source="world_bank_live", fetched_at=fetched_at)
+        elif code in misses:
+            points, meta = [], GiniTrendMeta(source="unavailable", fetched_at=None)
+        else:
+            points, meta = stored.get(code, []), GiniTrendMeta(source="cache_db", fetched_at=None)
+        responses.append(GiniTrendResponse(country=code, indicator=GINI_INDICATOR, points=points, meta=meta))
+    return responses
 
 
 @router.get("/inequality/gini/trend", response_model=GiniTrendResponse)
@@ -55,53 +121,81 @@ def gini_trend(
     if start_year is not None and end_year is not None and start_year > end_year:
         raise HTTPException(status_code=400, detail="start_year must be <= end_year")
 
+    code = country.upper()
+    stored = _stored_trends(db, [code], start_year, end_year)
+    if code in stored or _countries_with_data(db, GINI_INDICATOR, [code]):
+        meta = GiniTrendMeta(source="cache_db", fetched_at=None)
+        return GiniTrendResponse(country=code, indicator=GINI_INDICATOR, points=stored.get(code, []), meta=meta)
+
     try:
-        series, meta = _load_series(db, country, GINI_INDICATOR)
+        series = fetch_indicator_series(code, GINI_INDICATOR)
     except Exception as exc:
         raise HTTPException(status_code=502, detail=str(exc)) from exc
+    meta = GiniTrendMeta(source="world_bank_live", fetched_at=datetime.now(timezone.utc).isoformat())
+    return GiniTrendResponse(
+        country=code, indicator=GINI_INDICATOR, points=_live_trend(series, start_year, end_year), meta=meta
+    )
 
-    if start_year is not None:
-        series = [row for row in series if row["year"] >= start_year]
-    if end_year is not None:
-        series = [row for row in series if row["year"] <= end_year]
 
-    points: list[GiniTrendPoint] = []
-    prev_value = None
-    for row in series:
-        value = row["value"]
-        yoy = None
-        if isinstance(value, (int, float)) and isinstance(prev_value, (int, float)):
-            yoy = float(value - prev_value)
-        if isinstance(value, (int, float)):
-            prev_value = value
-        points.append(GiniTrendPoint(year=row["year"], value=value, yoy_change=yoy))
+@router.get("/inequality/gini/trends", response_model=list[GiniTrendResponse])
+def gini_trends(
+    countries: str = Query(..., description="Comma-separated country codes, e.g. KZ,RU,US"),
+    start_year: OptionalYearParam = None,
+    end_year: OptionalYearParam = None,
+    db: Session = Depends(get_db),
+    _: dict = Depends(require_agreement),
+):
+    if start_year is not None and end_year is not None and start_year > end_year:
+        raise HTTPException(status_code=400, detail="start_year must be <= end_year")
+    return _gini_trends(db, split_country_codes(countries, TRENDS_MAX_COUNTRIES), start_year, end_year)
+
 
-    return GiniTrendResponse(country=country.upper(), indicator=GINI_INDICATOR, points=points, meta=meta)
+def _stored_values_for_year(db: Session, indicator_code: str, year: int, country_codes: list[str] | None):
+    """
+    `{country: value in year}` for every country with stored observations of the indicator,
+    in one grouped query. Countries with data but nothing for `year` map to None.
+    """
+    query = (
+        db.query(Country.code, func.max(case((Observation.year == year, Observation.value))))
+        .join(Observation, Observation.country_id == Country.id)
+        .join(Indicator, Indicator.id == Observation.indicator_id)
+        .filter(Indicator.code == indicator_code)
+        .filter(Observation.is_estimate.isnot(True))
+        .group_by(Country.code)
+    )
+    if country_codes is not None:
+        query = query.filter(Country.code.in_(country_codes))
+    return dict(query.all())
 
 
 @router.get("/inequality/gini/ranking", response_model=list[GiniRankingRow])
 def gini_ranking(
     year: YearParam,
-    countries: str = Query(..., description="Comma-separated country codes, e.g. KZ,RU,US"),
+    countries: str | None = Query(
+        None, description="Comma-separated country codes, e.g. KZ,RU,US; all stored countries when omitted"
+    ),
     db: Session = Depends(get_db),
     _: dict = Depends(require_agreement),
 ):
-    items = [item.strip() for item in countries.split(",") if item.strip()]
-    if not items:
-        raise HTTPException(status_code=400, detail="countries is required")
-    if len(items) > 25:
-        raise HTTPException(status_code=400, detail="Too many countries (max 25)")
-
-    rows: list[GiniRankingRow] = []
-    for code in items:
-        try:
-            series, _meta = _load_series(db, code, GINI_INDICATOR)
-        except Exception:
-            rows.append(GiniRankingRow(country=code.upper(), year=year, value=None))
-            continue
-        value = next((row["value"] for row in series if row["year"] == year), None)
-        rows.append(GiniRankingRow(country=code.upper(), year=year, value=value))
-
+    codes = split_country_codes(countries, RANKING_MAX_COUNTRIES) if countries is not None else None
+    stored = _stored_values_for_year(db, GINI_INDICATOR, year, codes)
+
+    if codes is None:
+        values = {code: value for code, value in stored.items() if value is not None}
+    else:
+        # Only countries without any stored Gini data go to World Bank, concurrently and under one deadline.
+        misses = [code for code in codes if code not in stored]
+        live = fetch_indicator_series_many(
+            misses, GINI_INDICATOR, WORLD_BANK_LIVE_DEADLINE_SECONDS, WORLD_BANK_LIVE_WORKERS
+        )
+        values = {
+            code: stored[code]
+            if code in stored
+            else next((row["value"] for row in live.get(code, []) if row["year"] == year), None)
+            for code in codes
+        }
+
+    rows = [GiniRankingRow(country=code, year=year, value=value) for code, value in values.items()]
     # Sort: known values first (descending inequality), then missing
     rows.sort(key=lambda item: (item.value is None, -(item.value or 0.0)))
     return rows
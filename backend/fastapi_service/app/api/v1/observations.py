@@ -1,16 +1,120 @@
+import math
 from datetime import datetime, timezone
 
+import numpy as np
 from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
+from app.core.config import GROUP_MIN_COVERAGE
 from app.db import get_db
 from app.models import Country, Indicator, Observation
-from app.schemas import ObservationRead
+from app.deps import require_agreement
+from app.schemas import (
+    AnomalyItem,
+    DerivedSeriesResponse,
+    GroupStatistic,
+    ObservationPoint,
+    ObservationRead,
+    ObservationSeries,
+    ObservationTransform,
+    SnapshotItem,
+    SnapshotResponse,
+)
+from app.services.anomalies import anomaly_years, load_anomalies
+from app.services.derived import MAX_EXPRESSION_LENGTH, ExpressionError, derived_series
+from app.services.estimates import estimate_source
+from app.services.groups import load_group_catalog, load_group_series
+from app.services.panel import load_panel
+from app.services.snapshot import load_snapshot
+from app.services.transforms import apply_transform, cagr, fill_gaps, series_grid, year_mask
 from app.services.world_bank import fetch_indicator_series
-from app.api.v1.params import CountryCodeParam, IndicatorCodeParam, OptionalYearParam
+from app.api.v1.params import (
+    CountryCodeParam,
+    FillParam,
+    IndicatorCodeParam,
+    OptionalYearParam,
+    YearParam,
+    fill_method,
+    split_country_codes,
+    split_indicator_codes,
+)
 
 router = APIRouter(tags=["observations"])
 
+DERIVED_MAX_COUNTRIES = 300
+BATCH_MAX_COUNTRIES = 300
+BATCH_MAX_INDICATORS = 20
+ANOMALIES_MAX_COUNTRIES = 300
+
+TransformParam = Query(
+    None,
+    description="yoy (absolute change), pct_change, log, rebase (needs base_year), avg (trailing `window`-year "
+    "mean) or cagr (one value between the first and last observation within the bounds)",
+)
+WindowParam = Query(3, ge=2, le=30, description="Window in years for transform=avg")
+
+
+def _series_rows(
+    country: str,
+    indicator: str,
+    years: list[int],
+    values: list,
+    transform: str | None,
+    base_year: int | None,
+    window: int,
+    start_year: int | None,
+    end_year: int | None,
+    fill: str | None,
+    estimates: list[bool] | None = None,
+) -> list[ObservationRead]:
+    """
+    Gap-fill and/or transform the whole series, then keep the observed years within the bounds.
+
+    `estimates` flags stored estimate rows among `years`; points filled here are flagged too.
+    """
+    grid, dense = series_grid(years, values)
+    estimated = np.zeros(len(grid), dtype=bool)
+    if estimates:
+        estimated[np.asarray(years, dtype=int) - grid[0]] = estimates
+    if fill is not None:
+        dense, filled = fill_gaps(dense, fill)
+        estimated |= filled
+    in_range = year_mask(grid, start_year, end_year)
+    if transform == "cagr":
+        rate, first, last = cagr(np.where(in_range, dense, np.nan)[None, :], grid)
+        if first[0] < 0:
+            return []
+        value = None if np.isnan(rate[0]) else float(rate[0])
+        is_estimate = bool(estimated[first[0] - grid[0]] or estimated[last[0] - grid[0]])
+        return [
+            ObservationRead(
+                country=country,
+                indicator=indicator,
+                year=int(last[0]),
+                value=value,
+                is_estimate=is_estimate,
+                period_start=int(first[0]),
+            )
+        ]
+    transformed = apply_transform(dense, grid, transform, base_year, window) if transform else dense
+    keep = in_range & ~np.isnan(dense)
+    return [
+        ObservationRead(
+            country=country,
+            indicator=indicator,
+            year=year,
+            value=None if np.isnan(value) else float(value),
+            is_estimate=bool(flag),
+        )
+        for year, value, flag in zip(np.asarray(grid)[keep].tolist(), transformed[keep], estimated[keep])
+    ]
+
+
+def _check_transform(transform: str | None, base_year: int | None):
+    if transform == "rebase" and base_year is None:
+        raise HTTPException(status_code=400, detail="transform=rebase requires base_year")
+
 
 @router.get("/observations", response_model=list[ObservationRead])
 def list_observations(
@@ -19,13 +123,68 @@ def list_observations(
     response: Response,
     start_year: OptionalYearParam = None,
     end_year: OptionalYearParam = None,
+    transform: ObservationTransform | None = TransformParam,
+    base_year: OptionalYearParam = None,
+    window: int = WindowParam,
+    fill: FillParam = "none",
+    flag_anomalies: bool = Query(False, description="Mark stored observations flagged by the anomaly scan"),
+    aggregate: GroupStatistic = Query(
+        "weighted_mean",
+        description="For country group codes (see /country-groups): population-weighted mean, mean or median",
+    ),
+    min_coverage: float | None = Query(
+        None,
+        ge=0,
+        le=1,
+        description="For country group codes: skip years where fewer than this share of members report "
+        "(GROUP_MIN_COVERAGE when omitted)",
+    ),
     db: Session = Depends(get_db),
 ):
     if start_year is not None and end_year is not None and start_year > end_year:
         raise HTTPException(status_code=400, detail="start_year must be <= end_year")
+    _check_transform(transform, base_year)
+    method = fill_method(fill)
+    whole_series = transform is not None or method is not None
 
     country_code = country.upper()
     indicator_code = indicator
+    if country_code in load_group_catalog():
+        # Group aggregates are precomputed after ingestion; there is no live fallback.
+        response.headers["X-Data-Source"] = "group_aggregate"
+        share = GROUP_MIN_COVERAGE if min_coverage is None else min_coverage
+        rows = load_group_series(
+            db,
+            country_code,
+            indicator_code,
+            aggregate,
+            None if whole_series else start_year,
+            None if whole_series else end_year,
+            min_members=math.ceil(share * len(load_group_catalog()[country_code]["members"])),
+        )
+        if not whole_series:
+            return [
+                ObservationRead(country=country_code, indicator=indicator_code, year=year, value=value, members=members)
+                for year, value, members in rows
+            ]
+        series = _series_rows(
+            country_code,
+            indicator_code,
+            [year for year, _, _ in rows],
+            [value for _, value, _ in rows],
+            transform,
+            base_year,
+            window,
+            start_year,
+            end_year,
+            method,
+        )
+        # Points filled between reported years have no members of their own.
+        reporting = {year: members for year, _, members in rows}
+        for row in series:
+            row.members = reporting.get(row.year)
+        return series
+
     country_row = db.query(Country).filter(Country.code == country_code).first()
     indicator_row = db.query(Indicator).filter(Indicator.code == indicator_code).first()
     observations = []
@@ -36,37 +195,79 @@ def list_observations(
             .filter(Observation.country_id == country_row.id)
             .filter(Observation.indicator_id == indicator_row.id)
         )
-        if start_year is not None:
+        if method is None:
+            query = query.filter(Observation.is_estimate.isnot(True))
+        else:
+            # Estimates stored at ingestion for this method are served as they are.
+            query = query.filter(
+                or_(Observation.is_estimate.isnot(True), Observation.source == estimate_source(method))
+            )
+        # Transforms look back (lags, windows) and gaps are filled from their neighbours,
+        # so both need the series beyond the bounds.
+        if start_year is not None and not whole_series:
             query = query.filter(Observation.year >= start_year)
-        if end_year is not None:
+        if end_year is not None and not whole_series:
             query = query.filter(Observation.year <= end_year)
         observations = query.order_by(Observation.year).all()
 
     if observations:
         response.headers["X-Data-Source"] = "cache_db"
-        return [
-            ObservationRead(
-                country=country_row.code,
-                indicator=indicator_row.code,
-                year=row.year,
-                value=row.value,
+        if whole_series:
+            rows = _series_rows(
+                country_row.code,
+                indicator_row.code,
+                [row.year for row in observations],
+                [row.value for row in observations],
+                transform,
+                base_year,
+                window,
+                start_year,
+                end_year,
+                method,
+                [bool(row.is_estimate) for row in observations],
             )
-            for row in observations
-        ]
+        else:
+            rows = [
+                ObservationRead(
+                    country=country_row.code,
+                    indicator=indicator_row.code,
+                    year=row.year,
+                    value=row.value,
+                )
+                for row in observations
+            ]
+        if flag_anomalies:
+            flagged = anomaly_years(db, country_row.id, indicator_row.id)
+            for row in rows:
+                row.is_anomaly = row.year in flagged
+        return rows
 
     try:
         series = fetch_indicator_series(country_code, indicator_code)
     except Exception as exc:
         raise HTTPException(status_code=502, detail=str(exc)) from exc
 
+    response.headers["X-Data-Source"] = "world_bank_live"
+    response.headers["X-Fetched-At"] = datetime.now(timezone.utc).isoformat()
+    if whole_series:
+        return _series_rows(
+            country_code,
+            indicator_code,
+            [row["year"] for row in series],
+            [row["value"] for row in series],
+            transform,
+            base_year,
+            window,
+            start_year,
+            end_year,
+            method,
+        )
+
     if start_year is not None:
         series = [row for row in series if row["year"] >= start_year]
     if end_year is not None:
         series = [row for row in series if row["year"] <= end_year]
 
-    response.headers["X-Data-Source"] = "world_bank_live"
-    response.headers["X-Fetched-At"] = datetime.now(timezone.utc).isoformat()
-
     return [
         ObservationRead(
             country=country_code,
@@ -76,3 +277,151 @@ def list_observations(
         )
         for row in series
     ]
+
+
+@router.get("/observations/batch", response_model=list[ObservationSeries])
+def batch_observations(
+    countries: str = Query(..., description="Comma-separated country codes, e.g. KZ,RU,US"),
+    indicators: str = Query(..., description="Comma-separated indicator codes"),
+    start_year: OptionalYearParam = None,
+    end_year: OptionalYearParam = None,
+    transform: ObservationTransform | None = TransformParam,
+    base_year: OptionalYearParam = None,
+    window: int = WindowParam,
+    fill: FillParam = "none",
+    db: Session = Depends(get_db),
+):
+    """
+    Stored series for countries × indicators from one panel query, optionally gap-filled and transformed.
+
+    Fills and transforms run on the whole (country, indicator, year) array at once. There is no
+    live World Bank fallback here; pairs without stored data come back with no points.
+    """
+    if start_year is not None and end_year is not None and start_year > end_year:
+        raise HTTPException(status_code=400, detail="start_year must be <= end_year")
+    _check_transform(transform, base_year)
+    country_codes = split_country_codes(countries, BATCH_MAX_COUNTRIES)
+    indicator_codes = split_indicator_codes(indicators, BATCH_MAX_INDICATORS)
+    method = fill_method(fill)
+    bounded = transform is None and method is None
+    panel = load_panel(
+        db,
+        country_codes,
+        indicator_codes,
+        start_year if bounded else None,
+        end_year if bounded else None,
+    )
+    values = panel.values
+    if method is not None:
+        values, estimated = fill_gaps(values, method)
+    else:
+        estimated = np.zeros(values.shape, dtype=bool)
+    in_range = year_mask(panel.years, start_year, end_year)
+    years = np.asarray(panel.years, dtype=int)
+
+    items = []
+    if transform == "cagr":
+        rate, first, last = cagr(np.where(in_range, values, np.nan), panel.years)
+        for ci, country in enumerate(panel.countries):
+            for ii, indicator in enumerate(panel.indicators):
+                points = []
+                if last[ci, ii] >= 0:
+                    value = None if np.isnan(rate[ci, ii]) else float(rate[ci, ii])
+                    endpoints = [first[ci, ii] - panel.years[0], last[ci, ii] - panel.years[0]]
+                    is_estimate = bool(estimated[ci, ii, endpoints].any())
+                    points = [ObservationPoint(year=int(last[ci, ii]), value=value, is_estimate=is_estimate)]
+                period_start = int(first[ci, ii]) if first[ci, ii] >= 0 else None
+                items.append(
+                    ObservationSeries(country=country, indicator=indicator, period_start=period_start, points=points)
+                )
+        return items
+
+    transformed = apply_transform(values, panel.years, transform, base_year, window) if transform else values
+    keep = in_range & ~np.isnan(values)
+    for ci, country in enumerate(panel.countries):
+        for ii, indicator in enumerate(panel.indicators):
+            mask = keep[ci, ii]
+            points = [
+                ObservationPoint(year=year, value=None if np.isnan(value) else float(value), is_estimate=bool(flag))
+                for year, value, flag in zip(
+                    years[mask].tolist(), transformed[ci, ii, mask], estimated[ci, ii, mask]
+                )
+            ]
+            items.append(ObservationSeries(country=country, indicator=indicator, points=points))
+    return items
+
+
+@router.get("/observations/anomalies", response_model=list[AnomalyItem])
+def observation_anomalies(
+    indicator: IndicatorCodeParam,
+    countries: str | None = Query(None, description="Comma-separated country codes; all countries when omitted"),
+    start_year: OptionalYearParam = None,
+    end_year: OptionalYearParam = None,
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db),
+    _: dict = Depends(require_agreement),
+):
+    """
+    Stored observations flagged by the post-ingestion anomaly scan (rolling median/MAD or
+    year-over-year jump robust z-score above the threshold), by country and year.
+    """
+    if start_year is not None and end_year is not None and start_year > end_year:
+        raise HTTPException(status_code=400, detail="start_year must be <= end_year")
+    country_codes = split_country_codes(countries, ANOMALIES_MAX_COUNTRIES) if countries is not None else None
+    rows = load_anomalies(db, indicator, country_codes, start_year, end_year, limit)
+    return [
+        AnomalyItem(
+            country=code, indicator=indicator, year=year, value=value, rolling_score=rolling, jump_score=jump
+        )
+        for code, year, value, rolling, jump in rows
+    ]
+
+
+@router.get("/snapshot", response_model=SnapshotResponse)
+def snapshot(
+    indicator: IndicatorCodeParam,
+    year: YearParam,
+    max_lag: int | None = Query(
+        None, ge=0, le=60, description="Oldest accepted value is year - max_lag (any age when omitted)"
+    ),
+    db: Session = Depends(get_db),
+):
+    """Latest value at or before `year` for every country, with the year it was observed, from the snapshot table."""
+    rows = load_snapshot(db, indicator, year, max_lag)
+    return SnapshotResponse(
+        indicator=indicator,
+        year=year,
+        max_lag=max_lag,
+        items=[SnapshotItem(country=code, value=value, source_year=source_year) for code, value, source_year in rows],
+    )
+
+
+@router.get("/observations/derived", response_model=DerivedSeriesResponse)
+def derived_observations(
+    expr: str = Query(
+        ...,
+        max_length=MAX_EXPRESSION_LENGTH,
+        description="Expression over [INDICATOR.CODE] references, e.g. [NY.GDP.MKTP.CD] / [SP.POP.TOTL]. "
+        "Functions: lag, diff, pct_change (x, periods=1), rolling_mean(x, window), rebase(x, year), log(x).",
+    ),
+    countries: str | None = Query(None, description="Comma-separated country codes; all countries when omitted"),
+    start_year: OptionalYearParam = None,
+    end_year: OptionalYearParam = None,
+    db: Session = Depends(get_db),
+    _: dict = Depends(require_agreement),
+):
+    if start_year is not None and end_year is not None and start_year > end_year:
+        raise HTTPException(status_code=400, detail="start_year must be <= end_year")
+    country_codes = split_country_codes(countries, DERIVED_MAX_COUNTRIES) if countries is not None else None
+    try:
+        expression, series, cached = derived_series(db, expr, country_codes, start_year, end_year)
+    except ExpressionError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return DerivedSeriesResponse(
+        expression=expression.text,
+        indicators=list(expression.indicators),
+        start_year=start_year,
+        end_year=end_year,
+        cached=cached,
+        series=series,
+    )
@@ -1,13 +1,19 @@
 from __future__ import annotations
 
+import re
 from datetime import datetime, timezone
 from typing import Annotated
 
-from fastapi import Query
+from fastapi import HTTPException, Query
+
+from app.schemas import ObservationFill
 
 MIN_SAFE_YEAR = 1990
 MAX_SAFE_YEAR = datetime.now(timezone.utc).year
 
+_COUNTRY_CODE_RE = re.compile(r"^[A-Za-z0-9-]{2,8}$")
+_INDICATOR_CODE_RE = re.compile(r"^[A-Za-z0-9_.-]{3,64}$")
+
 CountryCodeParam = Annotated[
     str,
     Query(
@@ -32,3 +38,83 @@ IndicatorCodeParam = Annotated[
 
 YearParam = Annotated[int, Query(..., ge=MIN_SAFE_YEAR, le=MAX_SAFE_YEAR)]
 OptionalYearParam = Annotated[int | None, Query(ge=MIN_SAFE_YEAR, le=MAX_SAFE_YEAR)]
+
+ConfidenceParam = Annotated[
+    float,
+    Query(ge=0.5, le=0.999, description="Confidence level for correlation intervals."),
+]
+
+BootstrapParam = Annotated[
+    int,
+    Query(ge=0, le=10000, description="Bootstrap resamples for the percentile interval (0 disables)."),
+]
+
+FillParam = Annotated[
+    ObservationFill,
+    Query(
+        description="Fill interior gaps: linear interpolation, locf (last observation carried forward) or none. "
+        "Filled points are marked as estimates.",
+    ),
+]
+
+
+def fill_method(fill: str) -> str | None:
+    """`fill` query value as a method for the services; `none` becomes None."""
+    return None if fill == "none" else fill
+
+
+def _validate_codes(items, name: str, pattern: re.Pattern, max_items: int) -> list[str]:
+    items = list(dict.fromkeys(item.strip() for item in items if item and item.strip()))
+    if not items:
+        raise HTTPException(status_code=400, detail=f"{name} is required")
+    if len(items) > max_items:
+        raise HTTPException(status_code=400, detail=f"Too many {name} (max {max_items})")
+    invalid = [item for item in items if not pattern.match(item)]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}: {', '.join(invalid)}")
+    return items
+
+
+def validate_country_codes(items: list[str], max_items: int) -> list[str]:
+    """Validate a list of country codes, returning de-duplicated upper-cased codes."""
+    return list(dict.fromkeys(code.upper() for code in _validate_codes(items, "countries", _COUNTRY_CODE_RE, max_items)))
+
+
+def validate_indicator_codes(items: list[str], max_items: int) -> list[str]:
+    """Validate a list of indicator codes, preserving order."""
+    return _validate_codes(items, "indicators", _INDICATOR_CODE_RE, max_items)
+
+
+def split_country_codes(raw: str, max_items: int) -> list[str]:
+    """Parse a comma-separated country list (e.g. `KZ,RU,US`) into upper-cased codes."""
+    return validate_country_codes(raw.split(","), max_items)
+
+
+def split_indicator_codes(raw: str, max_items: int) -> list[str]:
+    """Parse a comma-separated indicator list into codes, preserving order."""
+    return validate_indicator_codes(raw.split(","), max_items)
+
+
+MAX_QUANTILES = 19
+
+
+def validate_quantiles(items) -> tuple[float, ...]:
+    """Validate forecast quantiles in (0, 1), returning them sorted and de-duplicated."""
+    quantiles = sorted(set(items))
+    if len(quantiles) > MAX_QUANTILES:
+        raise HTTPException(status_code=400, detail=f"Too many quantiles (max {MAX_QUANTILES})")
+    invalid = [q for q in quantiles if not 0 < q < 1]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Quantiles must be in (0, 1): {', '.join(map(str, invalid))}")
+    return tuple(quantiles)
+
+
+def split_quantiles(raw: str | None) -> tuple[float, ...]:
+    """Parse a comma-separated quantile list (e.g. `0.1,0.5,0.9`)."""
+    if not raw:
+        return ()
+    try:
+        items = [float(item) for item in raw.split(",") if item.strip()]
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="Quantiles must be numbers") from exc
+    return validate_quantiles(items)
@@ -45,6 +45,19 @@ RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") == "1"
 RATE_LIMIT_RPS = float(os.getenv("RATE_LIMIT_RPS", "5"))
 RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "20"))
 
+# Live World Bank fallback for multi-country endpoints: concurrent fetches with one deadline.
+WORLD_BANK_LIVE_WORKERS = int(os.getenv("WORLD_BANK_LIVE_WORKERS", "8"))
+WORLD_BANK_LIVE_DEADLINE_SECONDS = float(os.getenv("WORLD_BANK_LIVE_DEADLINE_SECONDS", "10"))
+
+# Gap filling: with linear or locf, ingestion stores interior gaps as is_estimate rows so
+# `fill=<method>` reads are served from the table; none stores raw observations only.
+INGEST_FILL_METHOD = os.getenv("INGEST_FILL_METHOD", "none").strip().lower()
+# Robust z-score above which the post-ingestion scan flags an observation as an anomaly.
+ANOMALY_Z_THRESHOLD = float(os.getenv("ANOMALY_Z_THRESHOLD", "5"))
+# Country-group aggregates are served only for years where at least this share of the group's
+# members report a value (`min_coverage` overrides it per request).
+GROUP_MIN_COVERAGE = float(os.getenv("GROUP_MIN_COVERAGE", "0.5"))
+
 # AI chart explanation agent
 CHART_EXPLAIN_PROVIDER = os.getenv("CHART_EXPLAIN_PROVIDER", "openai").strip().lower()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
@@ -57,3 +70,22 @@ GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL", "https://generativelanguage.googl
 GEMINI_TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "20"))
 CHART_EXPLAIN_MAX_COUNTRIES = int(os.getenv("CHART_EXPLAIN_MAX_COUNTRIES", "4"))
 CHART_EXPLAIN_MAX_INDICATORS = int(os.getenv("CHART_EXPLAIN_MAX_INDICATORS", "4"))
+# Provider answers are cached in the DB per question, data summary, language, provider and model:
+# entries expire after the TTL (0 disables the cache) and the least recently used beyond the cap are evicted.
+CHART_EXPLAIN_CACHE_TTL_SECONDS = int(os.getenv("CHART_EXPLAIN_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+CHART_EXPLAIN_CACHE_MAX_ENTRIES = int(os.getenv("CHART_EXPLAIN_CACHE_MAX_ENTRIES", "1000"))
+# The streaming endpoint sends the local data summary if the provider's first token takes longer than this.
+CHART_EXPLAIN_STREAM_FALLBACK_SECONDS = float(os.getenv("CHART_EXPLAIN_STREAM_FALLBACK_SECONDS", "0.8"))
+
+# Forecasting
+# Shared compute pool created at startup; 0 keeps fitting in the request thread.
+FORECAST_POOL_WORKERS = int(os.getenv("FORECAST_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Jobs allowed to wait behind busy workers before requests are rejected with 503.
+FORECAST_POOL_MAX_QUEUE = int(os.getenv("FORECAST_POOL_MAX_QUEUE", "16"))
+FORECAST_TIMEOUT_SECONDS = float(os.getenv("FORECAST_TIMEOUT_SECONDS", "30"))
+FORECAST_RETRY_AFTER_SECONDS = int(os.getenv("FORECAST_RETRY_AFTER_SECONDS", "5"))
+# Batches smaller than this go to the pool as one job; larger ones are split across workers.
+FORECAST_PARALLEL_MIN_SERIES = int(os.getenv("FORECAST_PARALLEL_MIN_SERIES", "64"))
+# Nightly precompute: the parameters POST /forecast uses by default, so those requests are lookups.
+FORECAST_PRECOMPUTE_HORIZON = int(os.getenv("FORECAST_PRECOMPUTE_HORIZON", "5"))
+FORECAST_PRECOMPUTE_MODEL = os.getenv("FORECAST_PRECOMPUTE_MODEL", "linear_trend")
@@ -0,0 +1,48 @@
+"""
+Idempotent schema upgrades for databases created before a column or index was added.
+
+`create_all` only creates missing tables, so columns added later to existing tables are
+listed here and added at startup when absent. New columns must be nullable (or have a
+constant default) so that existing rows stay valid.
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from app.models import Observation
+from app.models_forecast import ForecastPoint, ForecastRun
+
+ADDED_COLUMNS = [
+    ForecastRun.__table__.c.fingerprint,
+    ForecastRun.__table__.c.created_at,
+    ForecastRun.__table__.c.params_digest,
+    ForecastPoint.__table__.c.quantiles,
+]
+
+INDEXED_TABLES = [Observation.__table__, ForecastRun.__table__, ForecastPoint.__table__]
+
+
+def _column_ddl(column, dialect) -> str:
+    ddl = f"{column.name} {column.type.compile(dialect=dialect)}"
+    # SQLite cannot add a column with a non-constant default such as now(); rows keep NULL there.
+    if column.server_default is not None and dialect.name != "sqlite":
+        ddl += f" DEFAULT {column.server_default.arg.compile(dialect=dialect)}"
+    return ddl
+
+
+def upgrade_schema(bind: Engine) -> list[str]:
+    """Add missing `ADDED_COLUMNS` and indexes of `INDEXED_TABLES`; returns the columns added."""
+    inspector = inspect(bind)
+    added = []
+    for column in ADDED_COLUMNS:
+        table = column.table
+        if not inspector.has_table(table.name):
+            continue
+        if column.name in {existing["name"] for existing in inspector.get_columns(table.name)}:
+            continue
+        with bind.begin() as connection:
+            connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {_column_ddl(column, bind.dialect)}"))
+        added.append(f"{table.name}.{column.name}")
+    for table in INDEXED_TABLES:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+    return added
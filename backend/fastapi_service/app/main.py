@@ -1,5 +1,6 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.api.v1.analytics import router as analytics_router
 from app.api.v1.news import router as news_router
@@ -12,7 +13,9 @@ from app.api.v1.ingestion_runs import router as ingestion_runs_router
 from app.api.v1.observations import router as observations_router
 from app.core.config import CORS_ALLOW_ORIGINS, RATE_LIMIT_BURST, RATE_LIMIT_ENABLED, RATE_LIMIT_RPS
 from app.db import Base, engine
+from app.db_upgrade import upgrade_schema
 from app.middleware.rate_limit import RateLimitMiddleware
+from app.services.compute import ComputeSaturated, ComputeTimeout, shutdown_executor, start_executor
 import app.models_analytics  # noqa: F401
 import app.models_forecast  # noqa: F401
 import app.models_ingestion  # noqa: F401
@@ -49,6 +52,28 @@ app.include_router(forecast_router, prefix="/api/v1")
 app.include_router(news_router, prefix="/api/v1")
 
 
+@app.exception_handler(ComputeSaturated)
+@app.exception_handler(ComputeTimeout)
+async def compute_unavailable(_request: Request, exc: ComputeSaturated | ComputeTimeout):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 @app.on_event("startup")
 def create_tables():
     Base.metadata.create_all(bind=engine)
+    # create_all skips tables that already exist, so columns and indexes added later are created here.
+    upgrade_schema(engine)
+
+
+@app.on_event("startup")
+def start_compute_pool():
+    start_executor()
+
+
+@app.on_event("shutdown")
+def stop_compute_pool():
+    shutdown_executor()
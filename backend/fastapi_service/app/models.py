@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Float, ForeignKey, Integer, String, Text, UniqueConstraint
+from sqlalchemy import Boolean, Column, Float, ForeignKey, Index, Integer, String, Text, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from app.db import Base
@@ -41,4 +41,91 @@ class Observation(Base):
     country = relationship("Country", back_populates="observations")
     indicator = relationship("Indicator", back_populates="observations")
 
-    __table_args__ = (UniqueConstraint("country_id", "indicator_id", "year", name="uq_obs"),)
+    __table_args__ = (
+        UniqueConstraint("country_id", "indicator_id", "year", name="uq_obs"),
+        # Cross-country reads (rankings, snapshots) filter by indicator and year, not country.
+        Index("ix_obs_indicator_year", "indicator_id", "year"),
+    )
+
+
+class ObservationSnapshot(Base):
+    """
+    Latest non-null value of a (country, indicator) as of each year.
+
+    Derived from `observations` by `services/snapshot.py`: one row per year from the pair's
+    first observation to a few years past the refresh year, holding the value and the year it
+    came from.
+    """
+
+    __tablename__ = "observation_snapshots"
+
+    id = Column(Integer, primary_key=True)
+    country_id = Column(Integer, ForeignKey("countries.id"), nullable=False)
+    indicator_id = Column(Integer, ForeignKey("indicators.id"), nullable=False)
+    year = Column(Integer, nullable=False)
+    value = Column(Float, nullable=False)
+    source_year = Column(Integer, nullable=False)
+
+    # Leading (indicator_id, year) so a map/ranking view for one year is a single index range scan.
+    __table_args__ = (UniqueConstraint("indicator_id", "year", "country_id", name="uq_obs_snapshot"),)
+
+
+class DataRevision(Base):
+    """
+    Counter per derived table, bumped when the table is rebuilt.
+
+    Observations are insert-only, so their highest id versions the data; rebuilding a table
+    derived from them (e.g. from a script) changes what readers see without a new observation,
+    and `services/cache.py` folds these counters into `data_version`.
+    """
+
+    __tablename__ = "data_revisions"
+
+    name = Column(String(64), primary_key=True)
+    revision = Column(Integer, nullable=False, default=0)
+
+
+class ObservationAnomaly(Base):
+    """
+    Stored observation flagged as suspicious by `services/anomalies.py`.
+
+    `rolling_score` is the robust z-score against the centred rolling median/MAD of its series,
+    `jump_score` the robust z-score of its year-over-year change; either may be null when the
+    series is too short or flat for that test.
+    """
+
+    __tablename__ = "observation_anomalies"
+
+    id = Column(Integer, primary_key=True)
+    country_id = Column(Integer, ForeignKey("countries.id"), nullable=False)
+    indicator_id = Column(Integer, ForeignKey("indicators.id"), nullable=False)
+    year = Column(Integer, nullable=False)
+    value = Column(Float, nullable=False)
+    rolling_score = Column(Float, nullable=True)
+    jump_score = Column(Float, nullable=True)
+
+    __table_args__ = (UniqueConstraint("indicator_id", "country_id", "year", name="uq_obs_anomaly"),)
+
+
+class GroupAggregate(Base):
+    """
+    Aggregate of a country group (`app/data/country_groups.json`) for one indicator and year.
+
+    Derived from `observations` by `services/groups.py`: `mean` and `median` over the members
+    with a value, `weighted_mean` weighted by the members' population (`SP.POP.TOTL`) that year,
+    null when no member with a value has a population figure. `members` counts the members
+    with a value.
+    """
+
+    __tablename__ = "group_aggregates"
+
+    id = Column(Integer, primary_key=True)
+    group_code = Column(String(8), nullable=False)
+    indicator_id = Column(Integer, ForeignKey("indicators.id"), nullable=False)
+    year = Column(Integer, nullable=False)
+    mean = Column(Float, nullable=False)
+    median = Column(Float, nullable=False)
+    weighted_mean = Column(Float, nullable=True)
+    members = Column(Integer, nullable=False)
+
+    __table_args__ = (UniqueConstraint("group_code", "indicator_id", "year", name="uq_group_aggregate"),)
@@ -1,6 +1,6 @@
 import json
 
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, Text, UniqueConstraint
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String, Text, UniqueConstraint
 from sqlalchemy.sql import func
 
 from app.db import Base
@@ -20,3 +20,22 @@ class LorenzResult(Base):
 
     def points(self):
         return json.loads(self.points_json)
+
+
+class ChartExplanation(Base):
+    """
+    Provider answer for `/analytics/chart/explain`, keyed by a digest of the normalised question,
+    the data summary sent to the provider, the language, provider and model.
+
+    `last_used_at` orders LRU eviction; `created_at` is what the TTL is measured from.
+    """
+
+    __tablename__ = "chart_explanations"
+
+    id = Column(Integer, primary_key=True)
+    cache_key = Column(String(64), unique=True, nullable=False)
+    provider = Column(String(32), nullable=False)
+    model = Column(String(128), nullable=True)
+    answer = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    last_used_at = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String, Text
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
 
 from app.db import Base
 
@@ -14,6 +15,11 @@ class ForecastRun(Base):
     horizon_years = Column(Integer, nullable=False)
     assumptions = Column(Text, nullable=True)
     metrics = Column(Text, nullable=True)
+    # sha256 of the training series, model, parameters and horizon; identical inputs reuse the run.
+    fingerprint = Column(String(64), nullable=True, index=True)
+    # sha256 of the same inputs minus the training data; retention keeps the newest runs per digest.
+    params_digest = Column(String(64), nullable=True, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     country = relationship("Country")
     target_indicator = relationship("Indicator")
@@ -24,10 +30,37 @@ class ForecastPoint(Base):
     __tablename__ = "forecast_points"
 
     id = Column(Integer, primary_key=True)
-    run_id = Column(Integer, ForeignKey("forecast_runs.id"), nullable=False)
+    run_id = Column(Integer, ForeignKey("forecast_runs.id"), nullable=False, index=True)
     year = Column(Integer, nullable=False)
     value = Column(Float, nullable=False)
     lower = Column(Float, nullable=True)
     upper = Column(Float, nullable=True)
+    # JSON {"0.1": value, ...} for bootstrap intervals; NULL for normal intervals.
+    quantiles = Column(Text, nullable=True)
 
     run = relationship("ForecastRun", back_populates="points")
+
+
+class ForecastPrecomputeRun(Base):
+    __tablename__ = "forecast_precompute_runs"
+
+    id = Column(Integer, primary_key=True)
+    model_name = Column(String(128), nullable=False)
+    horizon_years = Column(Integer, nullable=False)
+    status = Column(String(32), nullable=False, default="started")
+    # Series with at least one stored value; coverage = forecasted / series_total.
+    series_total = Column(Integer, nullable=False, default=0)
+    forecasted = Column(Integer, nullable=False, default=0)
+    created = Column(Integer, nullable=False, default=0)
+    reused = Column(Integer, nullable=False, default=0)
+    skipped = Column(Integer, nullable=False, default=0)
+    duration_ms = Column(Float, nullable=True)
+    error = Column(Text, nullable=True)
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    @property
+    def coverage(self):
+        if not self.series_total:
+            return None
+        return self.forecasted / self.series_total
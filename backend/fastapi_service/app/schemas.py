@@ -1,6 +1,7 @@
-from typing import Optional
+import json
+from typing import Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class CountryCreate(BaseModel):
@@ -17,6 +18,14 @@ class CountryRead(BaseModel):
         from_attributes = True
 
 
+class CountryGroupRead(BaseModel):
+    code: str
+    name: str
+    # region, income, subregion or world.
+    type: str
+    members: list[str]
+
+
 class IndicatorCreate(BaseModel):
     code: str
     name: str
@@ -42,6 +51,74 @@ class ObservationRead(BaseModel):
     indicator: str
     year: int
     value: Optional[float]
+    # Filled by fill=linear|locf rather than observed.
+    is_estimate: bool = False
+    # Only set with flag_anomalies=true: the stored observation was flagged by the anomaly scan.
+    is_anomaly: bool | None = None
+    # Only set with transform=cagr: first year of the growth period; `year` is its last year.
+    period_start: int | None = None
+    # Only set for country group codes: members with a value that year (see /country-groups for the total).
+    members: int | None = None
+
+
+ObservationTransform = Literal["yoy", "pct_change", "log", "rebase", "avg", "cagr"]
+ObservationFill = Literal["linear", "locf", "none"]
+GroupStatistic = Literal["weighted_mean", "mean", "median"]
+
+
+class ObservationPoint(BaseModel):
+    year: int
+    value: float | None = None
+    is_estimate: bool = False
+
+
+class ObservationSeries(BaseModel):
+    country: str
+    indicator: str
+    # transform=cagr: first year of the growth period; the single point sits at its last year.
+    period_start: int | None = None
+    points: list[ObservationPoint]
+
+
+class AnomalyItem(BaseModel):
+    country: str
+    indicator: str
+    year: int
+    value: float
+    rolling_score: float | None = None
+    jump_score: float | None = None
+
+
+class SnapshotItem(BaseModel):
+    country: str
+    value: float
+    source_year: int
+
+
+class SnapshotResponse(BaseModel):
+    indicator: str
+    year: int
+    max_lag: int | None = None
+    items: list[SnapshotItem]
+
+
+class DerivedPoint(BaseModel):
+    year: int
+    value: float
+
+
+class DerivedSeries(BaseModel):
+    country: str
+    points: list[DerivedPoint]
+
+
+class DerivedSeriesResponse(BaseModel):
+    expression: str
+    indicators: list[str]
+    start_year: int | None = None
+    end_year: int | None = None
+    cached: bool = False
+    series: list[DerivedSeries]
 
 
 class IngestionRequest(BaseModel):
@@ -85,19 +162,141 @@ class GiniResponse(BaseModel):
     gini: float
 
 
-class CorrelationResponse(BaseModel):
+class CorrelationInference(BaseModel):
+    confidence: float = 0.95
+    ci_low: float | None = None
+    ci_high: float | None = None
+    p_value: float | None = None
+    bootstrap_resamples: int | None = None
+    bootstrap_ci_low: float | None = None
+    bootstrap_ci_high: float | None = None
+
+
+class CorrelationResponse(CorrelationInference):
     country: str
     indicator_a: str
     indicator_b: str
     points: int
+    # Overlapping years where either value is a gap-fill estimate (fill=linear|locf).
+    estimated_points: int = 0
     correlation: float | None = None
 
 
+class CorrelationMatrixResponse(BaseModel):
+    country: str
+    indicators: list[str]
+    correlation: list[list[float | None]]
+    points: list[list[int]]
+    p_values: list[list[float | None]]
+
+
+class CrossSectionPoint(BaseModel):
+    country: str
+    x: float
+    y: float
+    year_a: int
+    year_b: int
+
+
+class CrossSectionCorrelationResponse(CorrelationInference):
+    indicator_a: str
+    indicator_b: str
+    year: int
+    tolerance: int
+    points: int
+    correlation: float | None = None
+    spearman: float | None = None
+    scatter: list[CrossSectionPoint] | None = None
+
+
+class RollingCorrelationPoint(BaseModel):
+    start_year: int
+    end_year: int
+    points: int
+    correlation: float | None = None
+    ci_low: float | None = None
+    ci_high: float | None = None
+    p_value: float | None = None
+
+
+class RollingCorrelationResponse(BaseModel):
+    country: str
+    indicator_a: str
+    indicator_b: str
+    window: int
+    points: list[RollingCorrelationPoint]
+
+
+class LagCorrelationPoint(BaseModel):
+    lag: int
+    points: int
+    correlation: float | None = None
+    ci_low: float | None = None
+    ci_high: float | None = None
+    p_value: float | None = None
+
+
+class LagCorrelationResponse(BaseModel):
+    country: str
+    indicator_a: str
+    indicator_b: str
+    max_lag: int
+    best_lag: int | None = None
+    lags: list[LagCorrelationPoint]
+
+
+class Mover(BaseModel):
+    country: str
+    # Years the endpoint values were taken from (nearest to the requested years within the tolerance).
+    source_start_year: int
+    start_value: float
+    source_end_year: int
+    end_value: float
+    change: float
+
+
+class MoversResponse(BaseModel):
+    indicator: str
+    start_year: int
+    end_year: int
+    metric: Literal["abs", "pct", "cagr"]
+    tolerance: int
+    order: Literal["desc", "asc"]
+    # Countries with both endpoints, before the limit.
+    ranked: int
+    cached: bool = False
+    items: list[Mover]
+
+
+class SimilarCountry(BaseModel):
+    country: str
+    distance: float
+    # Raw values in the order of `SimilarCountriesResponse.indicators`.
+    values: list[float]
+
+
+class SimilarCountriesResponse(BaseModel):
+    country: str
+    indicators: list[str]
+    year: int
+    metric: Literal["euclidean", "cosine"]
+    values: list[float]
+    # Countries with a value for every indicator, i.e. the search space.
+    candidates: int
+    cached: bool = False
+    neighbours: list[SimilarCountry]
+
+
 class ForecastPointSchema(BaseModel):
     year: int
     value: float
     lower: float | None = None
     upper: float | None = None
+    quantiles: dict[str, float] | None = None
+
+
+ForecastModelName = Literal["linear_trend", "holt", "damped_trend", "ar", "drift", "naive", "auto", "panel", "arx"]
+ForecastIntervalMethod = Literal["normal", "bootstrap"]
 
 
 class ForecastRequest(BaseModel):
@@ -134,12 +333,58 @@ class ForecastResponse(BaseModel):
                     value=item.value,
                     lower=item.lower,
                     upper=item.upper,
+                    quantiles=json.loads(item.quantiles) if getattr(item, "quantiles", None) else None,
                 )
                 for item in points
             ],
         )
 
 
+class ForecastBatchRequest(BaseModel):
+    countries: list[str]
+    indicators: list[str]
+    horizon_years: int = Field(5, ge=1, le=20)
+    model: ForecastModelName = "linear_trend"
+    interval: ForecastIntervalMethod = "normal"
+    quantiles: list[float] = Field(default_factory=list, max_length=19)
+    paths: int = Field(2000, ge=100, le=20000)
+    refit: bool = False
+    drivers: list[str] = Field(default_factory=list)
+    target_lags: int = Field(1, ge=1, le=3)
+    driver_lags: int = Field(1, ge=1, le=3)
+    # {driver indicator: {year: value}} overrides of the drivers' future path (model=arx).
+    scenario: dict[str, dict[int, float]] = Field(default_factory=dict)
+
+
+class ForecastBatchSkipped(BaseModel):
+    country: str
+    indicator: str
+    reason: str
+
+
+class ForecastBatchResponse(BaseModel):
+    forecasts: list[ForecastResponse]
+    skipped: list[ForecastBatchSkipped]
+
+
+class ForecastPrecomputeRunRead(BaseModel):
+    id: int
+    model_name: str
+    horizon_years: int
+    status: str
+    series_total: int
+    forecasted: int
+    created: int
+    reused: int
+    skipped: int
+    coverage: Optional[float] = None
+    duration_ms: Optional[float] = None
+    error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
 class GiniTrendPoint(BaseModel):
     year: int
     value: float | None = None
@@ -193,3 +438,5 @@ class ChartExplainResponse(BaseModel):
     provider: str
     model: str | None = None
     warning: str | None = None
+    # Served from the explanation cache without calling the provider.
+    cached: bool = False
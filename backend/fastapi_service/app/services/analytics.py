@@ -58,6 +58,7 @@ def get_lorenz_segments(db: Session, country_code: str, year: int):
                 Observation.country_id == country.id,
                 Observation.indicator_id == indicator.id,
                 Observation.year <= year,
+                Observation.is_estimate.isnot(True),
             )
             .order_by(Observation.year.desc())
             .first()
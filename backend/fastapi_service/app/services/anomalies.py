@@ -0,0 +1,198 @@
+"""
+Robust outlier detection over stored series.
+
+Two per-series tests run on a (series × years) grid in one vectorised pass:
+
+- rolling: deviation from the centred `ROLLING_WINDOW`-year median, scaled by the MAD of
+  those deviations over the series (a Hampel-style filter); catches isolated typos;
+- jump: the year-over-year change against the median/MAD of all changes in the series;
+  catches level shifts such as unit changes.
+
+Strictly positive series are tested in logs. Scores are robust z-scores
+(0.6745 · deviation / MAD); observations beyond `ANOMALY_Z_THRESHOLD` on either test are
+stored in `observation_anomalies`.
+"""
+import warnings
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from app.core.config import ANOMALY_Z_THRESHOLD
+from app.models import Country, Indicator, Observation, ObservationAnomaly
+from app.services.panel import pair_grid
+
+ROLLING_WINDOW = 7
+MIN_SIDE_POINTS = 2
+MIN_JUMPS = 6
+# MAD is floored at this share of the series level so flat stretches do not give infinite scores.
+MAD_FLOOR = 0.01
+MAD_SCALE = 0.6745
+
+
+def _robust_z(deviation: np.ndarray, mad: np.ndarray, level: np.ndarray) -> np.ndarray:
+    scale = np.maximum(mad, MAD_FLOOR * np.abs(level))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score = MAD_SCALE * deviation / scale
+    return np.where(np.isfinite(score), score, np.nan)
+
+
+def _comparable(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Strictly positive series in logs, so changes are relative and a unit change is one jump
+    rather than a new regime of large absolute deviations; other series as they are.
+
+    Returns `(series, level)` where `level` is what the MAD floor is measured against.
+    """
+    positive = np.all(np.isnan(values) | (values > 0), axis=-1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        series = np.where(positive, np.log(values), values)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        level = np.where(positive, 1.0, np.nanmedian(np.abs(values), axis=-1, keepdims=True))
+    return series, level
+
+
+def rolling_scores(series: np.ndarray, level: np.ndarray) -> np.ndarray:
+    """
+    Robust z-score of every cell's deviation from its centred rolling median.
+
+    Deviations are scaled by the MAD of all deviations in the series: a handful of points per
+    window is too few for a stable local MAD. Cells need `MIN_SIDE_POINTS` observations on each
+    side, since a one-sided window on a trending series is biased; the first and last years
+    are covered by the jump test instead.
+    """
+    if not series.shape[-1]:
+        return np.full(series.shape, np.nan)
+    half = ROLLING_WINDOW // 2
+    padded = np.pad(series, [(0, 0)] * (series.ndim - 1) + [(half, half)], constant_values=np.nan)
+    windows = sliding_window_view(padded, ROLLING_WINDOW, axis=-1)
+    observed = ~np.isnan(windows)
+    enough = (observed[..., :half].sum(axis=-1) >= MIN_SIDE_POINTS) & (
+        observed[..., half + 1 :].sum(axis=-1) >= MIN_SIDE_POINTS
+    )
+    with warnings.catch_warnings():
+        # All-NaN windows and series are expected in gaps and simply give NaN.
+        warnings.simplefilter("ignore", RuntimeWarning)
+        deviation = np.where(enough, series - np.nanmedian(windows, axis=-1), np.nan)
+        mad = np.nanmedian(np.abs(deviation), axis=-1, keepdims=True)
+    return _robust_z(deviation, mad, level)
+
+
+def jump_scores(series: np.ndarray, level: np.ndarray) -> np.ndarray:
+    """
+    Robust z-score of each year-over-year change, placed on the later year.
+
+    A flagged change that is immediately reversed (a one-year spike) is attributed to the
+    spike only, so the year after it is not flagged as well.
+    """
+    scores = np.full(series.shape, np.nan)
+    if series.shape[-1] < 2:
+        return scores
+    change = np.diff(series, axis=-1)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        median = np.nanmedian(change, axis=-1, keepdims=True)
+        mad = np.nanmedian(np.abs(change - median), axis=-1, keepdims=True)
+    enough = (~np.isnan(change)).sum(axis=-1, keepdims=True) >= MIN_JUMPS
+    z = np.where(enough, _robust_z(change - median, mad, level), np.nan)
+    flagged = np.abs(z) > ANOMALY_Z_THRESHOLD
+    reverting = np.zeros(z.shape, dtype=bool)
+    reverting[..., 1:] = flagged[..., :-1] & (np.sign(z[..., 1:]) == -np.sign(z[..., :-1]))
+    scores[..., 1:] = np.where(reverting, np.nan, z)
+    return scores
+
+
+def detect_anomalies(values: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """`(rolling, jump, flagged)` for a grid whose last axis is a contiguous year range."""
+    series, level = _comparable(values)
+    rolling = rolling_scores(series, level)
+    jump = jump_scores(series, level)
+    flagged = np.maximum(np.abs(np.nan_to_num(rolling)), np.abs(np.nan_to_num(jump))) > ANOMALY_Z_THRESHOLD
+    return rolling, jump, flagged
+
+
+def _optional(value: float) -> float | None:
+    return None if np.isnan(value) else float(value)
+
+
+def refresh_anomalies(
+    db: Session, country_ids: list[int] | None = None, indicator_ids: list[int] | None = None
+) -> int:
+    """
+    Rescan the given countries × indicators (all when None) and rewrite their anomaly rows.
+
+    Ingestion calls this for the pair it just wrote; the tests are per series, so that keeps
+    the table exact. Passing no filters rescans the whole panel. Estimates are not scanned.
+    The caller commits. Returns the rows written.
+    """
+    stale = delete(ObservationAnomaly)
+    query = db.query(Observation.country_id, Observation.indicator_id, Observation.year, Observation.value).filter(
+        Observation.value.isnot(None), Observation.is_estimate.isnot(True)
+    )
+    if country_ids is not None:
+        stale = stale.where(ObservationAnomaly.country_id.in_(country_ids))
+        query = query.filter(Observation.country_id.in_(country_ids))
+    if indicator_ids is not None:
+        stale = stale.where(ObservationAnomaly.indicator_id.in_(indicator_ids))
+        query = query.filter(Observation.indicator_id.in_(indicator_ids))
+    db.execute(stale)
+    rows = query.order_by(Observation.country_id, Observation.indicator_id, Observation.year).all()
+    pairs, first_year, values = pair_grid(rows)
+    rolling, jump, flagged = detect_anomalies(values)
+    series, offsets = np.nonzero(flagged)
+    if not len(series):
+        return 0
+    mappings = [
+        {
+            "country_id": int(pairs[row, 0]),
+            "indicator_id": int(pairs[row, 1]),
+            "year": first_year + int(offset),
+            "value": float(values[row, offset]),
+            "rolling_score": _optional(rolling[row, offset]),
+            "jump_score": _optional(jump[row, offset]),
+        }
+        for row, offset in zip(series, offsets)
+    ]
+    db.execute(insert(ObservationAnomaly), mappings)
+    return len(mappings)
+
+
+def load_anomalies(
+    db: Session,
+    indicator_code: str,
+    country_codes: list[str] | None = None,
+    start_year: int | None = None,
+    end_year: int | None = None,
+    limit: int = 500,
+):
+    """Flagged observations of an indicator as `(country, year, value, rolling_score, jump_score)` rows."""
+    query = (
+        db.query(
+            Country.code,
+            ObservationAnomaly.year,
+            ObservationAnomaly.value,
+            ObservationAnomaly.rolling_score,
+            ObservationAnomaly.jump_score,
+        )
+        .join(Country, Country.id == ObservationAnomaly.country_id)
+        .join(Indicator, Indicator.id == ObservationAnomaly.indicator_id)
+        .filter(Indicator.code == indicator_code)
+    )
+    if country_codes is not None:
+        query = query.filter(Country.code.in_(country_codes))
+    if start_year is not None:
+        query = query.filter(ObservationAnomaly.year >= start_year)
+    if end_year is not None:
+        query = query.filter(ObservationAnomaly.year <= end_year)
+    return query.order_by(Country.code, ObservationAnomaly.year).limit(limit).all()
+
+
+def anomaly_years(db: Session, country_id: int, indicator_id: int) -> set[int]:
+    rows = (
+        db.query(ObservationAnomaly.year)
+        .filter(ObservationAnomaly.country_id == country_id, ObservationAnomaly.indicator_id == indicator_id)
+        .all()
+    )
+    return {row[0] for row in rows}
@@ -0,0 +1,63 @@
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models import DataRevision, Observation
+
+
+def data_version(db: Session) -> tuple[int, int]:
+    """
+    Cheap marker that changes whenever observations are added or a derived table is rebuilt.
+
+    Ingestion only inserts rows, so the highest observation id moves with every write;
+    rebuilds of derived tables bump their `DataRevision` counter. One round trip: a
+    primary-key probe and a sum over a table of a few rows.
+    """
+    latest = select(func.max(Observation.id)).scalar_subquery()
+    revisions = select(func.coalesce(func.sum(DataRevision.revision), 0)).scalar_subquery()
+    observation_id, revision = db.execute(select(latest, revisions)).one()
+    return observation_id or 0, revision
+
+
+def bump_data_revision(db: Session, name: str) -> None:
+    """Mark the derived table `name` as rebuilt so cached results stop matching. The caller commits."""
+    row = db.get(DataRevision, name)
+    if row is None:
+        db.add(DataRevision(name=name, revision=1))
+    else:
+        row.revision += 1
+
+
+class VersionedCache:
+    """
+    In-process LRU for results derived from stored observations.
+
+    Entries are keyed by the database, its `data_version` and a caller key, so new data
+    simply stops matching old entries; they age out through LRU eviction.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, db: Session, key, compute):
+        """Return `(value, hit)`, calling `compute()` on a miss."""
+        full_key = (str(db.get_bind().url), data_version(db), key)
+        with self._lock:
+            if full_key in self._entries:
+                self._entries.move_to_end(full_key)
+                return self._entries[full_key], True
+        value = compute()
+        with self._lock:
+            self._entries[full_key] = value
+            self._entries.move_to_end(full_key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value, False
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
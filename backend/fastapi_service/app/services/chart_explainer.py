@@ -1,11 +1,17 @@
+import json
+import queue
 import re
+import threading
+from typing import Iterator
 
 import httpx
+from sqlalchemy.orm import Session
 
 from app.core.config import (
     CHART_EXPLAIN_PROVIDER,
     CHART_EXPLAIN_MAX_COUNTRIES,
     CHART_EXPLAIN_MAX_INDICATORS,
+    CHART_EXPLAIN_STREAM_FALLBACK_SECONDS,
     GEMINI_API_KEY,
     GEMINI_BASE_URL,
     GEMINI_MODEL,
@@ -15,7 +21,14 @@ from app.core.config import (
     OPENAI_MODEL,
     OPENAI_TIMEOUT_SECONDS,
 )
+from app.db import SessionLocal
 from app.schemas import ChartExplainRequest, ChartExplainResponse
+from app.services.explain_cache import (
+    cache_enabled,
+    explanation_key,
+    get_cached_explanation,
+    store_explanation,
+)
 
 LANGUAGE_NAMES = {
     "ru": "Russian",
@@ -216,32 +229,38 @@ def _prompt_text(payload: ChartExplainRequest, summary: str, language: str) -> s
     )
 
 
-def _openai_answer(payload: ChartExplainRequest, summary: str, language: str) -> str:
+def _openai_request(payload: ChartExplainRequest, summary: str, language: str, stream: bool = False):
+    """`(url, headers, body)` of a chat completion; `stream` asks for server-sent deltas."""
     base_url = OPENAI_BASE_URL.rstrip("/")
     prompt = _prompt_text(payload, summary, language)
-    with httpx.Client(timeout=OPENAI_TIMEOUT_SECONDS) as client:
-        response = client.post(
-            f"{base_url}/chat/completions",
-            headers={
-                "Authorization": f"Bearer {OPENAI_API_KEY}",
-                "Content-Type": "application/json",
+    body = {
+        "model": OPENAI_MODEL,
+        "temperature": 0.2,
+        "max_tokens": 700,
+        "messages": [
+            {
+                "role": "system",
+                "content": _build_system_prompt(language),
             },
-            json={
-                "model": OPENAI_MODEL,
-                "temperature": 0.2,
-                "max_tokens": 700,
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": _build_system_prompt(language),
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt,
-                    },
-                ],
+            {
+                "role": "user",
+                "content": prompt,
             },
-        )
+        ],
+    }
+    if stream:
+        body["stream"] = True
+    headers = {
+        "Authorization": f"Bearer {OPENAI_API_KEY}",
+        "Content-Type": "application/json",
+    }
+    return f"{base_url}/chat/completions", headers, body
+
+
+def _openai_answer(payload: ChartExplainRequest, summary: str, language: str) -> str:
+    url, headers, body = _openai_request(payload, summary, language)
+    with httpx.Client(timeout=OPENAI_TIMEOUT_SECONDS) as client:
+        response = client.post(url, headers=headers, json=body)
         response.raise_for_status()
         body = response.json()
 
@@ -254,47 +273,94 @@ def _openai_answer(payload: ChartExplainRequest, summary: str, language: str) ->
     return content
 
 
-def _gemini_answer(payload: ChartExplainRequest, summary: str, language: str) -> str:
+def _gemini_request(payload: ChartExplainRequest, summary: str, language: str, stream: bool = False):
+    """`(url, headers, body)` of a Gemini generation; `stream` uses the SSE variant of the method."""
     base_url = GEMINI_BASE_URL.rstrip("/")
     prompt = f"{_build_system_prompt(language)}\n\n{_prompt_text(payload, summary, language)}"
-    with httpx.Client(timeout=GEMINI_TIMEOUT_SECONDS) as client:
-        response = client.post(
-            f"{base_url}/models/{GEMINI_MODEL}:generateContent",
-            headers={
-                "x-goog-api-key": GEMINI_API_KEY,
-                "Content-Type": "application/json",
-            },
-            json={
-                "contents": [
+    method = "streamGenerateContent?alt=sse" if stream else "generateContent"
+    body = {
+        "contents": [
+            {
+                "parts": [
                     {
-                        "parts": [
-                            {
-                                "text": prompt,
-                            }
-                        ]
+                        "text": prompt,
                     }
-                ],
-                "generationConfig": {
-                    "temperature": 0.2,
-                    "maxOutputTokens": 700,
-                },
-            },
-        )
-        response.raise_for_status()
-        body = response.json()
+                ]
+            }
+        ],
+        "generationConfig": {
+            "temperature": 0.2,
+            "maxOutputTokens": 700,
+        },
+    }
+    headers = {
+        "x-goog-api-key": GEMINI_API_KEY,
+        "Content-Type": "application/json",
+    }
+    return f"{base_url}/models/{GEMINI_MODEL}:{method}", headers, body
 
+
+def _gemini_texts(body: dict) -> list[str]:
     candidates = body.get("candidates") or []
     if not candidates:
-        raise RuntimeError("Gemini returned no candidates")
-
+        return []
     parts = ((candidates[0].get("content") or {}).get("parts")) or []
-    texts = [part.get("text", "").strip() for part in parts if isinstance(part, dict)]
+    return [part.get("text", "") for part in parts if isinstance(part, dict)]
+
+
+def _gemini_answer(payload: ChartExplainRequest, summary: str, language: str) -> str:
+    url, headers, body = _gemini_request(payload, summary, language)
+    with httpx.Client(timeout=GEMINI_TIMEOUT_SECONDS) as client:
+        response = client.post(url, headers=headers, json=body)
+        response.raise_for_status()
+        body = response.json()
+
+    if not body.get("candidates"):
+        raise RuntimeError("Gemini returned no candidates")
+    texts = [text.strip() for text in _gemini_texts(body)]
     content = "\n".join([item for item in texts if item]).strip()
     if not content:
         raise RuntimeError("Gemini returned empty content")
     return content
 
 
+def _sse_payloads(response: httpx.Response) -> Iterator[dict]:
+    """JSON payloads of the `data:` lines of a server-sent event stream, up to `[DONE]`."""
+    for line in response.iter_lines():
+        if not line.startswith("data:"):
+            continue
+        data = line[len("data:") :].strip()
+        if data == "[DONE]":
+            return
+        if data:
+            yield json.loads(data)
+
+
+def _openai_stream(payload: ChartExplainRequest, summary: str, language: str) -> Iterator[str]:
+    """Answer text as OpenAI generates it."""
+    url, headers, body = _openai_request(payload, summary, language, stream=True)
+    with httpx.Client(timeout=OPENAI_TIMEOUT_SECONDS) as client:
+        with client.stream("POST", url, headers=headers, json=body) as response:
+            response.raise_for_status()
+            for chunk in _sse_payloads(response):
+                choices = chunk.get("choices") or []
+                text = (choices[0].get("delta") or {}).get("content") if choices else None
+                if text:
+                    yield text
+
+
+def _gemini_stream(payload: ChartExplainRequest, summary: str, language: str) -> Iterator[str]:
+    """Answer text as Gemini generates it."""
+    url, headers, body = _gemini_request(payload, summary, language, stream=True)
+    with httpx.Client(timeout=GEMINI_TIMEOUT_SECONDS) as client:
+        with client.stream("POST", url, headers=headers, json=body) as response:
+            response.raise_for_status()
+            for chunk in _sse_payloads(response):
+                for text in _gemini_texts(chunk):
+                    if text:
+                        yield text
+
+
 def _resolve_provider() -> str:
     provider = (CHART_EXPLAIN_PROVIDER or "").strip().lower()
     if provider == "auto":
@@ -305,7 +371,8 @@ def _resolve_provider() -> str:
     return provider or "openai"
 
 
-def explain_chart(payload: ChartExplainRequest) -> ChartExplainResponse:
+def validate_explain_request(payload: ChartExplainRequest) -> None:
+    """Raise ValueError for requests that cannot be explained."""
     question = (payload.question or "").strip()
     if not question:
         raise ValueError("question is required")
@@ -322,10 +389,11 @@ def explain_chart(payload: ChartExplainRequest) -> ChartExplainResponse:
                 f"Maximum is {CHART_EXPLAIN_MAX_COUNTRIES}."
             )
 
-    language = _resolve_language(payload)
-    summary = _build_data_summary(payload, language)
-    provider = _resolve_provider()
 
+def _unavailable_response(
+    payload: ChartExplainRequest, summary: str, language: str, provider: str
+) -> ChartExplainResponse | None:
+    """Local summary when the provider is not configured; None when it can be called."""
     if provider == "openai" and not OPENAI_API_KEY:
         return ChartExplainResponse(
             answer=_fallback_answer(payload, summary, language, warning="OPENAI_API_KEY is not set"),
@@ -354,29 +422,144 @@ def explain_chart(payload: ChartExplainRequest) -> ChartExplainResponse:
             model=None,
             warning=f"Unknown CHART_EXPLAIN_PROVIDER: {provider}",
         )
+    return None
+
+
+def _failed_response(
+    payload: ChartExplainRequest, summary: str, language: str, provider: str, exc: Exception
+) -> ChartExplainResponse:
+    engine = "Gemini" if provider == "gemini" else "OpenAI"
+    return ChartExplainResponse(
+        answer=_fallback_answer(payload, summary, language, warning=str(exc)),
+        provider="local-fallback",
+        model=None,
+        warning=f"{engine} call failed: {exc}",
+    )
+
+
+def _cache_key(payload, summary: str, language: str, provider: str, model: str, db: Session | None) -> str | None:
+    if db is None or not cache_enabled():
+        return None
+    return explanation_key(payload.question.strip(), summary, language, provider, model)
+
+
+def explain_chart(payload: ChartExplainRequest, db: Session | None = None) -> ChartExplainResponse:
+    """
+    Explain the charted datasets with the configured provider, or a local summary without one.
+
+    With a session, provider answers are cached (see `services/explain_cache.py`), so a repeated
+    question about the same data is answered from the DB with `cached=True`.
+    """
+    validate_explain_request(payload)
+    language = _resolve_language(payload)
+    summary = _build_data_summary(payload, language)
+    provider = _resolve_provider()
+    unavailable = _unavailable_response(payload, summary, language, provider)
+    if unavailable is not None:
+        return unavailable
+
+    model = GEMINI_MODEL if provider == "gemini" else OPENAI_MODEL
+    key = _cache_key(payload, summary, language, provider, model, db)
+    if key is not None:
+        entry = get_cached_explanation(db, key)
+        if entry is not None:
+            return ChartExplainResponse(answer=entry.answer, provider=provider, model=model, warning=None, cached=True)
 
     try:
         if provider == "gemini":
             answer = _gemini_answer(payload, summary, language)
-            return ChartExplainResponse(
-                answer=answer,
-                provider="gemini",
-                model=GEMINI_MODEL,
-                warning=None,
-            )
-
-        answer = _openai_answer(payload, summary, language)
-        return ChartExplainResponse(
-            answer=answer,
-            provider="openai",
-            model=OPENAI_MODEL,
-            warning=None,
-        )
+        else:
+            answer = _openai_answer(payload, summary, language)
     except Exception as exc:
-        engine = "Gemini" if provider == "gemini" else "OpenAI"
-        return ChartExplainResponse(
-            answer=_fallback_answer(payload, summary, language, warning=str(exc)),
-            provider="local-fallback",
-            model=None,
-            warning=f"{engine} call failed: {exc}",
-        )
+        return _failed_response(payload, summary, language, provider, exc)
+    if key is not None:
+        store_explanation(db, key, provider, model, answer)
+    return ChartExplainResponse(answer=answer, provider=provider, model=model, warning=None)
+
+
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def explain_chart_stream(payload: ChartExplainRequest, db: Session | None = None) -> Iterator[str]:
+    """
+    Server-sent events for `/analytics/chart/explain/stream`.
+
+    Validation, the local summary and the cache lookup happen here, before the response starts,
+    so invalid requests still fail with ValueError. The returned iterator yields:
+
+    - `meta` `{provider, model}` at once when the provider is called;
+    - `fallback` `{answer}` with the local answer built from the data summary if no token arrives within
+      `CHART_EXPLAIN_STREAM_FALLBACK_SECONDS`;
+    - `token` `{text}` for every chunk the provider streams;
+    - `done` with the complete `ChartExplainResponse` (cached, local fallback or streamed answer).
+    """
+    validate_explain_request(payload)
+    language = _resolve_language(payload)
+    summary = _build_data_summary(payload, language)
+    provider = _resolve_provider()
+    unavailable = _unavailable_response(payload, summary, language, provider)
+    if unavailable is not None:
+        return iter([_sse_event("done", unavailable.model_dump())])
+
+    model = GEMINI_MODEL if provider == "gemini" else OPENAI_MODEL
+    key = _cache_key(payload, summary, language, provider, model, db)
+    entry = get_cached_explanation(db, key) if key is not None else None
+    if entry is not None:
+        cached = ChartExplainResponse(answer=entry.answer, provider=provider, model=model, warning=None, cached=True)
+        return iter([_sse_event("done", cached.model_dump())])
+    stream = _gemini_stream if provider == "gemini" else _openai_stream
+    return _relay(stream(payload, summary, language), payload, summary, language, provider, model, key)
+
+
+def _relay(tokens, payload, summary, language, provider, model, key) -> Iterator[str]:
+    """
+    Relay provider tokens as events. The provider is read on a worker thread so the local
+    answer can be sent while its first token is still pending. The request's session is
+    closed once the response starts, so the answer is cached through a session of its own.
+    """
+    chunks: queue.Queue = queue.Queue()
+    cancelled = threading.Event()
+
+    def produce():
+        try:
+            for text in tokens:
+                if cancelled.is_set():
+                    break
+                chunks.put(("token", text))
+            chunks.put(("end", None))
+        except Exception as exc:
+            chunks.put(("error", exc))
+        finally:
+            tokens.close()
+
+    threading.Thread(target=produce, daemon=True).start()
+    parts = []
+    waiting_for_first = True
+    try:
+        yield _sse_event("meta", {"provider": provider, "model": model})
+        while True:
+            try:
+                kind, value = chunks.get(timeout=CHART_EXPLAIN_STREAM_FALLBACK_SECONDS if waiting_for_first else None)
+            except queue.Empty:
+                waiting_for_first = False
+                yield _sse_event("fallback", {"answer": _fallback_answer(payload, summary, language)})
+                continue
+            if kind == "token":
+                waiting_for_first = False
+                parts.append(value)
+                yield _sse_event("token", {"text": value})
+                continue
+            answer = "".join(parts).strip()
+            if kind == "error" or not answer:
+                error = value if kind == "error" else RuntimeError("Provider returned empty content")
+                yield _sse_event("done", _failed_response(payload, summary, language, provider, error).model_dump())
+                return
+            if key is not None:
+                with SessionLocal() as session:
+                    store_explanation(session, key, provider, model, answer)
+            done = ChartExplainResponse(answer=answer, provider=provider, model=model, warning=None)
+            yield _sse_event("done", done.model_dump())
+            return
+    finally:
+        cancelled.set()
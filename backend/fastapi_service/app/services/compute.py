@@ -0,0 +1,156 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from app.core.config import (
+    FORECAST_POOL_MAX_QUEUE,
+    FORECAST_POOL_WORKERS,
+    FORECAST_RETRY_AFTER_SECONDS,
+    FORECAST_TIMEOUT_SECONDS,
+)
+
+
+class ComputeSaturated(Exception):
+    """Every worker is busy and the queue is full; the caller should retry later."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Forecast workers are busy")
+        self.retry_after = retry_after
+
+
+class ComputeTimeout(Exception):
+    """A job did not finish before its deadline."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Forecast computation timed out")
+        self.retry_after = retry_after
+
+
+class ComputeExecutor:
+    """
+    Process pool for CPU-bound forecast work, shared by all requests.
+
+    Fits and bootstraps run in worker processes so they do not hold the GIL of the API
+    workers serving catalog and observation reads. Admission is bounded: at most
+    `workers + max_queue` jobs may be pending, further submissions raise
+    `ComputeSaturated` instead of queueing without limit.
+    """
+
+    def __init__(self, workers: int, max_queue: int, timeout: float, retry_after: int):
+        self.workers = max(int(workers), 1)
+        self.max_queue = max(int(max_queue), 0)
+        self.timeout = timeout
+        self.retry_after = retry_after
+        # spawn: forking a process that already runs server threads and DB connections is unsafe.
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timed_out = 0
+
+    def warm_up(self):
+        """Start every worker now so the first request does not pay process start-up."""
+        wait([self._pool.submit(os.getpid) for _ in range(self.workers)])
+
+    @property
+    def queue_depth(self) -> int:
+        with self._lock:
+            return max(self._pending - self.workers, 0)
+
+    def saturated(self, jobs: int = 1) -> bool:
+        with self._lock:
+            return self._pending + jobs > self.workers + self.max_queue
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "running": min(self._pending, self.workers),
+                "queue_depth": max(self._pending - self.workers, 0),
+                "max_queue": self.max_queue,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out,
+            }
+
+    def _release(self, _future: Future):
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+
+    def submit_all(self, fn, calls: list[tuple]) -> list[Future]:
+        """Submit `fn(*args)` for every args tuple, all or nothing."""
+        with self._lock:
+            if self._pending + len(calls) > self.workers + self.max_queue:
+                self._rejected += 1
+                raise ComputeSaturated(self.retry_after)
+            self._pending += len(calls)
+        futures = []
+        try:
+            for args in calls:
+                future = self._pool.submit(fn, *args)
+                future.add_done_callback(self._release)
+                futures.append(future)
+        except Exception:
+            with self._lock:
+                self._pending -= len(calls) - len(futures)
+            raise
+        return futures
+
+    def map(self, fn, calls: list[tuple], timeout: float | None = None) -> list:
+        """Results of `fn(*args)` in input order, waiting at most `timeout` seconds for all of them."""
+        futures = self.submit_all(fn, calls)
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        try:
+            return [future.result(timeout=max(deadline - time.monotonic(), 0.0)) for future in futures]
+        except FutureTimeoutError:
+            # Jobs still queued are dropped; a job already running finishes but its result is discarded.
+            for future in futures:
+                future.cancel()
+            with self._lock:
+                self._timed_out += 1
+            raise ComputeTimeout(self.retry_after) from None
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_executor: ComputeExecutor | None = None
+
+
+def start_executor(
+    workers: int = FORECAST_POOL_WORKERS,
+    max_queue: int = FORECAST_POOL_MAX_QUEUE,
+    timeout: float = FORECAST_TIMEOUT_SECONDS,
+    retry_after: int = FORECAST_RETRY_AFTER_SECONDS,
+) -> ComputeExecutor | None:
+    """Create and warm the shared pool; `workers <= 0` keeps all computation in-process."""
+    global _executor
+    shutdown_executor()
+    if workers > 0:
+        _executor = ComputeExecutor(workers, max_queue, timeout, retry_after)
+        _executor.warm_up()
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
+
+
+def get_executor() -> ComputeExecutor | None:
+    return _executor
+
+
+def run_jobs(fn, calls: list[tuple], timeout: float | None = None) -> list:
+    """`fn(*args)` for every call on the shared pool, or in-process when no pool was started."""
+    executor = _executor
+    if executor is None:
+        return [fn(*args) for args in calls]
+    return executor.map(fn, calls, timeout)
@@ -1,12 +1,22 @@
-from math import sqrt
+from math import erfc, sqrt
+from statistics import NormalDist
 
+import numpy as np
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
 from app.models import Country, Indicator, Observation
+from app.services.estimates import estimate_source
+from app.services.panel import load_cross_section, load_panel
+from app.services.transforms import fill_gaps, year_mask
+
+MIN_CORRELATION_POINTS = 3
+# Upper bound on elements per bootstrap chunk (resamples x points) to keep memory flat for large B.
+BOOTSTRAP_CHUNK_ELEMENTS = 2_000_000
 
 
 def compute_correlation(values):
-    if len(values) < 3:
+    if len(values) < MIN_CORRELATION_POINTS:
         return None
     mean_a = sum(a for a, _ in values) / len(values)
     mean_b = sum(b for _, b in values) / len(values)
@@ -25,6 +35,128 @@ def compute_correlation(values):
     return numerator / denom
 
 
+def _optional(value) -> float | None:
+    value = float(value)
+    return None if np.isnan(value) else value
+
+
+# Two-sided normal tail probability; erfc keeps precision for very small p-values.
+_erfc = np.vectorize(erfc, otypes=[float])
+
+
+def fisher_interval(r, n, confidence: float = 0.95):
+    """
+    Fisher-z confidence interval and two-sided p-value (H0: rho = 0) for Pearson r.
+
+    Works element-wise on scalars or arrays; entries with n <= 3 or undefined r are NaN.
+    """
+    r = np.asarray(r, dtype=float)
+    n = np.asarray(n, dtype=float)
+    z_crit = NormalDist().inv_cdf(0.5 + confidence / 2.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = np.arctanh(np.clip(r, -1 + 1e-12, 1 - 1e-12))
+        se = 1.0 / np.sqrt(n - 3)
+        low = np.tanh(z - z_crit * se)
+        high = np.tanh(z + z_crit * se)
+        p_value = _erfc(np.abs(z) / (se * sqrt(2.0)))
+    defined = (n > 3) & ~np.isnan(r)
+    return (
+        np.where(defined, low, np.nan),
+        np.where(defined, high, np.nan),
+        np.where(defined, p_value, np.nan),
+    )
+
+
+def bootstrap_interval(
+    x: np.ndarray,
+    y: np.ndarray,
+    resamples: int,
+    confidence: float = 0.95,
+    seed: int | None = None,
+):
+    """
+    Percentile bootstrap interval for Pearson r over paired, NaN-free samples.
+
+    Draws one (resamples x n) index matrix per chunk and evaluates every resample's
+    r with batched sums, so B=2000 on a few dozen points costs a few milliseconds.
+    """
+    n = len(x)
+    if resamples <= 0 or n < MIN_CORRELATION_POINTS:
+        return None, None
+    rng = np.random.default_rng(seed)
+    chunk = max(1, BOOTSTRAP_CHUNK_ELEMENTS // n)
+    estimates = []
+    for offset in range(0, resamples, chunk):
+        size = min(chunk, resamples - offset)
+        idx = rng.integers(0, n, size=(size, n))
+        dx = x[idx]
+        dy = y[idx]
+        dx -= dx.mean(axis=1, keepdims=True)
+        dy -= dy.mean(axis=1, keepdims=True)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            # Resamples that drew a single distinct value have zero variance and yield NaN.
+            r = np.einsum("ij,ij->i", dx, dy) / np.sqrt(np.einsum("ij,ij->i", dx, dx) * np.einsum("ij,ij->i", dy, dy))
+        estimates.append(r)
+    estimates = np.concatenate(estimates)
+    estimates = estimates[~np.isnan(estimates)]
+    if not len(estimates):
+        return None, None
+    tail = (1.0 - confidence) / 2.0 * 100
+    low, high = np.percentile(estimates, [tail, 100 - tail])
+    return float(low), float(high)
+
+
+def correlation_inference(
+    r,
+    n: int,
+    x: np.ndarray | None = None,
+    y: np.ndarray | None = None,
+    confidence: float = 0.95,
+    bootstrap: int = 0,
+):
+    """Inference fields shared by the single-pair correlation responses."""
+    low, high, p_value = fisher_interval(np.nan if r is None else r, n, confidence)
+    result = {
+        "confidence": confidence,
+        "ci_low": _optional(low),
+        "ci_high": _optional(high),
+        "p_value": _optional(p_value),
+        "bootstrap_resamples": None,
+        "bootstrap_ci_low": None,
+        "bootstrap_ci_high": None,
+    }
+    if bootstrap and x is not None and y is not None:
+        boot_low, boot_high = bootstrap_interval(x, y, bootstrap, confidence)
+        result["bootstrap_resamples"] = bootstrap
+        result["bootstrap_ci_low"] = boot_low
+        result["bootstrap_ci_high"] = boot_high
+    return result
+
+
+def _filled_overlap(series: list[dict], stored_estimates: list[set], fill: str, start_year, end_year):
+    """
+    Gap-fill both `{year: value}` series on a shared year grid and pair them up within the bounds.
+
+    Returns `(overlap, estimated)`: the (a, b) pairs and how many of them use an estimate,
+    either stored or filled here.
+    """
+    years = sorted(set(series[0]) | set(series[1]))
+    if not years:
+        return [], 0
+    grid = list(range(years[0], years[-1] + 1))
+    values = np.full((2, len(grid)), np.nan)
+    estimated = np.zeros((2, len(grid)), dtype=bool)
+    for row, points in enumerate(series):
+        for year, value in points.items():
+            values[row, year - grid[0]] = value
+            estimated[row, year - grid[0]] = year in stored_estimates[row]
+    values, filled = fill_gaps(values, fill)
+    estimated |= filled
+    keep = year_mask(grid, start_year, end_year) & ~np.isnan(values).any(axis=0)
+    overlap = [tuple(pair) for pair in values[:, keep].T.tolist()]
+    return overlap, int(estimated[:, keep].any(axis=0).sum())
+
+
 def correlation_for_country(
     db: Session,
     country_code: str,
@@ -32,7 +164,17 @@ def correlation_for_country(
     indicator_b: str,
     start_year: int | None = None,
     end_year: int | None = None,
+    confidence: float = 0.95,
+    bootstrap: int = 0,
+    fill: str | None = None,
 ):
+    """
+    Pearson correlation of two indicators over the years both are observed.
+
+    With `fill` (linear or locf) interior gaps of each series are filled first, so a year
+    missing from one indicator no longer drops the pair; stored estimates for that method
+    are used as they are.
+    """
     country = db.query(Country).filter(Country.code == country_code.upper()).first()
     ind_a = db.query(Indicator).filter(Indicator.code == indicator_a).first()
     ind_b = db.query(Indicator).filter(Indicator.code == indicator_b).first()
@@ -43,25 +185,315 @@ def correlation_for_country(
         .filter(Observation.country_id == country.id)
         .filter(Observation.indicator_id.in_([ind_a.id, ind_b.id]))
     )
-    if start_year is not None:
-        query = query.filter(Observation.year >= start_year)
-    if end_year is not None:
-        query = query.filter(Observation.year <= end_year)
+    if fill is None:
+        query = query.filter(Observation.is_estimate.isnot(True))
+        if start_year is not None:
+            query = query.filter(Observation.year >= start_year)
+        if end_year is not None:
+            query = query.filter(Observation.year <= end_year)
+    else:
+        # Gaps at the bounds are filled from neighbours outside them, so the whole series is read.
+        query = query.filter(or_(Observation.is_estimate.isnot(True), Observation.source == estimate_source(fill)))
     observations = query.order_by(Observation.year).all()
     by_indicator = {ind_a.id: {}, ind_b.id: {}}
+    stored_estimates = {ind_a.id: set(), ind_b.id: set()}
     for row in observations:
         if row.value is None:
             continue
         by_indicator[row.indicator_id][row.year] = row.value
-    overlap = []
-    for year, value in by_indicator[ind_a.id].items():
-        if year in by_indicator[ind_b.id]:
-            overlap.append((value, by_indicator[ind_b.id][year]))
+        if row.is_estimate:
+            stored_estimates[row.indicator_id].add(row.year)
+    estimated = 0
+    if fill is not None:
+        overlap, estimated = _filled_overlap(
+            [by_indicator[ind_a.id], by_indicator[ind_b.id]],
+            [stored_estimates[ind_a.id], stored_estimates[ind_b.id]],
+            fill,
+            start_year,
+            end_year,
+        )
+    else:
+        overlap = []
+        for year, value in by_indicator[ind_a.id].items():
+            if year in by_indicator[ind_b.id]:
+                overlap.append((value, by_indicator[ind_b.id][year]))
     correlation = compute_correlation(overlap)
+    pairs = np.array(overlap, dtype=float).reshape(-1, 2)
     return {
         "country": country.code,
         "indicator_a": ind_a.code,
         "indicator_b": ind_b.code,
         "points": len(overlap),
+        "estimated_points": estimated,
+        "correlation": correlation,
+        **correlation_inference(correlation, len(overlap), pairs[:, 0], pairs[:, 1], confidence, bootstrap),
+    }
+
+
+def pairwise_correlation(values: np.ndarray):
+    """
+    Pairwise-complete Pearson correlation for every column pair.
+
+    `values` has shape (..., observations, variables) with NaN marking gaps.
+    Returns `(r, n)` with shape (..., variables, variables): the correlation over
+    the observations where both columns are present and that overlap count.
+    Cells with fewer than MIN_CORRELATION_POINTS overlaps or zero variance are NaN.
+    """
+    mask = ~np.isnan(values)
+    weights = mask.astype(float)
+    # Centre each column first; Pearson r is shift-invariant and the sums below stay well-conditioned.
+    counts = weights.sum(axis=-2, keepdims=True)
+    means = np.divide(np.nansum(values, axis=-2, keepdims=True), counts, out=np.zeros_like(counts), where=counts > 0)
+    x = np.where(mask, values - means, 0.0)
+
+    n = np.einsum("...ti,...tj->...ij", weights, weights)
+    sum_x = np.einsum("...ti,...tj->...ij", x, weights)
+    sum_xx = np.einsum("...ti,...tj->...ij", x * x, weights)
+    sum_xy = np.einsum("...ti,...tj->...ij", x, x)
+    sum_y = np.swapaxes(sum_x, -1, -2)
+    sum_yy = np.swapaxes(sum_xx, -1, -2)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sum_xy - sum_x * sum_y / n
+        var_x = sum_xx - sum_x * sum_x / n
+        var_y = sum_yy - sum_y * sum_y / n
+        r = cov / np.sqrt(var_x * var_y)
+    valid = (n >= MIN_CORRELATION_POINTS) & (var_x > 1e-12) & (var_y > 1e-12)
+    r = np.where(valid, np.clip(r, -1.0, 1.0), np.nan)
+    return r, n.astype(int)
+
+
+def correlation_matrix(
+    db: Session,
+    country_codes: list[str],
+    indicator_codes: list[str],
+    start_year: int | None = None,
+    end_year: int | None = None,
+    confidence: float = 0.95,
+):
+    panel = load_panel(db, country_codes, indicator_codes, start_year, end_year)
+    # (countries, indicators, years) -> (countries, years, indicators)
+    r, n = pairwise_correlation(np.swapaxes(panel.values, 1, 2))
+    _, _, p_values = fisher_interval(r, n, confidence)
+    results = []
+    for idx, country in enumerate(panel.countries):
+        results.append(
+            {
+                "country": country,
+                "indicators": panel.indicators,
+                "correlation": [[None if np.isnan(cell) else float(cell) for cell in row] for row in r[idx]],
+                "points": n[idx].tolist(),
+                "p_values": [[_optional(cell) for cell in row] for row in p_values[idx]],
+            }
+        )
+    return results
+
+
+def rank_average(values: np.ndarray) -> np.ndarray:
+    """Ranks starting at 1 with ties sharing their average rank (as used by Spearman's rho)."""
+    _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    upper = np.cumsum(counts)
+    return (upper - (counts - 1) / 2.0)[inverse]
+
+
+def pearson(x: np.ndarray, y: np.ndarray) -> float | None:
+    if len(x) < MIN_CORRELATION_POINTS:
+        return None
+    dx = x - x.mean()
+    dy = y - y.mean()
+    denom = sqrt(float(np.dot(dx, dx)) * float(np.dot(dy, dy)))
+    if denom == 0:
+        return None
+    return max(-1.0, min(1.0, float(np.dot(dx, dy)) / denom))
+
+
+def cross_section_correlation(
+    db: Session,
+    indicator_a: str,
+    indicator_b: str,
+    year: int,
+    tolerance: int = 0,
+    include_points: bool = False,
+    confidence: float = 0.95,
+    bootstrap: int = 0,
+):
+    section = load_cross_section(db, [indicator_a, indicator_b], year, tolerance)
+    if indicator_a == indicator_b:
+        values = np.repeat(section.values, 2, axis=1)
+        source_years = np.repeat(section.source_years, 2, axis=1)
+    else:
+        values, source_years = section.values, section.source_years
+    both = ~np.isnan(values).any(axis=1)
+    x = values[both, 0]
+    y = values[both, 1]
+    correlation = pearson(x, y)
+    result = {
+        "indicator_a": indicator_a,
+        "indicator_b": indicator_b,
+        "year": year,
+        "tolerance": tolerance,
+        "points": int(both.sum()),
         "correlation": correlation,
+        "spearman": pearson(rank_average(x), rank_average(y)) if len(x) else None,
+        "scatter": None,
+        **correlation_inference(correlation, int(both.sum()), x, y, confidence, bootstrap),
+    }
+    if include_points:
+        countries = np.array(section.countries, dtype=object)[both]
+        years = source_years[both]
+        result["scatter"] = [
+            {
+                "country": country,
+                "x": float(x_value),
+                "y": float(y_value),
+                "year_a": int(year_a),
+                "year_b": int(year_b),
+            }
+            for country, x_value, y_value, (year_a, year_b) in zip(countries, x, y, years)
+        ]
+    return result
+
+
+def masked_pearson(x: np.ndarray, y: np.ndarray):
+    """
+    Pearson r along the last axis over positions where both arrays are present.
+
+    Inputs broadcast against each other and may contain NaN. Returns `(r, n)`;
+    r is NaN where fewer than MIN_CORRELATION_POINTS pairs overlap or a side is constant.
+    """
+    x, y = np.broadcast_arrays(x, y)
+    mask = ~(np.isnan(x) | np.isnan(y))
+    n = mask.sum(axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_x = np.where(mask, x, 0.0).sum(axis=-1, keepdims=True) / n[..., None]
+        mean_y = np.where(mask, y, 0.0).sum(axis=-1, keepdims=True) / n[..., None]
+        dx = np.where(mask, x - mean_x, 0.0)
+        dy = np.where(mask, y - mean_y, 0.0)
+        sxx = (dx * dx).sum(axis=-1)
+        syy = (dy * dy).sum(axis=-1)
+        r = (dx * dy).sum(axis=-1) / np.sqrt(sxx * syy)
+    valid = (n >= MIN_CORRELATION_POINTS) & (sxx > 1e-12) & (syy > 1e-12)
+    return np.where(valid, np.clip(r, -1.0, 1.0), np.nan), n
+
+
+def rolling_correlation(x: np.ndarray, y: np.ndarray, window: int):
+    """
+    Correlation over every `window`-long slice of two aligned series.
+
+    Uses cumulative sums so each window is an O(1) difference rather than a refit.
+    Returns `(r, n)` with one entry per window ending at positions window-1 .. len-1.
+    """
+    if len(x) < window:
+        return np.array([]), np.array([], dtype=int)
+    mask = ~(np.isnan(x) | np.isnan(y))
+    if mask.any():
+        # Centring on the overall means keeps the running sums well-conditioned.
+        x = x - x[mask].mean()
+        y = y - y[mask].mean()
+    w = mask.astype(float)
+    xm = np.where(mask, x, 0.0)
+    ym = np.where(mask, y, 0.0)
+    sums = np.stack([w, xm, ym, xm * xm, ym * ym, xm * ym])
+    cumulative = np.concatenate([np.zeros((sums.shape[0], 1)), np.cumsum(sums, axis=1)], axis=1)
+    n, sx, sy, sxx, syy, sxy = cumulative[:, window:] - cumulative[:, :-window]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var_x = sxx - sx * sx / n
+        var_y = syy - sy * sy / n
+        r = (sxy - sx * sy / n) / np.sqrt(var_x * var_y)
+    valid = (n >= MIN_CORRELATION_POINTS) & (var_x > 1e-12) & (var_y > 1e-12)
+    return np.where(valid, np.clip(r, -1.0, 1.0), np.nan), np.rint(n).astype(int)
+
+
+def lagged_correlation(x: np.ndarray, y: np.ndarray, max_lag: int):
+    """
+    Correlation of x[t] with y[t + k] for every k in -max_lag..max_lag in one pass.
+
+    A positive k means the first series leads the second by k periods.
+    Returns `(lags, r, n)`.
+    """
+    lags = np.arange(-max_lag, max_lag + 1)
+    length = len(y)
+    positions = np.arange(length)[None, :] + lags[:, None]
+    inside = (positions >= 0) & (positions < length)
+    padded = np.append(y, np.nan)
+    shifted = padded[np.where(inside, positions, length)]
+    r, n = masked_pearson(x[None, :], shifted)
+    return lags, r, n
+
+
+def _load_pair(db: Session, country_code: str, indicator_a: str, indicator_b: str, start_year, end_year):
+    panel = load_panel(db, [country_code], [indicator_a, indicator_b], start_year, end_year)
+    if indicator_a == indicator_b:
+        series = panel.values[0, 0]
+        return panel, series, series
+    return panel, panel.values[0, 0], panel.values[0, 1]
+
+
+def rolling_correlation_for_country(
+    db: Session,
+    country_code: str,
+    indicator_a: str,
+    indicator_b: str,
+    window: int,
+    start_year: int | None = None,
+    end_year: int | None = None,
+    confidence: float = 0.95,
+):
+    panel, x, y = _load_pair(db, country_code, indicator_a, indicator_b, start_year, end_year)
+    r, n = rolling_correlation(x, y, window)
+    low, high, p_value = fisher_interval(r, n, confidence)
+    points = [
+        {
+            "start_year": panel.years[idx],
+            "end_year": panel.years[idx + window - 1],
+            "points": int(n[idx]),
+            "correlation": _optional(r[idx]),
+            "ci_low": _optional(low[idx]),
+            "ci_high": _optional(high[idx]),
+            "p_value": _optional(p_value[idx]),
+        }
+        for idx in range(len(r))
+    ]
+    return {
+        "country": country_code.upper(),
+        "indicator_a": indicator_a,
+        "indicator_b": indicator_b,
+        "window": window,
+        "points": points,
+    }
+
+
+def lagged_correlation_for_country(
+    db: Session,
+    country_code: str,
+    indicator_a: str,
+    indicator_b: str,
+    max_lag: int,
+    start_year: int | None = None,
+    end_year: int | None = None,
+    confidence: float = 0.95,
+):
+    _, x, y = _load_pair(db, country_code, indicator_a, indicator_b, start_year, end_year)
+    lags, r, n = lagged_correlation(x, y, max_lag)
+    low, high, p_value = fisher_interval(r, n, confidence)
+    best_lag = None
+    if len(r) and not np.isnan(r).all():
+        best_lag = int(lags[np.nanargmax(np.abs(r))])
+    return {
+        "country": country_code.upper(),
+        "indicator_a": indicator_a,
+        "indicator_b": indicator_b,
+        "max_lag": max_lag,
+        "best_lag": best_lag,
+        "lags": [
+            {
+                "lag": int(lags[idx]),
+                "points": int(n[idx]),
+                "correlation": _optional(r[idx]),
+                "ci_low": _optional(low[idx]),
+                "ci_high": _optional(high[idx]),
+                "p_value": _optional(p_value[idx]),
+            }
+            for idx in range(len(lags))
+        ],
     }
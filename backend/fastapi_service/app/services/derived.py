@@ -0,0 +1,204 @@
+"""
+Derived indicators: small arithmetic expressions over stored indicator panels.
+
+Indicators are referenced in brackets, e.g. `[NY.GDP.MKTP.CD] / [SP.POP.TOTL]` or
+`pct_change([NY.GDP.MKTP.KD]) - [FP.CPI.TOTL.ZG]`. Expressions are parsed with `ast` and
+only a whitelist of nodes is accepted (numbers, + - * / **, unary minus and the functions
+in `FUNCTIONS`), so nothing user-supplied is ever executed. Evaluation runs on whole
+(country × year) arrays from one `load_panel` call.
+"""
+import ast
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.services import transforms
+from app.services.cache import VersionedCache
+from app.services.panel import load_panel
+
+MAX_EXPRESSION_LENGTH = 400
+MAX_EXPRESSION_NODES = 80
+MAX_REFERENCES = 8
+MAX_PERIODS = 30
+
+_REFERENCE_RE = re.compile(r"\[([A-Za-z0-9_.-]{3,64})\]")
+_REFERENCE_NAME_RE = re.compile(r"^_ref(\d+)$")
+_BINARY = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.divide,
+    ast.Pow: np.power,
+}
+
+# name -> (integer argument, whether it is required, allowed range)
+FUNCTIONS = {
+    "lag": ("periods", False, (1, MAX_PERIODS)),
+    "diff": ("periods", False, (1, MAX_PERIODS)),
+    "pct_change": ("periods", False, (1, MAX_PERIODS)),
+    "rolling_mean": ("window", True, (2, MAX_PERIODS)),
+    "rebase": ("year", True, (1900, 2100)),
+    "log": (None, False, None),
+}
+
+_results = VersionedCache(maxsize=256)
+
+
+class ExpressionError(ValueError):
+    """The expression is malformed or uses something outside the whitelist."""
+
+
+@dataclass(frozen=True)
+class CompiledExpression:
+    text: str
+    indicators: tuple[str, ...]
+    tree: tuple
+
+
+@lru_cache(maxsize=256)
+def compile_expression(text: str) -> CompiledExpression:
+    """Parse and validate `text` once; the result is a nested tuple tree evaluated by `_evaluate`."""
+    text = text.strip()
+    if not text:
+        raise ExpressionError("Expression is empty")
+    if len(text) > MAX_EXPRESSION_LENGTH:
+        raise ExpressionError(f"Expression is too long (max {MAX_EXPRESSION_LENGTH} characters)")
+
+    indicators: list[str] = []
+
+    def reference(match):
+        code = match.group(1)
+        if code not in indicators:
+            indicators.append(code)
+        return f"_ref{indicators.index(code)}"
+
+    try:
+        node = ast.parse(_REFERENCE_RE.sub(reference, text), mode="eval").body
+    except SyntaxError as exc:
+        raise ExpressionError(f"Invalid expression syntax: {exc.msg}") from exc
+    if not indicators:
+        raise ExpressionError("Expression must reference at least one indicator, e.g. [SP.POP.TOTL]")
+    if len(indicators) > MAX_REFERENCES:
+        raise ExpressionError(f"Too many indicators in expression (max {MAX_REFERENCES})")
+    if sum(1 for _ in ast.walk(node)) > MAX_EXPRESSION_NODES:
+        raise ExpressionError("Expression is too complex")
+    return CompiledExpression(text=text, indicators=tuple(indicators), tree=_compile(node, len(indicators)))
+
+
+def _integer_argument(node, name: str, bounds: tuple[int, int]) -> int:
+    if not (isinstance(node, ast.Constant) and type(node.value) is int):
+        raise ExpressionError(f"{name} must be an integer constant")
+    low, high = bounds
+    if not low <= node.value <= high:
+        raise ExpressionError(f"{name} must be between {low} and {high}")
+    return node.value
+
+
+def _compile(node, references: int) -> tuple:
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        try:
+            return ("const", float(node.value))
+        except OverflowError as exc:
+            raise ExpressionError("Numeric constant is out of range") from exc
+    if isinstance(node, ast.Name):
+        match = _REFERENCE_NAME_RE.match(node.id)
+        if not match or int(match.group(1)) >= references:
+            raise ExpressionError(f"Unknown name '{node.id}'; reference indicators as [CODE]")
+        return ("ref", int(match.group(1)))
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+        return ("binary", type(node.op), _compile(node.left, references), _compile(node.right, references))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        operand = _compile(node.operand, references)
+        return ("neg", operand) if isinstance(node.op, ast.USub) else operand
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS:
+        name = node.func.id
+        argument, required, bounds = FUNCTIONS[name]
+        if node.keywords:
+            raise ExpressionError(f"{name}() takes positional arguments only")
+        if not 1 + required <= len(node.args) <= 1 + (argument is not None):
+            usage = f"{name}(x, {argument})" if argument else f"{name}(x)"
+            raise ExpressionError(f"{name}() expects {usage}")
+        value = _integer_argument(node.args[1], argument, bounds) if len(node.args) > 1 else 1
+        return ("call", name, _compile(node.args[0], references), value)
+    if isinstance(node, ast.Call):
+        raise ExpressionError(f"Unknown function; allowed: {', '.join(FUNCTIONS)}")
+    raise ExpressionError(f"Unsupported syntax: {type(node).__name__}")
+
+
+def _evaluate(tree: tuple, arrays: list[np.ndarray], years: list[int]) -> np.ndarray:
+    kind = tree[0]
+    if kind == "const":
+        return np.full(arrays[0].shape, tree[1])
+    if kind == "ref":
+        return arrays[tree[1]]
+    if kind == "neg":
+        return -_evaluate(tree[1], arrays, years)
+    if kind == "binary":
+        return _BINARY[tree[1]](_evaluate(tree[2], arrays, years), _evaluate(tree[3], arrays, years))
+    name, operand, value = tree[1], _evaluate(tree[2], arrays, years), tree[3]
+    if name == "rebase":
+        return transforms.rebase(operand, years, value)
+    if name == "log":
+        return transforms.log(operand)
+    return getattr(transforms, name)(operand, value)
+
+
+def evaluate_expression(
+    db: Session,
+    expression: CompiledExpression,
+    country_codes: list[str] | None,
+    start_year: int | None = None,
+    end_year: int | None = None,
+) -> list[dict]:
+    """
+    `[{country, points: [{year, value}]}]` for the expression.
+
+    The full history is loaded so lags and rolling windows can reach before `start_year`;
+    bounds are applied to the result. Cells that are missing, infinite or undefined are
+    dropped. Without `country_codes` every country with a non-empty result is returned.
+    """
+    panel = load_panel(db, country_codes, list(expression.indicators))
+    if not panel.years:
+        return [{"country": code, "points": []} for code in country_codes or []]
+    arrays = [panel.values[:, idx, :] for idx in range(len(expression.indicators))]
+    with np.errstate(all="ignore"):
+        result = _evaluate(expression.tree, arrays, panel.years)
+    result = np.where(np.isfinite(result), result, np.nan)
+
+    years = np.array(panel.years)
+    in_range = np.ones(len(years), dtype=bool)
+    if start_year is not None:
+        in_range &= years >= start_year
+    if end_year is not None:
+        in_range &= years <= end_year
+    series = []
+    for row, country in enumerate(panel.countries):
+        keep = in_range & ~np.isnan(result[row])
+        if not keep.any() and country_codes is None:
+            continue
+        points = [{"year": int(year), "value": float(value)} for year, value in zip(years[keep], result[row, keep])]
+        series.append({"country": country, "points": points})
+    return series
+
+
+def derived_series(
+    db: Session,
+    text: str,
+    country_codes: list[str] | None,
+    start_year: int | None = None,
+    end_year: int | None = None,
+):
+    """
+    Compile (memoised) and evaluate `text`, reusing results until the stored data changes.
+
+    Returns `(expression, series, cached)`.
+    """
+    expression = compile_expression(text)
+    key = (expression.text, tuple(country_codes) if country_codes is not None else None, start_year, end_year)
+    series, cached = _results.get_or_compute(
+        db, key, lambda: evaluate_expression(db, expression, country_codes, start_year, end_year)
+    )
+    return expression, series, cached
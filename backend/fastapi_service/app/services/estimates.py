@@ -0,0 +1,59 @@
+import numpy as np
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from app.models import Observation
+from app.services.panel import pair_grid
+from app.services.transforms import fill_gaps
+
+
+def estimate_source(method: str) -> str:
+    """`Observation.source` of stored estimates, so reads can tell which fill method produced them."""
+    return f"fill_{method}"
+
+
+def refresh_estimates(
+    db: Session, method: str, country_ids: list[int] | None = None, indicator_ids: list[int] | None = None
+) -> int:
+    """
+    Rewrite the stored gap-fill estimates for the given countries × indicators (all when None).
+
+    Interior gaps of every measured series are filled with `method` and stored as
+    `is_estimate=True` rows; `method="none"` only removes old estimates. Ingestion calls this
+    for the pair it just wrote; passing no filters is a full rebuild. The caller commits.
+    Returns the rows written.
+    """
+    stale = delete(Observation).where(Observation.is_estimate.is_(True))
+    query = db.query(Observation.country_id, Observation.indicator_id, Observation.year, Observation.value).filter(
+        Observation.value.isnot(None), Observation.is_estimate.isnot(True)
+    )
+    if country_ids is not None:
+        stale = stale.where(Observation.country_id.in_(country_ids))
+        query = query.filter(Observation.country_id.in_(country_ids))
+    if indicator_ids is not None:
+        stale = stale.where(Observation.indicator_id.in_(indicator_ids))
+        query = query.filter(Observation.indicator_id.in_(indicator_ids))
+    db.execute(stale)
+    if method == "none":
+        return 0
+    rows = query.order_by(Observation.country_id, Observation.indicator_id, Observation.year).all()
+    # One (pairs × years) grid so every series is filled in a single vectorised pass.
+    pairs, first_year, values = pair_grid(rows)
+    filled, estimated = fill_gaps(values, method)
+    series, offsets = np.nonzero(estimated)
+    if not len(series):
+        return 0
+    source = estimate_source(method)
+    mappings = [
+        {
+            "country_id": int(pairs[row, 0]),
+            "indicator_id": int(pairs[row, 1]),
+            "year": first_year + int(offset),
+            "value": float(filled[row, offset]),
+            "source": source,
+            "is_estimate": True,
+        }
+        for row, offset in zip(series, offsets)
+    ]
+    db.execute(insert(Observation), mappings)
+    return len(mappings)
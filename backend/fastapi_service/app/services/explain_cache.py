@@ -0,0 +1,84 @@
+"""
+Persistent cache of chart explanations.
+
+A provider answer depends only on the prompt, so the key is a SHA-256 digest of the
+normalised question (whitespace collapsed, case folded), the data summary built from the
+datasets, the answer language, provider and model. Entries live in `chart_explanations`,
+expire `CHART_EXPLAIN_CACHE_TTL_SECONDS` after they were stored and are evicted least
+recently used first beyond `CHART_EXPLAIN_CACHE_MAX_ENTRIES`. Local fallbacks are not cached.
+"""
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import CHART_EXPLAIN_CACHE_MAX_ENTRIES, CHART_EXPLAIN_CACHE_TTL_SECONDS
+from app.models_analytics import ChartExplanation
+
+
+def normalize_question(question: str) -> str:
+    return " ".join((question or "").split()).casefold()
+
+
+def explanation_key(question: str, summary: str, language: str, provider: str, model: str | None) -> str:
+    canonical = json.dumps(
+        {
+            "question": normalize_question(question),
+            "summary": summary,
+            "language": language,
+            "provider": provider,
+            "model": model,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def cache_enabled() -> bool:
+    return CHART_EXPLAIN_CACHE_TTL_SECONDS > 0 and CHART_EXPLAIN_CACHE_MAX_ENTRIES > 0
+
+
+def _cutoff(now: datetime) -> datetime:
+    return now - timedelta(seconds=CHART_EXPLAIN_CACHE_TTL_SECONDS)
+
+
+def get_cached_explanation(db: Session, key: str) -> ChartExplanation | None:
+    """The unexpired entry for `key`, marked as just used; None on a miss."""
+    now = datetime.now(timezone.utc)
+    entry = (
+        db.query(ChartExplanation)
+        .filter(ChartExplanation.cache_key == key, ChartExplanation.created_at >= _cutoff(now))
+        .first()
+    )
+    if entry is None:
+        return None
+    entry.last_used_at = now
+    db.commit()
+    return entry
+
+
+def store_explanation(db: Session, key: str, provider: str, model: str | None, answer: str) -> None:
+    """Store an answer, dropping expired entries and the least recently used ones over the cap."""
+    now = datetime.now(timezone.utc)
+    db.execute(delete(ChartExplanation).where(ChartExplanation.cache_key == key))
+    db.execute(delete(ChartExplanation).where(ChartExplanation.created_at < _cutoff(now)))
+    db.add(
+        ChartExplanation(
+            cache_key=key, provider=provider, model=model, answer=answer, created_at=now, last_used_at=now
+        )
+    )
+    try:
+        db.flush()
+    except IntegrityError:
+        # A concurrent request stored the same explanation first.
+        db.rollback()
+        return
+    excess = db.query(func.count(ChartExplanation.id)).scalar() - CHART_EXPLAIN_CACHE_MAX_ENTRIES
+    if excess > 0:
+        oldest = select(ChartExplanation.id).order_by(ChartExplanation.last_used_at, ChartExplanation.id).limit(excess)
+        db.execute(delete(ChartExplanation).where(ChartExplanation.id.in_(oldest)))
+    db.commit()
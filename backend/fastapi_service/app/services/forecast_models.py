@@ -0,0 +1,343 @@
+"""
+Forecasting models in plain NumPy.
+
+Every model is a function `model(values, origins, horizon)`: for each origin `o` it fits on
+the first `o` observations and returns the next `horizon` step forecasts, giving an array of
+shape (len(origins), horizon). Backtests and the final forecast (origin = len(values))
+share that code path, and each model computes all origins in a single pass over the series.
+
+`fit_pooled_trends` and the ARX functions are the exception: they work on whole
+(countries, years) panels, fitting every country with shared array operations.
+"""
+
+import numpy as np
+
+HOLT_ALPHAS = np.linspace(0.1, 0.9, 9)
+HOLT_BETAS = np.array([0.05, 0.1, 0.2, 0.3, 0.5])
+DAMPING_PHIS = np.array([0.8, 0.9, 0.95, 0.98])
+AR_ORDER = 2
+AR_RIDGE = 1e-8
+PANEL_MIN_COUNTRIES = 3
+
+# Holt (phi=1) and damped trend share one (alpha, beta, phi) grid and one recursion.
+_ALPHA, _BETA, _PHI = (
+    grid.ravel()
+    for grid in np.meshgrid(HOLT_ALPHAS, HOLT_BETAS, np.concatenate([[1.0], DAMPING_PHIS]), indexing="ij")
+)
+_HOLT_COLUMNS = {"holt": _PHI == 1.0, "damped_trend": _PHI != 1.0}
+
+
+def _holt_family(values: np.ndarray, origins: np.ndarray, horizon: int, names=tuple(_HOLT_COLUMNS)) -> dict:
+    """
+    Holt's linear (phi=1) and damped-trend exponential smoothing.
+
+    The recursion runs once over the series for the whole (alpha, beta, phi) grid; for
+    each model and origin the grid point with the lowest in-sample SSE up to that origin
+    is used.
+    """
+    n = len(values)
+    level = np.full(_ALPHA.shape, values[0])
+    trend = np.full(_ALPHA.shape, values[1] - values[0])
+    levels = np.empty((n, len(_ALPHA)))
+    trends = np.empty((n, len(_ALPHA)))
+    sse = np.zeros((n, len(_ALPHA)))
+    levels[0], trends[0] = level, trend
+    # Error-correction form: level += alpha * e, trend = phi * trend + alpha * beta * e.
+    gain = _ALPHA * _BETA
+    for t in range(1, n):
+        damped = _PHI * trend
+        expected = level + damped
+        error = values[t] - expected
+        level = expected + _ALPHA * error
+        trend = damped + gain * error
+        levels[t], trends[t] = level, trend
+        # The first step only initialises the trend, so it does not count towards the fit.
+        sse[t] = sse[t - 1] + error * error if t >= 2 else 0.0
+
+    state = origins - 1
+    steps = np.arange(1, horizon + 1)
+    predictions = {}
+    for name in names:
+        best = np.argmin(np.where(_HOLT_COLUMNS[name], sse[state], np.inf), axis=1)
+        damping = _PHI[best]
+        # Sum_{i=1..h} phi^i; equals h when phi == 1.
+        multipliers = np.cumsum(damping[:, None] ** steps[None, :], axis=1)
+        predictions[name] = levels[state, best][:, None] + multipliers * trends[state, best][:, None]
+    return predictions
+
+
+def holt(values: np.ndarray, origins: np.ndarray, horizon: int) -> np.ndarray:
+    return _holt_family(values, origins, horizon, ("holt",))["holt"]
+
+
+def damped_trend(values: np.ndarray, origins: np.ndarray, horizon: int) -> np.ndarray:
+    return _holt_family(values, origins, horizon, ("damped_trend",))["damped_trend"]
+
+
+def ar(values: np.ndarray, origins: np.ndarray, horizon: int, order: int = AR_ORDER) -> np.ndarray:
+    """
+    AR(order) with intercept fitted by least squares.
+
+    Prefix sums of the design cross-products (X'X, X'y) give every origin's normal
+    equations at once; forecasts are iterated recursively for all origins together.
+    """
+    n = len(values)
+    k = order + 1
+    # Centring keeps the normal equations well conditioned for large levels; the
+    # intercept absorbs the shift, so forecasts are exact after adding it back.
+    centre = values.mean()
+    values = values - centre
+    design = np.ones((n, k))
+    for lag in range(1, order + 1):
+        design[:, lag] = np.concatenate([np.full(lag, np.nan), values[:-lag]])
+    usable = np.arange(n) >= order
+    design = np.where(usable[:, None], design, 0.0)
+    target = np.where(usable, values, 0.0)
+
+    xtx = np.concatenate([np.zeros((1, k, k)), np.cumsum(design[:, :, None] * design[:, None, :], axis=0)])
+    xty = np.concatenate([np.zeros((1, k)), np.cumsum(design * target[:, None], axis=0)])
+    rows = origins - order
+    enough = rows >= k + 1
+    gram = xtx[origins] + AR_RIDGE * np.eye(k)
+    coef = np.linalg.solve(gram, xty[origins][:, :, None])[:, :, 0]
+
+    history = np.stack([values[origins - lag] for lag in range(1, order + 1)], axis=1)
+    predictions = np.empty((len(origins), horizon))
+    for step in range(horizon):
+        forecast = coef[:, 0] + (coef[:, 1:] * history).sum(axis=1)
+        predictions[:, step] = forecast
+        history = np.concatenate([forecast[:, None], history[:, :-1]], axis=1)
+    return np.where(enough[:, None], predictions + centre, np.nan)
+
+
+def drift(values: np.ndarray, origins: np.ndarray, horizon: int) -> np.ndarray:
+    last = values[origins - 1]
+    slope = (last - values[0]) / np.maximum(origins - 1, 1)
+    return last[:, None] + slope[:, None] * np.arange(1, horizon + 1)[None, :]
+
+
+def naive(values: np.ndarray, origins: np.ndarray, horizon: int) -> np.ndarray:
+    return np.repeat(values[origins - 1][:, None], horizon, axis=1)
+
+
+STEP_MODELS = {
+    "holt": holt,
+    "damped_trend": damped_trend,
+    "ar": ar,
+    "drift": drift,
+    "naive": naive,
+}
+
+MODEL_ASSUMPTIONS = {
+    "holt": "Holt's linear exponential smoothing; alpha/beta chosen by in-sample SSE over a fixed grid.",
+    "damped_trend": "Damped-trend exponential smoothing; alpha/beta/phi chosen by in-sample SSE over a fixed grid.",
+    "ar": f"AR({AR_ORDER}) with intercept fitted by least squares on consecutive observations.",
+    "drift": "Random walk with drift (average historical change per step).",
+    "naive": "Naive forecast: last observed value carried forward.",
+    "panel": (
+        "Partially pooled linear trend across all countries with data for the indicator; each "
+        "country's slope is shrunk towards the pooled slope (empirical Bayes), so short histories "
+        "borrow the group trend. Intervals combine residual and slope uncertainty."
+    ),
+    "arx": (
+        "ARX: target regressed on its own lags and lagged driver indicators by least squares "
+        "(most recent 25 complete years). Driver future path: linear trend unless overridden by a "
+        "scenario; intervals are conditional on that path."
+    ),
+}
+
+
+def evaluate_step_models(model_names, values: np.ndarray, horizon: int, max_horizon: int, min_train: int) -> dict:
+    """
+    Backtest and forecast several step models in one pass per model.
+
+    Origins `min_train..len(values)` are evaluated together: all but the last give the
+    rolling-origin folds, the last is the forecast. Returns
+    `{name: (errors, actuals, predictions)}` where errors/actuals have shape
+    (origins, `max_horizon`) with NaN for unreachable targets.
+    """
+    n = len(values)
+    origins = np.arange(min(min_train, n), n + 1)
+    width = max(horizon, max_horizon)
+    targets = origins[:-1, None] + np.arange(max_horizon)[None, :]
+    actuals = np.where(targets < n, values[np.minimum(targets, n - 1)], np.nan)
+
+    family = [name for name in model_names if name in _HOLT_COLUMNS]
+    predicted = _holt_family(values, origins, width, family) if family else {}
+    for name in model_names:
+        if name not in predicted:
+            predicted[name] = STEP_MODELS[name](values, origins, width)
+    return {
+        name: (actuals - predicted[name][:-1, :max_horizon], actuals, predicted[name][-1, :horizon])
+        for name in model_names
+    }
+
+
+def fit_pooled_trends(years: np.ndarray, values: np.ndarray) -> dict | None:
+    """
+    Partially pooled linear trends for a (countries, years) NaN-padded panel.
+
+    Every country follows `y = mean_i + slope_i * (t - tbar_i) + e`. All per-country
+    sums come from one masked pass over the stacked panel; the pooled (within) slope is
+    `sum Sxy / sum Sxx`, and each country's own slope is shrunk towards it with
+    empirical-Bayes weight `Sxx_i / (Sxx_i + sigma^2 / tau^2)`. Countries with little
+    history (small Sxx) therefore borrow the group trend, long series keep their own.
+
+    Returns None when fewer than `PANEL_MIN_COUNTRIES` countries have a usable trend.
+    """
+    observed = ~np.isnan(values)
+    counts = observed.sum(axis=1)
+    x = np.broadcast_to((years - years[0]).astype(float), values.shape)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x_mean = np.where(observed, x, 0.0).sum(axis=1) / counts
+        y_mean = np.where(observed, values, 0.0).sum(axis=1) / counts
+    dx = np.where(observed, x - x_mean[:, None], 0.0)
+    dy = np.where(observed, values - y_mean[:, None], 0.0)
+    sxx = (dx * dx).sum(axis=1)
+    sxy = (dx * dy).sum(axis=1)
+    syy = (dy * dy).sum(axis=1)
+
+    usable = (counts >= 2) & (sxx > 0)
+    if usable.sum() < PANEL_MIN_COUNTRIES:
+        return None
+    pooled = sxy[usable].sum() / sxx[usable].sum()
+    own = np.where(usable, sxy / np.where(usable, sxx, 1.0), np.nan)
+
+    residual_df = np.maximum(counts - 2, 0)[usable].sum()
+    if residual_df > 0:
+        rss = np.where(usable, syy - own * sxy, 0.0)
+        sigma2 = max(rss.sum() / residual_df, 0.0)
+    else:
+        rss = syy - 2 * pooled * sxy + pooled * pooled * sxx
+        sigma2 = max(rss[usable].sum() / max((counts[usable] - 1).sum() - 1, 1), 0.0)
+    sigma2 = max(sigma2, 1e-12)
+    # DerSimonian-Laird between-country slope variance: excess of the precision-weighted
+    # dispersion of own slopes over what sampling noise alone would produce.
+    precision = sxx[usable] / sigma2
+    common = (precision * own[usable]).sum() / precision.sum()
+    q = (precision * (own[usable] - common) ** 2).sum()
+    scale = precision.sum() - (precision * precision).sum() / precision.sum()
+    tau2 = max((q - (usable.sum() - 1)) / scale, 1e-12)
+
+    weight = sxx / (sxx + sigma2 / tau2)
+    slope = weight * np.nan_to_num(own) + (1 - weight) * pooled
+    # Own-slope posterior variance plus the share inherited from the pooled estimate.
+    slope_var = 1.0 / (sxx / sigma2 + 1.0 / tau2) + (1 - weight) ** 2 * sigma2 / sxx[usable].sum()
+    last = observed.shape[1] - 1 - np.argmax(observed[:, ::-1], axis=1)
+    return {
+        "slope": slope,
+        "slope_var": slope_var,
+        "weight": weight,
+        "x_mean": x_mean,
+        "y_mean": y_mean,
+        "counts": counts,
+        "last_year": years[last],
+        "pooled_slope": float(pooled),
+        "sigma2": float(sigma2),
+        "tau2": float(tau2),
+        "countries": int(usable.sum()),
+    }
+
+
+def pooled_trend_forecast(fit: dict, row: int, first_year: int, horizon: int):
+    """Point forecasts and their standard errors for one row of a `fit_pooled_trends` fit."""
+    future_years = fit["last_year"][row] + np.arange(1, horizon + 1)
+    offset = (future_years - first_year) - fit["x_mean"][row]
+    predictions = fit["y_mean"][row] + fit["slope"][row] * offset
+    variance = fit["sigma2"] * (1 + 1 / fit["counts"][row]) + offset * offset * fit["slope_var"][row]
+    return future_years, predictions, np.sqrt(variance)
+
+
+def _lagged(values: np.ndarray, lag: int) -> np.ndarray:
+    """Shift along the last (year) axis so position t holds the value at t - lag."""
+    shifted = np.full(values.shape, np.nan)
+    shifted[..., lag:] = values[..., :-lag]
+    return shifted
+
+
+def arx_design(target: np.ndarray, drivers: np.ndarray, target_lags: int, driver_lags: int) -> np.ndarray:
+    """
+    Lagged design tensor of shape (countries, years, k) for every country at once.
+
+    Columns are `[1, y(t-1..p), x_1(t-1..L), ..., x_D(t-1..L)]`, built by shifting the
+    (countries, years) target and (countries, drivers, years) driver panels; cells whose
+    lags fall before the panel start are NaN.
+    """
+    columns = [np.ones(target.shape)]
+    columns += [_lagged(target, lag) for lag in range(1, target_lags + 1)]
+    for driver in range(drivers.shape[1]):
+        columns += [_lagged(drivers[:, driver], lag) for lag in range(1, driver_lags + 1)]
+    return np.stack(columns, axis=2)
+
+
+def fit_arx(design: np.ndarray, target: np.ndarray, max_rows: int):
+    """
+    Per-country least squares on the most recent `max_rows` complete rows.
+
+    The normal equations for all countries come from one einsum over the masked design
+    tensor and are solved as a batch; columns are scaled to unit RMS first so levels
+    like GDP and rates like inflation stay well conditioned together.
+
+    Returns `(coef (countries, k), sigma (countries,), rows (countries,))`.
+    """
+    complete = ~np.isnan(design).any(axis=2) & ~np.isnan(target)
+    # Keep only the last `max_rows` complete rows of each country.
+    from_end = np.cumsum(complete[:, ::-1], axis=1)[:, ::-1]
+    usable = complete & (from_end <= max_rows)
+    rows = usable.sum(axis=1)
+
+    x = np.where(usable[:, :, None], design, 0.0)
+    y = np.where(usable, target, 0.0)
+    scale = np.sqrt((x * x).sum(axis=1) / np.maximum(rows, 1)[:, None])
+    scale = np.where(scale > 0, scale, 1.0)
+    x = x / scale[:, None, :]
+    gram = np.einsum("ctk,ctl->ckl", x, x) + AR_RIDGE * np.eye(design.shape[2])
+    moments = np.einsum("ctk,ct->ck", x, y)
+    coef = np.linalg.solve(gram, moments[:, :, None])[:, :, 0] / scale
+
+    fitted = np.einsum("ctk,ck->ct", np.where(usable[:, :, None], design, 0.0), coef)
+    residuals = np.where(usable, target - fitted, 0.0)
+    dof = np.maximum(rows - design.shape[2], 1)
+    sigma = np.sqrt((residuals * residuals).sum(axis=1) / dof)
+    return coef, sigma, rows
+
+
+def arx_forecast(
+    coef: np.ndarray,
+    sigma: np.ndarray,
+    target: np.ndarray,
+    drivers: np.ndarray,
+    origins: np.ndarray,
+    target_lags: int,
+    driver_lags: int,
+    horizon: int,
+):
+    """
+    Recursive multi-step ARX forecasts from each country's origin, all countries per step.
+
+    `target` is (countries, years + horizon) history; `drivers` is (countries, drivers,
+    years + horizon) with the future path already filled in. Standard errors follow the
+    AR impulse response and are conditional on the driver path.
+
+    Returns `(predictions, errors)`, both (countries, horizon).
+    """
+    countries = np.arange(len(origins))
+    history = target.copy()
+    predictions = np.empty((len(origins), horizon))
+    for step in range(horizon):
+        t = origins + 1 + step
+        row = [np.ones(len(origins))]
+        row += [history[countries, t - lag] for lag in range(1, target_lags + 1)]
+        for driver in range(drivers.shape[1]):
+            row += [drivers[countries, driver, t - lag] for lag in range(1, driver_lags + 1)]
+        predictions[:, step] = (coef * np.stack(row, axis=1)).sum(axis=1)
+        history[countries, t] = predictions[:, step]
+
+    phi = coef[:, 1 : target_lags + 1]
+    psi = np.zeros((len(origins), horizon))
+    psi[:, 0] = 1.0
+    for step in range(1, horizon):
+        for lag in range(1, min(step, target_lags) + 1):
+            psi[:, step] += phi[:, lag - 1] * psi[:, step - lag]
+    errors = sigma[:, None] * np.sqrt(np.cumsum(psi * psi, axis=1))
+    return predictions, errors
@@ -1,21 +1,223 @@
+import hashlib
+import json
+import time
 from dataclasses import dataclass
 from typing import List
 
 import numpy as np
+from sqlalchemy import delete, func, insert, select
 from sqlalchemy.orm import Session
 
+from app.core.config import (
+    FORECAST_PARALLEL_MIN_SERIES,
+    FORECAST_POOL_WORKERS,
+    FORECAST_PRECOMPUTE_HORIZON,
+    FORECAST_PRECOMPUTE_MODEL,
+)
 from app.models import Country, Indicator, Observation
-from app.models_forecast import ForecastPoint, ForecastRun
+from app.models_forecast import ForecastPoint, ForecastPrecomputeRun, ForecastRun
+from app.services.forecast_models import (
+    MODEL_ASSUMPTIONS,
+    STEP_MODELS,
+    arx_design,
+    arx_forecast,
+    evaluate_step_models,
+    fit_arx,
+    fit_pooled_trends,
+    pooled_trend_forecast,
+)
+from app.services.compute import run_jobs
+from app.services.panel import load_panel
 
 
 @dataclass
 class ForecastResult:
     run: ForecastRun
     points: List[ForecastPoint]
+    reused: bool = False
 
 
 MAX_TRAINING_POINTS = 25
 MIN_TRAINING_POINTS = 8
+INTERVAL_Z = 1.96
+BACKTEST_MIN_TRAIN = 5
+BACKTEST_MAX_HORIZON = 3
+
+LINEAR_TREND = "linear_trend"
+AUTO_MODEL = "auto"
+PANEL_MODEL = "panel"
+ARX_MODEL = "arx"
+# Complete design rows required beyond the number of ARX coefficients.
+ARX_MIN_DOF = 3
+# Pooled trends borrow strength across countries, so two points are enough for a slope.
+PANEL_MIN_POINTS = 2
+FORECAST_MODELS = (LINEAR_TREND, *STEP_MODELS)
+
+LINEAR_TREND_ASSUMPTIONS = (
+    "Linear trend on recent historical values (up to last 25 years); "
+    "training values winsorized at 5th/95th percentile; residual std used for intervals."
+)
+
+
+BOOTSTRAP_PATHS = 2000
+BOOTSTRAP_SEED = 0
+# Bootstrap lower/upper bounds; the same 95% coverage as the normal interval.
+BOOTSTRAP_BOUNDS = (0.025, 0.975)
+
+
+@dataclass(frozen=True)
+class IntervalOptions:
+    """
+    How prediction intervals are built.
+
+    `normal` keeps the analytic `±1.96 × std` bands. `bootstrap` simulates `paths` future
+    paths from resampled residuals (optionally refitting the linear trend on every
+    resampled history) and reports `quantiles` per year alongside 95% bounds.
+    """
+
+    method: str = "normal"
+    quantiles: tuple[float, ...] = ()
+    paths: int = BOOTSTRAP_PATHS
+    refit: bool = False
+
+    def params(self) -> dict:
+        if self.method == "normal":
+            return {}
+        return {
+            "interval": self.method,
+            "quantiles": list(self.quantiles),
+            "paths": self.paths,
+            "refit": self.refit,
+            "seed": BOOTSTRAP_SEED,
+        }
+
+
+NORMAL_INTERVAL = IntervalOptions()
+
+
+@dataclass(frozen=True)
+class ArxOptions:
+    """
+    Driver indicators and lag orders for `model=arx`.
+
+    `scenario` holds `(driver, year, value)` overrides of the drivers' future path; years
+    not overridden follow each driver's linear trend.
+    """
+
+    drivers: tuple[str, ...]
+    target_lags: int = 1
+    driver_lags: int = 1
+    scenario: tuple[tuple[str, int, float], ...] = ()
+
+    def params(self) -> dict:
+        return {
+            "drivers": list(self.drivers),
+            "target_lags": self.target_lags,
+            "driver_lags": self.driver_lags,
+            "scenario": [list(item) for item in sorted(self.scenario)],
+            "max_points": MAX_TRAINING_POINTS,
+        }
+
+
+# Bump when model code changes in a way that should invalidate stored runs.
+# 2: fingerprints cover the raw stored series rather than the sanitised training input.
+FINGERPRINT_VERSION = 2
+LINEAR_TREND_PARAMS = {
+    "max_points": MAX_TRAINING_POINTS,
+    "winsorize": [5, 95],
+    "interval_z": INTERVAL_Z,
+    "backtest_horizon": BACKTEST_MAX_HORIZON,
+}
+
+
+def forecast_fingerprint(
+    country_code: str,
+    indicator_code: str,
+    years,
+    values,
+    model_name: str,
+    params: dict,
+    horizon: int,
+) -> str:
+    """
+    Content address of a forecast: sha256 over the stored (year, value) pairs, the
+    model name and parameters, and the horizon. Floats are serialised with `repr` so
+    any change in the stored data produces a different fingerprint.
+
+    Callers pass the raw stored series, not the sanitised training input: trimming and
+    winsorising are determined by the parameters, and the per-series and panel
+    sanitisers may differ in the last bits, which would make identical data miss.
+    """
+    payload = {
+        "version": FINGERPRINT_VERSION,
+        "country": country_code.upper(),
+        "indicator": indicator_code,
+        "series": [[int(year), repr(float(value))] for year, value in zip(years, values)],
+        "model": model_name,
+        "params": params,
+        "horizon": int(horizon),
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def forecast_params_digest(country_code: str, indicator_code: str, model_name: str, params: dict, horizon: int) -> str:
+    """
+    sha256 over every fingerprint input except the series. Runs sharing it were requested
+    with the same model (`auto` stays `auto`, whichever model won), parameters and horizon,
+    so only their training data differs; retention keeps the newest of them.
+    """
+    payload = {
+        "version": FINGERPRINT_VERSION,
+        "country": country_code.upper(),
+        "indicator": indicator_code,
+        "model": model_name,
+        "params": params,
+        "horizon": int(horizon),
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def find_runs_by_fingerprint(db: Session, fingerprints: list[str]) -> dict[str, ForecastRun]:
+    """Latest stored run for each fingerprint, with points ordered by year."""
+    if not fingerprints:
+        return {}
+    runs = (
+        db.query(ForecastRun)
+        .filter(ForecastRun.fingerprint.in_(fingerprints))
+        .order_by(ForecastRun.id)
+        .all()
+    )
+    return {run.fingerprint: run for run in runs}
+
+
+def load_run_points(db: Session, run_ids: list[int]) -> dict[int, list[ForecastPoint]]:
+    points: dict[int, list[ForecastPoint]] = {run_id: [] for run_id in run_ids}
+    if not run_ids:
+        return points
+    rows = (
+        db.query(ForecastPoint)
+        .filter(ForecastPoint.run_id.in_(run_ids))
+        .order_by(ForecastPoint.run_id, ForecastPoint.year)
+        .all()
+    )
+    for row in rows:
+        points[row.run_id].append(row)
+    return points
+
+
+def format_metrics(std: float, backtest: dict | None, std_label: str = "residual_std") -> str:
+    metrics = f"{std_label}={std:.4f}"
+    if not backtest:
+        return metrics
+    first, *further = backtest["horizons"]
+    metrics = f"{metrics}; backtest_points={first['points']}; mae={first['mae']:.4f}; rmse={first['rmse']:.4f}"
+    if first["mape"] is not None:
+        metrics = f"{metrics}; mape={first['mape']:.2f}%"
+    for item in further:
+        metrics = f"{metrics}; rmse_h{item['horizon']}={item['rmse']:.4f}"
+    return metrics
 
 
 def prepare_series(db: Session, country_code: str, indicator_code: str):
@@ -27,6 +229,7 @@ def prepare_series(db: Session, country_code: str, indicator_code: str):
         db.query(Observation)
         .filter(Observation.country_id == country.id)
         .filter(Observation.indicator_id == indicator.id)
+        .filter(Observation.is_estimate.isnot(True))
         .order_by(Observation.year)
         .all()
     )
@@ -73,33 +276,322 @@ def linear_forecast(values, years, horizon):
     return future_years, predictions, std
 
 
-def backtest_linear(values, years, test_points: int = 5):
+def backtest_linear_panel(
+    years: np.ndarray,
+    values: np.ndarray,
+    max_horizon: int = BACKTEST_MAX_HORIZON,
+    min_train: int = BACKTEST_MIN_TRAIN,
+):
     """
-    Simple rolling-origin backtest for linear trend model.
+    Rolling-origin backtest of the linear trend for every row of a (series, years) array.
+
+    Each origin t trains on the first t observed points of a row and predicts the next
+    1..`max_horizon` observed points. Prefix sums of x, y, x^2 and xy make every origin an
+    O(1) update instead of a refit, and all rows, origins and horizons are evaluated at once.
 
-    Fits on the prefix and predicts the next observed point.
-    Returns MAE/RMSE on the last `test_points` observations.
+    Returns `(errors, actuals)` with shape (series, origins, horizons); cells without a
+    target (or a degenerate fit) are NaN.
     """
-    if len(values) < 10:
+    series, length = values.shape
+    horizons = np.arange(1, max_horizon + 1)
+    origins = np.arange(min_train, max(length, min_train))
+    if not series or not len(origins):
+        empty = np.full((series, 0, max_horizon), np.nan)
+        return empty, empty
+
+    observed = ~np.isnan(values)
+    counts = observed.sum(axis=1)
+    # Left-align each row's observed points so prefix length == number of training points.
+    order = np.argsort(~observed, axis=1, kind="stable")
+    y = np.take_along_axis(values, order, axis=1)
+    x = np.take_along_axis(np.broadcast_to((years - years[0]).astype(float), values.shape), order, axis=1)
+    aligned = np.arange(length)[None, :] < counts[:, None]
+    x0 = np.where(aligned, x, 0.0)
+    y0 = np.where(aligned, y, 0.0)
+
+    sums = np.stack([x0, y0, x0 * x0, x0 * y0])
+    prefix = np.concatenate([np.zeros(sums.shape[:2] + (1,)), np.cumsum(sums, axis=2)], axis=2)
+    sx, sy, sxx, sxy = prefix[:, :, origins]
+    n = origins.astype(float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        denom = n * sxx - sx * sx
+        slope = (n * sxy - sx * sy) / denom
+        intercept = (sy - slope * sx) / n
+
+    targets = origins[:, None] + horizons[None, :] - 1
+    clipped = np.minimum(targets, length - 1)
+    reachable = (targets[None, :, :] < counts[:, None, None]) & (denom > 1e-12)[:, :, None]
+    predicted = slope[:, :, None] * x[:, clipped] + intercept[:, :, None]
+    actuals = np.where(reachable, y[:, clipped], np.nan)
+    return actuals - predicted, actuals
+
+
+def summarize_backtest(errors: np.ndarray, actuals: np.ndarray):
+    """MAE/RMSE/MAPE per horizon for each row of `backtest_linear_panel` output."""
+    valid = ~np.isnan(errors)
+    points = valid.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        abs_errors = np.abs(errors)
+        mae = np.nansum(abs_errors, axis=1) / points
+        rmse = np.sqrt(np.nansum(errors * errors, axis=1) / points)
+        relative = np.where(valid & (actuals != 0), abs_errors / np.abs(actuals), np.nan)
+        mape = np.nansum(relative, axis=1) / (~np.isnan(relative)).sum(axis=1) * 100
+    summaries = []
+    for row in range(errors.shape[0]):
+        horizons = [
+            {
+                "horizon": h + 1,
+                "points": int(points[row, h]),
+                "mae": float(mae[row, h]),
+                "rmse": float(rmse[row, h]),
+                "mape": None if np.isnan(mape[row, h]) else float(mape[row, h]),
+            }
+            for h in range(errors.shape[2])
+            if points[row, h]
+        ]
+        summaries.append({"origins": int(points[row, 0]), "horizons": horizons} if horizons else None)
+    return summaries
+
+
+def rolling_origin_backtest(
+    values,
+    years,
+    max_horizon: int = BACKTEST_MAX_HORIZON,
+    min_train: int = BACKTEST_MIN_TRAIN,
+):
+    """
+    Backtest a single chronological series over all origins and horizons 1..`max_horizon`.
+
+    Returns `{"origins", "horizons": [{"horizon", "points", "mae", "rmse", "mape"}]}`
+    or None when the series is too short to produce any forecast error.
+    """
+    if not len(values):
         return None
+    years = np.asarray(years, dtype=int)
+    errors, actuals = backtest_linear_panel(
+        years, np.asarray(values, dtype=float)[None, :], max_horizon, min_train
+    )
+    return summarize_backtest(errors, actuals)[0]
+
+
+def model_params(model_name: str, interval: IntervalOptions = NORMAL_INTERVAL) -> dict:
+    """Parameters folded into the fingerprint so each model and interval mode caches independently."""
+    params = LINEAR_TREND_PARAMS
+    if model_name != LINEAR_TREND:
+        params = {**LINEAR_TREND_PARAMS, "interval": "backtest_rmse_sqrt_h"}
+    extra = interval.params()
+    return {**params, **extra} if extra else params
+
+
+def bootstrap_linear_paths(
+    years: np.ndarray, values: np.ndarray, horizon: int, paths: int, refit: bool, rng: np.random.Generator
+) -> np.ndarray:
+    """
+    Simulated future values of a linear trend, shape (paths, horizon).
+
+    Residuals are rescaled by sqrt(n / (n - 2)) to undo the OLS shrinkage. With `refit`
+    every path gets its own history `fitted + resampled residuals`, and all paths are
+    refitted at once in closed form, so parameter uncertainty widens the far horizons.
+    """
     n = len(values)
-    k = max(1, min(int(test_points), n - 5))
-    errors = []
-    for idx in range(n - k, n):
-        train_x = np.array(years[:idx])
-        train_y = np.array(values[:idx])
-        if len(train_y) < 5:
-            continue
-        slope, intercept = np.polyfit(train_x, train_y, deg=1)
-        pred = float(slope * years[idx] + intercept)
-        actual = float(values[idx])
-        errors.append(actual - pred)
-    if not errors:
-        return None
-    abs_errors = [abs(e) for e in errors]
-    mae = float(np.mean(abs_errors))
-    rmse = float(np.sqrt(np.mean([e * e for e in errors])))
-    return {"points": len(errors), "mae": mae, "rmse": rmse}
+    x = (years - years[-1]).astype(float)
+    x_mean = x.mean()
+    sxx = ((x - x_mean) ** 2).sum()
+    slope = ((x - x_mean) * (values - values.mean())).sum() / sxx
+    intercept = values.mean() - slope * x_mean
+    fitted = intercept + slope * x
+    residuals = (values - fitted) * np.sqrt(n / max(n - 2, 1))
+    steps = np.arange(1, horizon + 1, dtype=float)
+
+    if refit:
+        histories = fitted[None, :] + residuals[rng.integers(0, n, size=(paths, n))]
+        means = histories.mean(axis=1)
+        slopes = (histories - means[:, None]) @ (x - x_mean) / sxx
+        centre = (means - slopes * x_mean)[:, None] + slopes[:, None] * steps[None, :]
+    else:
+        centre = (intercept + slope * steps)[None, :]
+    return centre + residuals[rng.integers(0, n, size=(paths, horizon))]
+
+
+def bootstrap_step_paths(
+    predictions: np.ndarray, errors: np.ndarray, paths: int, rng: np.random.Generator
+) -> np.ndarray:
+    """
+    Simulated future values of a step model, shape (paths, horizon).
+
+    One-step backtest errors are resampled and accumulated along each path, so the
+    spread grows with the horizon the way the recursive forecast's error does.
+    """
+    draws = errors[rng.integers(0, len(errors), size=(paths, len(predictions)))]
+    return predictions[None, :] + np.cumsum(draws, axis=1)
+
+
+def path_quantiles(simulated: np.ndarray, quantiles) -> np.ndarray:
+    """Quantiles per horizon of a (paths, horizon) array; returns shape (len(quantiles), horizon)."""
+    return np.quantile(simulated, np.asarray(quantiles, dtype=float), axis=0)
+
+
+def evaluate_models(model_names, years: np.ndarray, values: np.ndarray, horizon: int) -> dict:
+    """
+    `{name: (errors, actuals, predictions)}` for one sanitised series, where errors and
+    actuals are rolling-origin backtest arrays of shape (origins, horizons).
+
+    Step models produce their forecast in the same pass as the backtest; the linear trend
+    is backtested with the prefix-sum engine and fitted only if it is used (predictions None).
+    """
+    step = [name for name in model_names if name != LINEAR_TREND]
+    evaluated = (
+        evaluate_step_models(step, values, horizon, BACKTEST_MAX_HORIZON, BACKTEST_MIN_TRAIN) if step else {}
+    )
+    if LINEAR_TREND in model_names:
+        errors, actuals = backtest_linear_panel(years, values[None, :])
+        evaluated[LINEAR_TREND] = (errors[0], actuals[0], None)
+    return evaluated
+
+
+def select_model(evaluated: dict):
+    """
+    Pick the candidate with the lowest backtest RMSE; returns `(best, scores)`.
+
+    Only (origin, horizon) cells that every candidate can predict are scored, so a model
+    that abstains on hard folds (e.g. AR on short prefixes) gets no advantage.
+    """
+    common = np.all([~np.isnan(errors) for errors, _, _ in evaluated.values()], axis=0)
+    scores = {}
+    for name, (errors, _, _) in evaluated.items():
+        scores[name] = float(np.sqrt(np.mean(errors[common] ** 2))) if common.any() else float("nan")
+    finite = {name: score for name, score in scores.items() if np.isfinite(score)}
+    best = min(finite, key=finite.get) if finite else LINEAR_TREND
+    return best, scores
+
+
+def compute_forecast(
+    years,
+    values,
+    horizon: int,
+    model_name: str = LINEAR_TREND,
+    interval: IntervalOptions = NORMAL_INTERVAL,
+) -> dict:
+    """
+    Fit `model_name` on a sanitised series and return plain Python data.
+
+    Pure function of its inputs (no DB access) so it can run in a worker process.
+    Returns `{"model_name", "assumptions", "metrics", "points": [{year, value, lower, upper, quantiles}]}`;
+    for `auto` every candidate is backtested on the same folds and `model_name` is the winner.
+    """
+    years = np.asarray(years, dtype=int)
+    values = np.asarray(values, dtype=float)
+    candidates = FORECAST_MODELS if model_name == AUTO_MODEL else (model_name,)
+    evaluated = evaluate_models(candidates, years, values, horizon)
+    scores = None
+    if model_name == AUTO_MODEL:
+        model_name, scores = select_model(evaluated)
+    errors, actuals, predictions = evaluated[model_name]
+    backtest = summarize_backtest(errors[None], actuals[None])[0]
+    future_years = np.arange(years[-1] + 1, years[-1] + horizon + 1)
+    one_step = errors[:, 0][~np.isnan(errors[:, 0])]
+
+    if model_name == LINEAR_TREND:
+        _, predictions, std = linear_forecast(values.tolist(), years.tolist(), horizon)
+        predictions = np.asarray(predictions, dtype=float)
+        lower = predictions - INTERVAL_Z * std
+        upper = predictions + INTERVAL_Z * std
+        assumptions = LINEAR_TREND_ASSUMPTIONS
+        metrics = format_metrics(std, backtest)
+    else:
+        if backtest:
+            std = backtest["horizons"][0]["rmse"]
+        else:
+            std = float(np.std(np.diff(values))) if len(values) > 2 else 0.0
+        # One-step error grows like a random walk with the horizon.
+        spread = INTERVAL_Z * std * np.sqrt(np.arange(1, horizon + 1))
+        lower = predictions - spread
+        upper = predictions + spread
+        assumptions = (
+            "Recent historical values (up to last 25 years) winsorized at 5th/95th percentile; "
+            f"{MODEL_ASSUMPTIONS[model_name]} Intervals from one-step backtest RMSE scaled by sqrt(h)."
+        )
+        metrics = format_metrics(std, backtest, std_label="interval_std")
+
+    quantiles = None
+    if interval.method == "bootstrap" and (model_name == LINEAR_TREND or len(one_step)):
+        rng = np.random.default_rng(BOOTSTRAP_SEED)
+        if model_name == LINEAR_TREND:
+            simulated = bootstrap_linear_paths(years, values, horizon, interval.paths, interval.refit, rng)
+            method = "refitted residual bootstrap" if interval.refit else "residual bootstrap"
+        else:
+            simulated = bootstrap_step_paths(predictions, one_step, interval.paths, rng)
+            method = "bootstrap of accumulated one-step backtest errors"
+        levels = BOOTSTRAP_BOUNDS + tuple(interval.quantiles)
+        table = path_quantiles(simulated, levels)
+        lower, upper = table[0], table[1]
+        if interval.quantiles:
+            quantiles = [
+                {f"{q:g}": float(row[step]) for q, row in zip(interval.quantiles, table[2:])}
+                for step in range(horizon)
+            ]
+        assumptions = f"{assumptions} Intervals replaced by 95% {method} over {interval.paths} simulated paths."
+
+    if scores is not None:
+        assumptions = f"Auto-selected by lowest backtest RMSE across candidates. {assumptions}"
+        ranked = ", ".join(f"{name}={score:.4f}" for name, score in sorted(scores.items(), key=lambda item: item[1]))
+        metrics = f"{metrics}; auto_rmse: {ranked}"
+    return {
+        "model_name": model_name,
+        "assumptions": assumptions,
+        "metrics": metrics,
+        "points": [
+            {
+                "year": int(year),
+                "value": float(predictions[step]),
+                "lower": float(lower[step]),
+                "upper": float(upper[step]),
+                "quantiles": quantiles[step] if quantiles else None,
+            }
+            for step, year in enumerate(future_years)
+        ],
+    }
+
+
+def _compute_chunk(chunk, horizon: int, model_name: str, interval: IntervalOptions = NORMAL_INTERVAL):
+    return [compute_forecast(years, values, horizon, model_name, interval) for years, values in chunk]
+
+
+def compute_forecasts(
+    series: list, horizon: int, model_name: str, interval: IntervalOptions = NORMAL_INTERVAL
+) -> list[dict]:
+    """
+    `compute_forecast` over many `(years, values)` pairs, in input order.
+
+    The fits run on the shared compute pool (`services.compute`): small batches as one
+    job, large ones split into one chunk per worker. Raises `ComputeSaturated` when the
+    pool is full and `ComputeTimeout` past the deadline.
+    """
+    if not series:
+        return []
+    workers = max(min(FORECAST_POOL_WORKERS, len(series)), 1)
+    if len(series) < FORECAST_PARALLEL_MIN_SERIES:
+        workers = 1
+    size = -(-len(series) // workers)
+    chunks = [series[start : start + size] for start in range(0, len(series), size)]
+    results = run_jobs(_compute_chunk, [(chunk, horizon, model_name, interval) for chunk in chunks])
+    return [item for chunk in results for item in chunk]
+
+
+def point_row(point: dict) -> dict:
+    """Column values for a `ForecastPoint` built from a `compute_forecast` point."""
+    quantiles = point.get("quantiles")
+    return {**point, "quantiles": json.dumps(quantiles, sort_keys=True) if quantiles else None}
+
+
+def point_dict(point: ForecastPoint) -> dict:
+    return {
+        "year": point.year,
+        "value": point.value,
+        "lower": point.lower,
+        "upper": point.upper,
+        "quantiles": json.loads(point.quantiles) if point.quantiles else None,
+    }
 
 
 def run_forecast(
@@ -107,45 +599,563 @@ def run_forecast(
     country_code: str,
     indicator_code: str,
     horizon: int,
-    model_name: str = "linear_trend",
+    model_name: str = LINEAR_TREND,
+    interval: IntervalOptions = NORMAL_INTERVAL,
 ):
     country, indicator, series = prepare_series(db, country_code, indicator_code)
     if not series or len(series) < MIN_TRAINING_POINTS:
         return None
-    values = [row.value for row in series if row.value is not None]
-    years = [row.year for row in series if row.value is not None]
-    years, values = sanitize_training_series(years, values)
+    raw_values = [row.value for row in series if row.value is not None]
+    raw_years = [row.year for row in series if row.value is not None]
+    years, values = sanitize_training_series(raw_years, raw_values)
     if len(values) < MIN_TRAINING_POINTS:
         return None
-    future_years, predictions, std = linear_forecast(values, years, horizon)
-    backtest = backtest_linear(values, years, test_points=5) or {}
-    metrics = f"residual_std={std:.4f}"
-    if backtest:
-        metrics = f"{metrics}; backtest_points={backtest.get('points')}; mae={backtest.get('mae'):.4f}; rmse={backtest.get('rmse'):.4f}"
+    params = model_params(model_name, interval)
+    fingerprint = forecast_fingerprint(country.code, indicator.code, raw_years, raw_values, model_name, params, horizon)
+    existing = find_runs_by_fingerprint(db, [fingerprint]).get(fingerprint)
+    if existing:
+        return ForecastResult(run=existing, points=load_run_points(db, [existing.id])[existing.id], reused=True)
+
+    result = compute_forecasts([(years, values)], horizon, model_name, interval)[0]
     run = ForecastRun(
         country_id=country.id,
         target_indicator_id=indicator.id,
-        model_name=model_name,
+        model_name=result["model_name"],
         horizon_years=horizon,
-        assumptions=(
-            "Linear trend on recent historical values (up to last 25 years); "
-            "training values winsorized at 5th/95th percentile; residual std used for intervals."
-        ),
-        metrics=metrics,
+        assumptions=result["assumptions"],
+        metrics=result["metrics"],
+        fingerprint=fingerprint,
+        params_digest=forecast_params_digest(country.code, indicator.code, model_name, params, horizon),
     )
     db.add(run)
     db.flush()
-    points = []
-    for year, value in zip(future_years, predictions):
-        points.append(
-            ForecastPoint(
-                run_id=run.id,
-                year=year,
-                value=float(value),
-                lower=float(value - 1.96 * std),
-                upper=float(value + 1.96 * std),
-            )
-        )
+    points = [ForecastPoint(run_id=run.id, **point_row(point)) for point in result["points"]]
     db.add_all(points)
     db.commit()
     return ForecastResult(run=run, points=points)
+
+
+def row_percentiles(values: np.ndarray, q: float) -> np.ndarray:
+    """
+    Per-row percentile ignoring NaN, with `np.percentile`'s linear interpolation (equal up to
+    floating-point rounding, not bit for bit).
+
+    `np.nanpercentile` loops over rows internally; sorting once (NaN sorts last) and
+    interpolating with gathered indices keeps the whole panel in a few array operations.
+    """
+    ordered = np.sort(values, axis=1)
+    counts = (~np.isnan(values)).sum(axis=1)
+    position = (q / 100.0) * np.maximum(counts - 1, 0)
+    low = np.floor(position).astype(int)
+    high = np.minimum(low + 1, np.maximum(counts - 1, 0))
+    low_value = np.take_along_axis(ordered, low[:, None], axis=1)[:, 0]
+    high_value = np.take_along_axis(ordered, high[:, None], axis=1)[:, 0]
+    return low_value + (high_value - low_value) * (position - low)
+
+
+def sanitize_training_panel(values: np.ndarray, max_points: int = MAX_TRAINING_POINTS) -> np.ndarray:
+    """
+    Row-wise equivalent of `sanitize_training_series` for a (series, years) NaN-padded array.
+
+    Keeps the last `max_points` observed values of each row and winsorizes rows with at
+    least MIN_TRAINING_POINTS values at their own 5th/95th percentiles.
+    """
+    observed = ~np.isnan(values)
+    remaining = np.cumsum(observed[:, ::-1], axis=1)[:, ::-1]
+    values = np.where(observed & (remaining <= max_points), values, np.nan)
+    counts = (~np.isnan(values)).sum(axis=1)
+    eligible = counts >= MIN_TRAINING_POINTS
+    if eligible.any():
+        lower = row_percentiles(values[eligible], 5)
+        upper = row_percentiles(values[eligible], 95)
+        values[eligible] = np.clip(values[eligible], lower[:, None], upper[:, None])
+    return values
+
+
+def fit_linear_trends(years: np.ndarray, values: np.ndarray):
+    """
+    Closed-form least-squares trend for every row of a NaN-padded (series, years) array.
+
+    Returns `(slope, intercept, residual_std, counts)` per row; rows with fewer than two
+    points or no spread in years get NaN coefficients.
+    """
+    mask = ~np.isnan(values)
+    counts = mask.sum(axis=1)
+    # Centre years for conditioning; the intercept is shifted back afterwards.
+    origin = float(years[0]) if len(years) else 0.0
+    x = np.broadcast_to(years.astype(float) - origin, values.shape)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_x = np.where(mask, x, 0.0).sum(axis=1) / counts
+        mean_y = np.where(mask, values, 0.0).sum(axis=1) / counts
+        dx = np.where(mask, x - mean_x[:, None], 0.0)
+        dy = np.where(mask, values - mean_y[:, None], 0.0)
+        sxx = (dx * dx).sum(axis=1)
+        slope = np.where(sxx > 0, (dx * dy).sum(axis=1) / sxx, np.nan)
+        intercept = mean_y - slope * mean_x - slope * origin
+        residuals = np.where(mask, dy - slope[:, None] * dx, 0.0)
+        residual_std = np.sqrt((residuals * residuals).sum(axis=1) / counts)
+    residual_std = np.where(counts > 1, residual_std, 0.0)
+    return slope, intercept, residual_std, counts
+
+
+@dataclass
+class BatchForecast:
+    country: str
+    indicator: str
+    model_name: str
+    horizon_years: int
+    assumptions: str
+    metrics: str
+    points: list[dict]
+    reused: bool = False
+
+
+def run_batch_forecast(
+    db: Session,
+    country_codes: list[str],
+    indicator_codes: list[str],
+    horizon: int,
+    model_name: str = LINEAR_TREND,
+    interval: IntervalOptions = NORMAL_INTERVAL,
+):
+    """
+    Forecast every (country, indicator) pair with one panel load.
+
+    Returns `(forecasts, skipped)` where `skipped` lists pairs without enough history.
+    Pairs whose fingerprint matches a stored run are answered from it; new runs and
+    points are persisted with bulk inserts in a single transaction. Linear trends are
+    fitted for all rows in closed form; other models, `auto` and bootstrap intervals go through
+    `compute_forecasts`, which runs them on the shared compute pool. The `panel` model
+    fits one partially pooled trend per indicator over all countries with data and needs only
+    PANEL_MIN_POINTS observations per country.
+    """
+    pooled = model_name == PANEL_MODEL
+    if pooled:
+        # The panel model pools over every country with data, whatever subset was requested.
+        group = load_panel(db, None, indicator_codes)
+        panel = group.select_countries(country_codes)
+    else:
+        panel = load_panel(db, country_codes, indicator_codes)
+    pairs = [(country, indicator) for country in panel.countries for indicator in panel.indicators]
+    flat = panel.values.reshape(len(pairs), len(panel.years)) if pairs else np.empty((0, 0))
+    years = np.array(panel.years, dtype=int)
+
+    values = sanitize_training_panel(flat)
+    slope, intercept, std, counts = fit_linear_trends(years, values)
+    ready = (counts >= (PANEL_MIN_POINTS if pooled else MIN_TRAINING_POINTS)) & ~np.isnan(slope)
+    fits = {}
+    if pooled:
+        fits = {
+            indicator: _fit_group(years, group.values[:, position, :])
+            for position, indicator in enumerate(panel.indicators)
+        }
+        ready &= np.array([fits[indicator] is not None for _, indicator in pairs], dtype=bool)
+    skipped = [
+        {"country": country, "indicator": indicator, "reason": "Not enough data to forecast"}
+        for (country, indicator), ok in zip(pairs, ready)
+        if not ok
+    ]
+    if not ready.any():
+        return [], skipped
+
+    rows = np.flatnonzero(ready)
+    observed = ~np.isnan(values[rows])
+    stored = ~np.isnan(flat[rows])
+    params = model_params(model_name, interval)
+    fingerprints = [
+        forecast_fingerprint(
+            pairs[row][0],
+            pairs[row][1],
+            years[stored[position]],
+            flat[row, stored[position]],
+            model_name,
+            {**params, "group": fits[pairs[row][1]]["digest"]} if pooled else params,
+            horizon,
+        )
+        for position, row in enumerate(rows)
+    ]
+    params_digests = [forecast_params_digest(*pairs[row], model_name, params, horizon) for row in rows]
+    existing = find_runs_by_fingerprint(db, fingerprints)
+    pending = [position for position, fingerprint in enumerate(fingerprints) if fingerprint not in existing]
+    if pooled:
+        group_rows = {code: idx for idx, code in enumerate(group.countries)}
+        computed = []
+        for position in pending:
+            country, indicator = pairs[rows[position]]
+            computed.append(_panel_result(fits[indicator], group_rows[country], years, horizon))
+    elif model_name == LINEAR_TREND and interval.method == "normal":
+        computed = _linear_batch(years, values, rows[pending], slope, intercept, std, horizon)
+    else:
+        computed = compute_forecasts(
+            [(years[observed[position]], values[rows[position], observed[position]]) for position in pending],
+            horizon,
+            model_name,
+            interval,
+        )
+    computed = dict(zip(pending, computed))
+
+    keys = [pairs[row] for row in rows]
+    return store_batch_results(db, keys, fingerprints, params_digests, existing, computed, horizon), skipped
+
+
+def store_batch_results(
+    db: Session,
+    keys: list[tuple[str, str]],
+    fingerprints: list[str],
+    params_digests: list[str],
+    existing: dict[str, ForecastRun],
+    computed: dict[int, dict],
+    horizon: int,
+) -> list[BatchForecast]:
+    """
+    Assemble batch output in `keys` order and persist the newly computed runs.
+
+    Positions with a stored run (by fingerprint) are answered from it; the rest come from
+    `computed` and are written with one `add_all` for runs and one executemany for points.
+    """
+    existing_points = load_run_points(db, [run.id for run in existing.values()])
+    country_codes = sorted({country for country, _ in keys})
+    indicator_codes = sorted({indicator for _, indicator in keys})
+    countries = {row.code: row.id for row in db.query(Country).filter(Country.code.in_(country_codes)).all()}
+    indicators = {row.code: row.id for row in db.query(Indicator).filter(Indicator.code.in_(indicator_codes)).all()}
+
+    forecasts = []
+    runs = []
+    created = []
+    for position, (country, indicator) in enumerate(keys):
+        stored = existing.get(fingerprints[position])
+        if stored:
+            forecasts.append(
+                BatchForecast(
+                    country=country,
+                    indicator=indicator,
+                    model_name=stored.model_name,
+                    horizon_years=stored.horizon_years,
+                    assumptions=stored.assumptions,
+                    metrics=stored.metrics,
+                    points=[point_dict(item) for item in existing_points[stored.id]],
+                    reused=True,
+                )
+            )
+            continue
+        result = computed[position]
+        runs.append(
+            ForecastRun(
+                country_id=countries[country],
+                target_indicator_id=indicators[indicator],
+                model_name=result["model_name"],
+                horizon_years=horizon,
+                assumptions=result["assumptions"],
+                metrics=result["metrics"],
+                fingerprint=fingerprints[position],
+                params_digest=params_digests[position],
+            )
+        )
+        created.append(len(forecasts))
+        forecasts.append(
+            BatchForecast(
+                country=country,
+                indicator=indicator,
+                model_name=result["model_name"],
+                horizon_years=horizon,
+                assumptions=result["assumptions"],
+                metrics=result["metrics"],
+                points=result["points"],
+            )
+        )
+
+    if runs:
+        db.add_all(runs)
+        db.flush()
+        db.execute(
+            insert(ForecastPoint),
+            [
+                {"run_id": run.id, **point_row(point)}
+                for run, index in zip(runs, created)
+                for point in forecasts[index].points
+            ],
+        )
+        db.commit()
+    return forecasts
+
+
+def _fit_group(years: np.ndarray, values: np.ndarray) -> dict | None:
+    """Pooled trend fit for one indicator's (countries, years) slice, tagged with a content digest."""
+    sanitized = sanitize_training_panel(values)
+    fit = fit_pooled_trends(years, sanitized)
+    if fit is None:
+        return None
+    digest = hashlib.sha256(years.tobytes() + np.nan_to_num(sanitized, nan=np.inf).tobytes()).hexdigest()
+    return {**fit, "digest": digest}
+
+
+def _panel_result(fit: dict, row: int, years: np.ndarray, horizon: int) -> dict:
+    """`compute_forecast`-shaped result for one country of a pooled trend fit."""
+    future_years, predictions, errors = pooled_trend_forecast(fit, row, int(years[0]), horizon)
+    metrics = (
+        f"residual_std={np.sqrt(fit['sigma2']):.4f}; pooled_slope={fit['pooled_slope']:.4f}; "
+        f"own_slope_weight={fit['weight'][row]:.3f}; group_countries={fit['countries']}; "
+        f"training_points={int(fit['counts'][row])}"
+    )
+    return {
+        "model_name": PANEL_MODEL,
+        "assumptions": (
+            "Recent historical values (up to last 25 years) winsorized at 5th/95th percentile; "
+            f"{MODEL_ASSUMPTIONS[PANEL_MODEL]}"
+        ),
+        "metrics": metrics,
+        "points": [
+            {
+                "year": int(year),
+                "value": float(value),
+                "lower": float(value - INTERVAL_Z * error),
+                "upper": float(value + INTERVAL_Z * error),
+                "quantiles": None,
+            }
+            for year, value, error in zip(future_years, predictions, errors)
+        ],
+    }
+
+
+def _linear_batch(years, values, rows, slope, intercept, std, horizon: int) -> list[dict]:
+    """`compute_forecast`-shaped results for linear-trend rows, evaluated as whole arrays."""
+    if not len(rows):
+        return []
+    observed = ~np.isnan(values[rows])
+    last_year = years[observed.shape[1] - 1 - np.argmax(observed[:, ::-1], axis=1)]
+    future = last_year[:, None] + np.arange(1, horizon + 1)[None, :]
+    predictions = slope[rows, None] * future + intercept[rows, None]
+    lower = predictions - INTERVAL_Z * std[rows, None]
+    upper = predictions + INTERVAL_Z * std[rows, None]
+    backtests = summarize_backtest(*backtest_linear_panel(years, values[rows]))
+    return [
+        {
+            "model_name": LINEAR_TREND,
+            "assumptions": LINEAR_TREND_ASSUMPTIONS,
+            "metrics": format_metrics(float(std[row]), backtests[position]),
+            "points": [
+                {
+                    "year": int(future[position, step]),
+                    "value": float(predictions[position, step]),
+                    "lower": float(lower[position, step]),
+                    "upper": float(upper[position, step]),
+                    "quantiles": None,
+                }
+                for step in range(horizon)
+            ],
+        }
+        for position, row in enumerate(rows)
+    ]
+
+
+def driver_paths(years: np.ndarray, drivers: np.ndarray, horizon: int) -> np.ndarray:
+    """
+    Driver history extended by `horizon` years, shape (countries, drivers, years + horizon).
+
+    Years after each driver row's last observation follow that row's linear trend (fitted
+    on its sanitised recent history); gaps inside the history stay NaN.
+    """
+    countries, count, length = drivers.shape
+    flat = drivers.reshape(countries * count, length)
+    slope, intercept, _, _ = fit_linear_trends(years, sanitize_training_panel(flat))
+    extended = np.arange(years[0], years[0] + length + horizon) if length else np.arange(horizon)
+    observed = ~np.isnan(flat)
+    last = np.where(observed.any(axis=1), length - 1 - np.argmax(observed[:, ::-1], axis=1), length)
+    trend = slope[:, None] * extended[None, :] + intercept[:, None]
+    path = np.concatenate([flat, np.full((len(flat), horizon), np.nan)], axis=1)
+    after = np.arange(length + horizon)[None, :] > last[:, None]
+    path = np.where(after, trend, path)
+    return path.reshape(countries, count, length + horizon)
+
+
+def run_arx_forecast(
+    db: Session,
+    country_codes: list[str],
+    indicator_codes: list[str],
+    horizon: int,
+    options: ArxOptions,
+):
+    """
+    ARX forecasts for every (country, target) pair from a single panel load.
+
+    Targets and drivers come from one `load_panel` call. Per target, the lagged design
+    tensor is built once for all countries and every country is fitted in one batched
+    solve (`fit_arx`); forecasts are iterated for all countries together. Returns
+    `(forecasts, skipped)` like `run_batch_forecast`.
+    """
+    drivers = list(options.drivers)
+    p, lags = options.target_lags, options.driver_lags
+    panel = load_panel(db, country_codes, list(dict.fromkeys([*indicator_codes, *drivers])))
+    years = np.array(panel.years, dtype=int)
+    length = len(years)
+    history = panel.values[:, [panel.indicators.index(code) for code in drivers], :]
+    base_path = driver_paths(years, history, horizon)
+    digests = [
+        hashlib.sha256(np.nan_to_num(row, nan=np.inf).tobytes()).hexdigest() for row in history
+    ]
+    columns = ["const", *[f"y_lag{lag}" for lag in range(1, p + 1)]]
+    columns += [f"{code}_lag{lag}" for code in drivers for lag in range(1, lags + 1)]
+
+    keys, fingerprints, params_digests, results, skipped = [], [], [], [], []
+    for target in indicator_codes:
+        values = panel.values[:, panel.indicators.index(target), :]
+        observed = ~np.isnan(values)
+        origins = length - 1 - np.argmax(observed[:, ::-1], axis=1) if length else np.zeros(len(values), int)
+        coef, sigma, rows = fit_arx(arx_design(values, history, p, lags), values, MAX_TRAINING_POINTS)
+
+        path = base_path.copy()
+        for driver, year, value in options.scenario:
+            position = year - (int(years[0]) if length else 0)
+            if 0 <= position < length + horizon:
+                later = position > origins
+                path[later, drivers.index(driver), position] = value
+        extended = np.concatenate([values, np.full((len(values), horizon), np.nan)], axis=1)
+        safe_origins = np.clip(origins, max(p, lags), None) if length else origins
+        predictions, errors = arx_forecast(coef, sigma, extended, path, safe_origins, p, lags, horizon)
+
+        ready = (
+            observed.any(axis=1)
+            & (rows >= len(columns) + ARX_MIN_DOF)
+            & (origins >= max(p, lags))
+            & np.isfinite(predictions).all(axis=1)
+        )
+        for row, country in enumerate(panel.countries):
+            if not ready[row]:
+                skipped.append(
+                    {"country": country, "indicator": target, "reason": "Not enough overlapping history with drivers"}
+                )
+                continue
+            keep = observed[row]
+            keys.append((country, target))
+            fingerprints.append(
+                forecast_fingerprint(
+                    country,
+                    target,
+                    years[keep],
+                    values[row, keep],
+                    ARX_MODEL,
+                    {**options.params(), "drivers_digest": digests[row]},
+                    horizon,
+                )
+            )
+            params_digests.append(forecast_params_digest(country, target, ARX_MODEL, options.params(), horizon))
+            future = years[origins[row]] + np.arange(1, horizon + 1)
+            coefficients = ", ".join(f"{name}={value:.4f}" for name, value in zip(columns, coef[row]))
+            results.append(
+                {
+                    "model_name": ARX_MODEL,
+                    "assumptions": (
+                        f"{MODEL_ASSUMPTIONS[ARX_MODEL]} Target lags: {p}; drivers: "
+                        f"{', '.join(drivers)} (lags 1..{lags})."
+                        + (" Scenario overrides applied." if options.scenario else "")
+                    ),
+                    "metrics": (
+                        f"residual_std={sigma[row]:.4f}; training_rows={int(rows[row])}; coef: {coefficients}"
+                    ),
+                    "points": [
+                        {
+                            "year": int(year),
+                            "value": float(value),
+                            "lower": float(value - INTERVAL_Z * error),
+                            "upper": float(value + INTERVAL_Z * error),
+                            "quantiles": None,
+                        }
+                        for year, value, error in zip(future, predictions[row], errors[row])
+                    ],
+                }
+            )
+
+    existing = find_runs_by_fingerprint(db, fingerprints)
+    computed = {
+        position: result for position, result in enumerate(results) if fingerprints[position] not in existing
+    }
+    return store_batch_results(db, keys, fingerprints, params_digests, existing, computed, horizon), skipped
+
+
+def precompute_forecasts(
+    db: Session,
+    horizon: int = FORECAST_PRECOMPUTE_HORIZON,
+    model_name: str = FORECAST_PRECOMPUTE_MODEL,
+) -> ForecastPrecomputeRun:
+    """
+    Scheduled job: forecast every stored (country, indicator) series after ingestion.
+
+    Works one indicator at a time through `run_batch_forecast`, so memory stays bounded
+    and series whose data did not change are fingerprint hits rather than refits. With
+    the defaults matching `POST /forecast`, interactive requests become lookups. The
+    returned run row records coverage and duration; failures are recorded, not raised.
+    """
+    job = ForecastPrecomputeRun(model_name=model_name, horizon_years=horizon, status="started")
+    db.add(job)
+    db.commit()
+    started = time.perf_counter()
+    try:
+        pairs = (
+            db.query(Indicator.code, Country.code)
+            .join(Observation, Observation.indicator_id == Indicator.id)
+            .join(Country, Country.id == Observation.country_id)
+            .filter(Observation.value.isnot(None))
+            .distinct()
+            .all()
+        )
+        by_indicator: dict[str, list[str]] = {}
+        for indicator_code, country_code in pairs:
+            by_indicator.setdefault(indicator_code, []).append(country_code)
+
+        forecasted = reused = skipped = 0
+        for indicator_code in sorted(by_indicator):
+            forecasts, missing = run_batch_forecast(
+                db, sorted(by_indicator[indicator_code]), [indicator_code], horizon, model_name
+            )
+            forecasted += len(forecasts)
+            reused += sum(item.reused for item in forecasts)
+            skipped += len(missing)
+
+        job.series_total = len(pairs)
+        job.forecasted = forecasted
+        job.created = forecasted - reused
+        job.reused = reused
+        job.skipped = skipped
+        job.status = "completed"
+    except Exception as exc:
+        db.rollback()
+        job.status = "failed"
+        job.error = str(exc)
+    job.duration_ms = (time.perf_counter() - started) * 1000
+    job.finished_at = func.now()
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def compact_forecast_runs(db: Session, keep: int = 1) -> dict:
+    """
+    Retention job: delete superseded runs and their points.
+
+    Runs sharing a `params_digest` differ only in their training data, so for each digest
+    only the `keep` most recent are retained; runs of other intervals, quantiles, drivers or
+    scenarios are separate groups. Runs stored before the digest existed are grouped by
+    (country, indicator, model, horizon) as before.
+    """
+    ranked = select(
+        ForecastRun.id.label("run_id"),
+        func.row_number()
+        .over(
+            partition_by=(
+                ForecastRun.country_id,
+                ForecastRun.target_indicator_id,
+                func.coalesce(ForecastRun.params_digest, ForecastRun.model_name),
+                ForecastRun.horizon_years,
+            ),
+            order_by=ForecastRun.id.desc(),
+        )
+        .label("position"),
+    ).subquery()
+    stale = [row[0] for row in db.execute(select(ranked.c.run_id).where(ranked.c.position > keep)).all()]
+    deleted_points = 0
+    for offset in range(0, len(stale), 500):
+        chunk = stale[offset : offset + 500]
+        deleted_points += db.execute(delete(ForecastPoint).where(ForecastPoint.run_id.in_(chunk))).rowcount
+        db.execute(delete(ForecastRun).where(ForecastRun.id.in_(chunk)))
+    db.commit()
+    return {"deleted_runs": len(stale), "deleted_points": deleted_points}
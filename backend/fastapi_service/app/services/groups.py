@@ -0,0 +1,150 @@
+"""
+Country groups (regions, income groups) and their precomputed aggregate series.
+
+The catalog is the bundled `app/data/country_groups.json`, seeded from the World Bank country
+classification and read offline. For every group × indicator × year, `refresh_group_aggregates`
+stores the members' mean, median and population-weighted mean (`SP.POP.TOTL` of the same
+year) in `group_aggregates` with the number of reporting members; `/observations` serves them
+under the group code as if it were a country, skipping years below `GROUP_MIN_COVERAGE` of the
+members. Ingestion refreshes the groups of the country it just wrote.
+"""
+import json
+import warnings
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from app.models import GroupAggregate, Indicator
+from app.services.panel import load_panel
+
+GROUPS_PATH = Path(__file__).resolve().parent.parent / "data" / "country_groups.json"
+POPULATION_INDICATOR = "SP.POP.TOTL"
+GROUP_STATISTICS = ("weighted_mean", "mean", "median")
+
+
+@lru_cache(maxsize=1)
+def load_group_catalog() -> dict[str, dict]:
+    """Groups by code, in file order."""
+    with GROUPS_PATH.open(encoding="utf-8") as fh:
+        groups = json.load(fh)["groups"]
+    return {group["code"]: group for group in groups}
+
+
+def groups_for_country(country_code: str) -> list[str]:
+    code = country_code.upper()
+    return [group["code"] for group in load_group_catalog().values() if code in group["members"]]
+
+
+def aggregate_grid(values: np.ndarray, weights: np.ndarray, membership: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    Per-group statistics of a (countries × years) grid, each of shape (groups × years).
+
+    `membership` is a (groups × countries) boolean matrix and `weights` the countries'
+    population on the same grid. Cells without a member value are NaN (count 0);
+    `weighted_mean` only uses members that have both a value and a positive weight.
+    """
+    observed = ~np.isnan(values)
+    weighted = observed & (np.nan_to_num(weights) > 0)
+    member = membership.astype(float)
+    counts = member @ observed
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = member @ np.where(observed, values, 0.0) / counts
+        weighted_mean = member @ np.where(weighted, values * weights, 0.0) / (member @ np.where(weighted, weights, 0.0))
+    with warnings.catch_warnings():
+        # Groups without a member value in a year are expected and simply give NaN.
+        warnings.simplefilter("ignore", RuntimeWarning)
+        median = np.nanmedian(np.where(membership[:, :, None], values[None, :, :], np.nan), axis=1)
+    return {
+        "mean": np.where(counts > 0, mean, np.nan),
+        "median": median,
+        "weighted_mean": np.where(np.isfinite(weighted_mean), weighted_mean, np.nan),
+        "members": counts.astype(int),
+    }
+
+
+def refresh_group_aggregates(
+    db: Session, indicator_ids: list[int] | None = None, group_codes: list[str] | None = None
+) -> int:
+    """
+    Recompute the aggregates of the given groups × indicators (all when None).
+
+    Members' raw observations are loaded as one panel together with their population, so
+    each indicator is one vectorised pass over all groups. Estimates are not aggregated.
+    The caller commits. Returns the rows written.
+    """
+    catalog = load_group_catalog()
+    groups = [catalog[code] for code in (group_codes if group_codes is not None else catalog) if code in catalog]
+    stale = delete(GroupAggregate)
+    indicators = db.query(Indicator.id, Indicator.code)
+    if group_codes is not None:
+        stale = stale.where(GroupAggregate.group_code.in_([group["code"] for group in groups]))
+    if indicator_ids is not None:
+        stale = stale.where(GroupAggregate.indicator_id.in_(indicator_ids))
+        indicators = indicators.filter(Indicator.id.in_(indicator_ids))
+    db.execute(stale)
+    indicators = indicators.order_by(Indicator.code).all()
+    if not groups or not indicators:
+        return 0
+
+    members = sorted({code for group in groups for code in group["members"]})
+    codes = [code for _, code in indicators]
+    panel = load_panel(db, members, list(dict.fromkeys(codes + [POPULATION_INDICATOR])))
+    if not panel.years:
+        return 0
+    weights = panel.values[:, panel.indicators.index(POPULATION_INDICATOR)]
+    membership = np.array([[code in group["members"] for code in panel.countries] for group in groups])
+
+    mappings = []
+    for indicator_id, code in indicators:
+        stats = aggregate_grid(panel.values[:, panel.indicators.index(code)], weights, membership)
+        rows, offsets = np.nonzero(stats["members"] > 0)
+        mappings.extend(
+            {
+                "group_code": groups[row]["code"],
+                "indicator_id": indicator_id,
+                "year": panel.years[offset],
+                "mean": float(stats["mean"][row, offset]),
+                "median": float(stats["median"][row, offset]),
+                "weighted_mean": None
+                if np.isnan(stats["weighted_mean"][row, offset])
+                else float(stats["weighted_mean"][row, offset]),
+                "members": int(stats["members"][row, offset]),
+            }
+            for row, offset in zip(rows, offsets)
+        )
+    if mappings:
+        db.execute(insert(GroupAggregate), mappings)
+    return len(mappings)
+
+
+def load_group_series(
+    db: Session,
+    group_code: str,
+    indicator_code: str,
+    statistic: str = "weighted_mean",
+    start_year: int | None = None,
+    end_year: int | None = None,
+    min_members: int = 0,
+):
+    """
+    `(year, value, members)` rows of one stored group aggregate, by year.
+
+    Years without the statistic or with fewer than `min_members` reporting members are skipped.
+    """
+    if statistic not in GROUP_STATISTICS:
+        raise ValueError(f"Unknown group statistic: {statistic}")
+    column = getattr(GroupAggregate, statistic)
+    query = (
+        db.query(GroupAggregate.year, column, GroupAggregate.members)
+        .join(Indicator, Indicator.id == GroupAggregate.indicator_id)
+        .filter(GroupAggregate.group_code == group_code, Indicator.code == indicator_code)
+        .filter(column.isnot(None), GroupAggregate.members >= min_members)
+    )
+    if start_year is not None:
+        query = query.filter(GroupAggregate.year >= start_year)
+    if end_year is not None:
+        query = query.filter(GroupAggregate.year <= end_year)
+    return query.order_by(GroupAggregate.year).all()
@@ -2,8 +2,13 @@ from sqlalchemy.orm import Session
 
 from sqlalchemy.sql import func
 
+from app.core.config import INGEST_FILL_METHOD
 from app.models import Country, Indicator, Observation
 from app.models_ingestion import IngestionRun
+from app.services.anomalies import refresh_anomalies
+from app.services.estimates import refresh_estimates
+from app.services.groups import POPULATION_INDICATOR, groups_for_country, refresh_group_aggregates
+from app.services.snapshot import refresh_snapshots
 from app.services.world_bank import fetch_indicator_series
 
 WORLD_BANK_SOURCE = "world_bank"
@@ -60,8 +65,12 @@ def ingest_indicator(db: Session, country_code: str, indicator_code: str):
                 )
                 .first()
             )
-            if exists:
+            if exists and not exists.is_estimate:
                 continue
+            if exists:
+                # A measured value replaces the stored estimate for that year.
+                db.delete(exists)
+                db.flush()
             db.add(
                 Observation(
                     country_id=country.id,
@@ -72,6 +81,16 @@ def ingest_indicator(db: Session, country_code: str, indicator_code: str):
                 )
             )
             new_rows += 1
+        if new_rows:
+            db.flush()
+            refresh_estimates(db, INGEST_FILL_METHOD, [country.id], [indicator.id])
+            refresh_snapshots(db, [country.id], [indicator.id])
+            refresh_anomalies(db, [country.id], [indicator.id])
+            groups = groups_for_country(country.code)
+            if groups:
+                # Population weights every indicator of a group, so new population data refreshes them all.
+                indicator_ids = None if indicator.code == POPULATION_INDICATOR else [indicator.id]
+                refresh_group_aggregates(db, indicator_ids, groups)
         expected = calculate_expected(series)
         missing = max(expected - len(series), 0)
         run.status = "completed"
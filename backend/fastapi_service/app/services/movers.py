@@ -0,0 +1,117 @@
+"""
+Top movers: how much one indicator changed between two years, ranked across all countries.
+
+Start and end values come from one query over both year windows; each country takes the
+observation nearest to each target year (within ±tolerance, ties to the earlier year).
+Rankings are cached per data version, so repeated widget requests are lookups.
+"""
+import numpy as np
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.models import Country, Indicator, Observation
+from app.services.cache import VersionedCache
+
+MOVER_METRICS = ("abs", "pct", "cagr")
+
+_rankings = VersionedCache(maxsize=128)
+
+
+def _nearest(country_idx: np.ndarray, years: np.ndarray, values: np.ndarray, target: int, tolerance: int, size: int):
+    """Per country, the value and year nearest to `target` within ±tolerance; NaN and -1 where none."""
+    chosen_values = np.full(size, np.nan)
+    chosen_years = np.full(size, -1, dtype=int)
+    inside = np.flatnonzero(np.abs(years - target) <= tolerance)
+    if not len(inside):
+        return chosen_values, chosen_years
+    order = inside[np.lexsort((years[inside], np.abs(years[inside] - target), country_idx[inside]))]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = country_idx[order][1:] != country_idx[order][:-1]
+    chosen = order[first]
+    chosen_values[country_idx[chosen]] = values[chosen]
+    chosen_years[country_idx[chosen]] = years[chosen]
+    return chosen_values, chosen_years
+
+
+def change_metric(metric: str, start: np.ndarray, end: np.ndarray, span: np.ndarray) -> np.ndarray:
+    """`abs` difference, `pct` change (positive start only) or `cagr` in % a year (positive endpoints)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if metric == "abs":
+            change = end - start
+        elif metric == "pct":
+            change = np.where(start > 0, (end / start - 1.0) * 100.0, np.nan)
+        elif metric == "cagr":
+            valid = (start > 0) & (end > 0) & (span > 0)
+            change = np.where(valid, ((end / start) ** (1.0 / span) - 1.0) * 100.0, np.nan)
+        else:
+            raise ValueError(f"Unknown metric: {metric}")
+    return np.where(np.isfinite(change), change, np.nan)
+
+
+def compute_movers(
+    db: Session, indicator_code: str, start_year: int, end_year: int, metric: str, tolerance: int = 0
+) -> list[dict]:
+    """Every country with both endpoints, ranked by change (largest first)."""
+    rows = (
+        db.query(Country.code, Observation.year, Observation.value)
+        .join(Country, Country.id == Observation.country_id)
+        .join(Indicator, Indicator.id == Observation.indicator_id)
+        .filter(Indicator.code == indicator_code)
+        .filter(Observation.value.isnot(None), Observation.is_estimate.isnot(True))
+        .filter(
+            or_(
+                and_(Observation.year >= start_year - tolerance, Observation.year <= start_year + tolerance),
+                and_(Observation.year >= end_year - tolerance, Observation.year <= end_year + tolerance),
+            )
+        )
+        .all()
+    )
+    if not rows:
+        return []
+    countries = sorted({row[0] for row in rows})
+    country_index = {code: idx for idx, code in enumerate(countries)}
+    ci = np.fromiter((country_index[row[0]] for row in rows), dtype=np.intp, count=len(rows))
+    years = np.fromiter((row[1] for row in rows), dtype=int, count=len(rows))
+    values = np.fromiter((row[2] for row in rows), dtype=float, count=len(rows))
+
+    start, start_years = _nearest(ci, years, values, start_year, tolerance, len(countries))
+    end, end_years = _nearest(ci, years, values, end_year, tolerance, len(countries))
+    span = end_years - start_years
+    change = change_metric(metric, start, end, span)
+    # Overlapping windows can resolve both endpoints to the same year; such pairs are not a change.
+    ranked = np.flatnonzero(~np.isnan(change) & (start_years >= 0) & (end_years >= 0) & (span > 0))
+    ranked = ranked[np.lexsort((ranked, -change[ranked]))]
+    return [
+        {
+            "country": countries[idx],
+            "source_start_year": int(start_years[idx]),
+            "start_value": float(start[idx]),
+            "source_end_year": int(end_years[idx]),
+            "end_value": float(end[idx]),
+            "change": float(change[idx]),
+        }
+        for idx in ranked
+    ]
+
+
+def top_movers(
+    db: Session,
+    indicator_code: str,
+    start_year: int,
+    end_year: int,
+    metric: str,
+    tolerance: int = 0,
+    limit: int = 10,
+    order: str = "desc",
+):
+    """
+    The `limit` largest (`desc`) or smallest (`asc`) changes, from a ranking cached per data version.
+
+    Returns `(items, ranked, cached)` where `ranked` counts all countries with both endpoints.
+    """
+    key = (indicator_code, start_year, end_year, metric, tolerance)
+    ranking, cached = _rankings.get_or_compute(
+        db, key, lambda: compute_movers(db, indicator_code, start_year, end_year, metric, tolerance)
+    )
+    items = ranking[:limit] if order == "desc" else ranking[::-1][:limit]
+    return items, len(ranking), cached
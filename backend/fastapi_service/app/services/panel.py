@@ -0,0 +1,178 @@
+from dataclasses import dataclass
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models import Country, Indicator, Observation
+
+
+@dataclass
+class Panel:
+    """
+    Dense view of stored observations.
+
+    `values` has shape (countries, indicators, years) and holds NaN wherever no
+    numeric observation exists. `years` is a contiguous range so that positional
+    shifts along the last axis correspond to calendar lags.
+    """
+
+    countries: list[str]
+    indicators: list[str]
+    years: list[int]
+    values: np.ndarray
+
+    def series(self, country_code: str, indicator_code: str) -> np.ndarray:
+        return self.values[self.countries.index(country_code), self.indicators.index(indicator_code)]
+
+    def select_countries(self, country_codes: list[str]) -> "Panel":
+        """Rows for `country_codes` in that order, keeping the year range; unknown codes are all-NaN."""
+        countries = list(dict.fromkeys(code.upper() for code in country_codes))
+        index = {code: idx for idx, code in enumerate(self.countries)}
+        values = np.full((len(countries), len(self.indicators), len(self.years)), np.nan)
+        for row, code in enumerate(countries):
+            if code in index:
+                values[row] = self.values[index[code]]
+        return Panel(countries=countries, indicators=self.indicators, years=self.years, values=values)
+
+
+def load_panel(
+    db: Session,
+    country_codes: list[str] | None,
+    indicator_codes: list[str],
+    start_year: int | None = None,
+    end_year: int | None = None,
+) -> Panel:
+    """
+    Load every requested (country, indicator) series with a single query.
+
+    When `country_codes` is None all countries with data for the indicators are
+    included (sorted by code). Requested codes without data stay in the panel as
+    all-NaN rows so callers can rely on the requested ordering.
+    """
+    query = (
+        db.query(Country.code, Indicator.code, Observation.year, Observation.value)
+        .join(Country, Country.id == Observation.country_id)
+        .join(Indicator, Indicator.id == Observation.indicator_id)
+        .filter(Indicator.code.in_(indicator_codes))
+        .filter(Observation.value.isnot(None), Observation.is_estimate.isnot(True))
+    )
+    if country_codes is not None:
+        query = query.filter(Country.code.in_([code.upper() for code in country_codes]))
+    if start_year is not None:
+        query = query.filter(Observation.year >= start_year)
+    if end_year is not None:
+        query = query.filter(Observation.year <= end_year)
+    rows = query.all()
+
+    if country_codes is not None:
+        countries = list(dict.fromkeys(code.upper() for code in country_codes))
+    else:
+        countries = sorted({row[0] for row in rows})
+    indicators = list(dict.fromkeys(indicator_codes))
+
+    if rows:
+        observed = [row[2] for row in rows]
+        first_year = start_year if start_year is not None else min(observed)
+        last_year = end_year if end_year is not None else max(observed)
+    elif start_year is not None and end_year is not None:
+        first_year, last_year = start_year, end_year
+    else:
+        first_year, last_year = 0, -1
+    years = list(range(first_year, last_year + 1))
+
+    values = np.full((len(countries), len(indicators), len(years)), np.nan)
+    if rows:
+        country_index = {code: idx for idx, code in enumerate(countries)}
+        indicator_index = {code: idx for idx, code in enumerate(indicators)}
+        ci = np.fromiter((country_index[row[0]] for row in rows), dtype=np.intp, count=len(rows))
+        ii = np.fromiter((indicator_index[row[1]] for row in rows), dtype=np.intp, count=len(rows))
+        yi = np.fromiter((row[2] - first_year for row in rows), dtype=np.intp, count=len(rows))
+        values[ci, ii, yi] = np.fromiter((row[3] for row in rows), dtype=float, count=len(rows))
+    return Panel(countries=countries, indicators=indicators, years=years, values=values)
+
+
+@dataclass
+class CrossSection:
+    """
+    One value per (country, indicator) taken from the year closest to a target.
+
+    `values` and `source_years` have shape (countries, indicators); missing cells
+    are NaN in `values` and -1 in `source_years`.
+    """
+
+    countries: list[str]
+    indicators: list[str]
+    values: np.ndarray
+    source_years: np.ndarray
+
+
+def load_cross_section(
+    db: Session,
+    indicator_codes: list[str],
+    year: int,
+    tolerance: int = 0,
+    country_codes: list[str] | None = None,
+) -> CrossSection:
+    """
+    Fetch the nearest available value to `year` (within ±`tolerance`) for every
+    country with one query. Ties between equally distant years prefer the earlier one.
+    """
+    query = (
+        db.query(Country.code, Indicator.code, Observation.year, Observation.value)
+        .join(Country, Country.id == Observation.country_id)
+        .join(Indicator, Indicator.id == Observation.indicator_id)
+        .filter(Indicator.code.in_(indicator_codes))
+        .filter(Observation.value.isnot(None), Observation.is_estimate.isnot(True))
+        .filter(Observation.year >= year - tolerance)
+        .filter(Observation.year <= year + tolerance)
+    )
+    if country_codes is not None:
+        query = query.filter(Country.code.in_([code.upper() for code in country_codes]))
+    rows = query.all()
+
+    if country_codes is not None:
+        countries = list(dict.fromkeys(code.upper() for code in country_codes))
+    else:
+        countries = sorted({row[0] for row in rows})
+    indicators = list(dict.fromkeys(indicator_codes))
+    values = np.full((len(countries), len(indicators)), np.nan)
+    source_years = np.full((len(countries), len(indicators)), -1, dtype=int)
+    if not rows:
+        return CrossSection(countries=countries, indicators=indicators, values=values, source_years=source_years)
+
+    country_index = {code: idx for idx, code in enumerate(countries)}
+    indicator_index = {code: idx for idx, code in enumerate(indicators)}
+    ci = np.fromiter((country_index[row[0]] for row in rows), dtype=np.intp, count=len(rows))
+    ii = np.fromiter((indicator_index[row[1]] for row in rows), dtype=np.intp, count=len(rows))
+    yr = np.fromiter((row[2] for row in rows), dtype=int, count=len(rows))
+    val = np.fromiter((row[3] for row in rows), dtype=float, count=len(rows))
+
+    # Order rows by cell, then distance to the target year, then year; the first row per cell wins.
+    order = np.lexsort((yr, np.abs(yr - year), ii, ci))
+    cell = ci[order] * len(indicators) + ii[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = cell[1:] != cell[:-1]
+    chosen = order[first]
+    values[ci[chosen], ii[chosen]] = val[chosen]
+    source_years[ci[chosen], ii[chosen]] = yr[chosen]
+    return CrossSection(countries=countries, indicators=indicators, values=values, source_years=source_years)
+
+
+def pair_grid(rows) -> tuple[np.ndarray, int, np.ndarray]:
+    """
+    Dense (pairs × years) grid from `(country_id, indicator_id, year, value)` rows sorted by pair.
+
+    Returns `(pairs, first_year, values)`: the `(country_id, indicator_id)` of each grid row, the
+    year of column 0 and the values with NaN wherever a pair has no observation.
+    """
+    if not rows:
+        return np.empty((0, 2), dtype=int), 0, np.empty((0, 0))
+    data = np.array(rows, dtype=float)
+    ids = data[:, :2].astype(int)
+    starts = np.flatnonzero(np.r_[True, (ids[1:] != ids[:-1]).any(axis=1)])
+    counts = np.diff(np.r_[starts, len(data)])
+    years = data[:, 2].astype(int)
+    first_year = int(years.min())
+    values = np.full((len(starts), int(years.max()) - first_year + 1), np.nan)
+    values[np.repeat(np.arange(len(starts)), counts), years - first_year] = data[:, 3]
+    return ids[starts], first_year, values
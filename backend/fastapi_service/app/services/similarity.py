@@ -0,0 +1,94 @@
+"""
+Nearest-neighbour search over country indicator profiles.
+
+A profile is a country's latest values (from the snapshot table) for a set of indicators,
+standardised per indicator so that each contributes on the same scale. The standardised
+matrix is built once per (indicators, year, max_lag) and kept in memory until ingestion
+changes the data; a query is then one vectorised distance computation over all countries.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.services.cache import VersionedCache
+from app.services.snapshot import load_snapshot_matrix
+
+SIMILARITY_METRICS = ("euclidean", "cosine")
+
+_indexes = VersionedCache(maxsize=64)
+
+
+@dataclass(frozen=True)
+class FeatureIndex:
+    """
+    Countries with a value for every indicator: raw values, z-scored features and their norms.
+
+    Indicators without spread across countries are zeroed rather than divided by zero.
+    """
+
+    indicators: tuple[str, ...]
+    countries: list[str]
+    values: np.ndarray
+    features: np.ndarray
+    norms: np.ndarray
+
+    def position(self, country_code: str) -> int | None:
+        try:
+            return self.countries.index(country_code)
+        except ValueError:
+            return None
+
+
+def build_feature_index(
+    db: Session, indicator_codes: list[str], year: int, max_lag: int | None = None
+) -> FeatureIndex:
+    countries, values = load_snapshot_matrix(db, indicator_codes, year, max_lag)
+    complete = ~np.isnan(values).any(axis=1)
+    values = values[complete]
+    countries = [code for code, keep in zip(countries, complete) if keep]
+    if len(values):
+        spread = values.std(axis=0)
+        spread = np.where(spread > 0, spread, np.inf)
+        features = (values - values.mean(axis=0)) / spread
+    else:
+        features = values
+    return FeatureIndex(
+        indicators=tuple(indicator_codes),
+        countries=countries,
+        values=values,
+        features=features,
+        norms=np.linalg.norm(features, axis=1),
+    )
+
+
+def feature_index(db: Session, indicator_codes: list[str], year: int, max_lag: int | None = None):
+    """Memoised `build_feature_index`; returns `(index, cached)`."""
+    key = (tuple(indicator_codes), year, max_lag)
+    return _indexes.get_or_compute(db, key, lambda: build_feature_index(db, indicator_codes, year, max_lag))
+
+
+def nearest_countries(index: FeatureIndex, country_code: str, k: int, metric: str = "euclidean"):
+    """
+    The `k` countries closest to `country_code` as `[(position, distance)]`, nearest first.
+
+    Cosine distance is 1 - cosine similarity of the standardised profiles; a profile exactly
+    at the cross-country mean has no direction and gets distance 1 to everything.
+    Returns None when the country has no complete profile.
+    """
+    target = index.position(country_code)
+    if target is None:
+        return None
+    if metric == "cosine":
+        with np.errstate(divide="ignore", invalid="ignore"):
+            similarity = index.features @ index.features[target] / (index.norms * index.norms[target])
+        distances = 1.0 - np.nan_to_num(similarity, nan=0.0)
+    else:
+        distances = np.linalg.norm(index.features - index.features[target], axis=1)
+    distances[target] = np.inf
+    k = min(k, len(distances) - 1)
+    if k <= 0:
+        return []
+    candidates = np.argpartition(distances, k - 1)[:k]
+    ordered = candidates[np.lexsort((candidates, distances[candidates]))]
+    return [(int(position), float(distances[position])) for position in ordered]
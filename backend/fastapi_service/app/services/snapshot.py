@@ -0,0 +1,110 @@
+from datetime import datetime, timezone
+
+import numpy as np
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from app.models import Country, Indicator, Observation, ObservationSnapshot
+from app.services.cache import bump_data_revision
+
+SNAPSHOT_REVISION = "observation_snapshots"
+# Rows run this many years past the refresh year, so reads stay an equality match on `year`
+# across year rollovers until ingestion or `scripts/rebuild_snapshots.py` refreshes the pair.
+SNAPSHOT_FORWARD_YEARS = 5
+
+
+def snapshot_rows(country_id: int, indicator_id: int, years: np.ndarray, values: np.ndarray, last_year: int):
+    """As-of rows for one pair: every year from the first observation to `last_year` takes the latest value."""
+    targets = np.arange(years[0], max(last_year, years[-1]) + 1)
+    source = np.searchsorted(years, targets, side="right") - 1
+    return [
+        {
+            "country_id": country_id,
+            "indicator_id": indicator_id,
+            "year": int(year),
+            "value": float(values[idx]),
+            "source_year": int(years[idx]),
+        }
+        for year, idx in zip(targets, source)
+    ]
+
+
+def refresh_snapshots(db: Session, country_ids: list[int] | None = None, indicator_ids: list[int] | None = None) -> int:
+    """
+    Rebuild snapshot rows for the given countries × indicators (all when None) from observations.
+
+    Ingestion calls this for the pair it just wrote, so the table stays current incrementally;
+    passing no filters is a full rebuild. Rows are materialised `SNAPSHOT_FORWARD_YEARS` past
+    the current year. Every refresh bumps the snapshot revision so cached results derived from
+    the table (`VersionedCache`) are recomputed, also when the rebuild ran in another process.
+    The caller commits. Returns the rows written.
+    """
+    stale = delete(ObservationSnapshot)
+    query = db.query(Observation.country_id, Observation.indicator_id, Observation.year, Observation.value).filter(
+        Observation.value.isnot(None), Observation.is_estimate.isnot(True)
+    )
+    if country_ids is not None:
+        stale = stale.where(ObservationSnapshot.country_id.in_(country_ids))
+        query = query.filter(Observation.country_id.in_(country_ids))
+    if indicator_ids is not None:
+        stale = stale.where(ObservationSnapshot.indicator_id.in_(indicator_ids))
+        query = query.filter(Observation.indicator_id.in_(indicator_ids))
+    db.execute(stale)
+    bump_data_revision(db, SNAPSHOT_REVISION)
+    rows = query.order_by(Observation.country_id, Observation.indicator_id, Observation.year).all()
+    if not rows:
+        return 0
+
+    data = np.array(rows, dtype=float)
+    pairs = data[:, :2]
+    starts = np.flatnonzero(np.r_[True, (pairs[1:] != pairs[:-1]).any(axis=1)])
+    ends = np.r_[starts[1:], len(data)]
+    last_year = datetime.now(timezone.utc).year + SNAPSHOT_FORWARD_YEARS
+    mappings = []
+    for start, end in zip(starts, ends):
+        country_id, indicator_id = int(data[start, 0]), int(data[start, 1])
+        mappings.extend(
+            snapshot_rows(country_id, indicator_id, data[start:end, 2].astype(int), data[start:end, 3], last_year)
+        )
+    db.execute(insert(ObservationSnapshot), mappings)
+    return len(mappings)
+
+
+def load_snapshot(db: Session, indicator_code: str, year: int, max_lag: int | None = None):
+    """`(country, value, source_year)` for every country with a value at or before `year`, sorted by country."""
+    query = (
+        db.query(Country.code, ObservationSnapshot.value, ObservationSnapshot.source_year)
+        .join(Country, Country.id == ObservationSnapshot.country_id)
+        .join(Indicator, Indicator.id == ObservationSnapshot.indicator_id)
+        .filter(Indicator.code == indicator_code)
+        .filter(ObservationSnapshot.year == year)
+    )
+    if max_lag is not None:
+        query = query.filter(ObservationSnapshot.source_year >= year - max_lag)
+    return query.order_by(Country.code).all()
+
+
+def load_snapshot_matrix(db: Session, indicator_codes: list[str], year: int, max_lag: int | None = None):
+    """
+    Values as of `year` for several indicators in one query.
+
+    Returns `(countries, values)`: every country with at least one of the indicators (sorted by
+    code) and a (countries × indicators) array with NaN where a country has no value.
+    """
+    query = (
+        db.query(Country.code, Indicator.code, ObservationSnapshot.value)
+        .join(Country, Country.id == ObservationSnapshot.country_id)
+        .join(Indicator, Indicator.id == ObservationSnapshot.indicator_id)
+        .filter(Indicator.code.in_(indicator_codes))
+        .filter(ObservationSnapshot.year == year)
+    )
+    if max_lag is not None:
+        query = query.filter(ObservationSnapshot.source_year >= year - max_lag)
+    rows = query.all()
+    countries = sorted({row[0] for row in rows})
+    country_index = {code: idx for idx, code in enumerate(countries)}
+    indicator_index = {code: idx for idx, code in enumerate(indicator_codes)}
+    values = np.full((len(countries), len(indicator_codes)), np.nan)
+    for country, indicator, value in rows:
+        values[country_index[country], indicator_index[indicator]] = value
+    return countries, values
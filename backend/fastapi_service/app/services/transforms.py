@@ -0,0 +1,156 @@
+"""
+Vectorised series transforms over the year axis.
+
+Every function takes an array whose last axis is a contiguous year range (as produced by
+`load_panel`) and returns an array of the same shape, with NaN wherever the inputs needed
+for a cell are missing.
+"""
+import numpy as np
+
+
+def lag(values: np.ndarray, periods: int = 1) -> np.ndarray:
+    """Value `periods` years earlier."""
+    shifted = np.full(values.shape, np.nan)
+    if periods < values.shape[-1]:
+        shifted[..., periods:] = values[..., : values.shape[-1] - periods]
+    return shifted
+
+
+def diff(values: np.ndarray, periods: int = 1) -> np.ndarray:
+    return values - lag(values, periods)
+
+
+def pct_change(values: np.ndarray, periods: int = 1) -> np.ndarray:
+    """Percent change over `periods` years; a zero base gives NaN."""
+    base = lag(values, periods)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = (values / base - 1.0) * 100.0
+    change[~np.isfinite(change)] = np.nan
+    return change
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing `window`-year mean, defined only where the whole window is observed."""
+    observed = ~np.isnan(values)
+    zeros = np.zeros(values.shape[:-1] + (1,))
+    sums = np.concatenate([zeros, np.cumsum(np.where(observed, values, 0.0), axis=-1)], axis=-1)
+    counts = np.concatenate([zeros, np.cumsum(observed, axis=-1)], axis=-1)
+    result = np.full(values.shape, np.nan)
+    if window <= values.shape[-1]:
+        total = sums[..., window:] - sums[..., :-window]
+        count = counts[..., window:] - counts[..., :-window]
+        result[..., window - 1 :] = np.where(count == window, total / window, np.nan)
+    return result
+
+
+def rebase(values: np.ndarray, years: list[int], base_year: int) -> np.ndarray:
+    """Index with `base_year` = 100; rows without a non-zero base-year value become NaN."""
+    if base_year not in years:
+        return np.full(values.shape, np.nan)
+    base = values[..., years.index(base_year)][..., None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        indexed = values / base * 100.0
+    indexed[~np.isfinite(indexed)] = np.nan
+    return indexed
+
+
+def log(values: np.ndarray) -> np.ndarray:
+    """Natural log; non-positive values give NaN."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = np.log(values)
+    result[~np.isfinite(result)] = np.nan
+    return result
+
+
+SERIES_TRANSFORMS = ("yoy", "pct_change", "log", "rebase", "avg", "cagr")
+
+
+def series_grid(years, values) -> tuple[list[int], np.ndarray]:
+    """Place a sparse `(years, values)` series on a contiguous year range, NaN where missing."""
+    years = np.asarray(years, dtype=int)
+    if not len(years):
+        return [], np.array([])
+    grid = np.arange(years.min(), years.max() + 1)
+    dense = np.full(len(grid), np.nan)
+    dense[years - grid[0]] = np.array([np.nan if value is None else value for value in values], dtype=float)
+    return grid.tolist(), dense
+
+
+def year_mask(years: list[int], start_year: int | None, end_year: int | None) -> np.ndarray:
+    years = np.asarray(years, dtype=int)
+    mask = np.ones(len(years), dtype=bool)
+    if start_year is not None:
+        mask &= years >= start_year
+    if end_year is not None:
+        mask &= years <= end_year
+    return mask
+
+
+def apply_transform(
+    values: np.ndarray, years: list[int], name: str, base_year: int | None = None, window: int = 3
+) -> np.ndarray:
+    """Element-wise transforms: `yoy` (absolute change), `pct_change`, `log`, `rebase` (base_year = 100), `avg`."""
+    if name == "yoy":
+        return diff(values)
+    if name == "pct_change":
+        return pct_change(values)
+    if name == "log":
+        return log(values)
+    if name == "rebase":
+        return rebase(values, years, base_year)
+    if name == "avg":
+        return rolling_mean(values, window)
+    raise ValueError(f"Unknown transform: {name}")
+
+
+def cagr(values: np.ndarray, years: list[int]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Compound annual growth (%) between the first and last observed value of each row.
+
+    Returns `(rate, first_year, last_year)`; rows with fewer than two observations or
+    non-positive endpoints get a NaN rate, and rows without observations year -1.
+    """
+    shape = values.shape[:-1]
+    if not values.shape[-1]:
+        return np.full(shape, np.nan), np.full(shape, -1), np.full(shape, -1)
+    years = np.asarray(years, dtype=int)
+    observed = ~np.isnan(values)
+    has_data = observed.any(axis=-1)
+    first = np.argmax(observed, axis=-1)
+    last = values.shape[-1] - 1 - np.argmax(observed[..., ::-1], axis=-1)
+    start = np.take_along_axis(values, first[..., None], axis=-1)[..., 0]
+    end = np.take_along_axis(values, last[..., None], axis=-1)[..., 0]
+    span = years[last] - years[first]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = ((end / start) ** (1.0 / span) - 1.0) * 100.0
+    rate = np.where(has_data & (span > 0) & (start > 0) & (end > 0) & np.isfinite(rate), rate, np.nan)
+    return rate, np.where(has_data, years[first], -1), np.where(has_data, years[last], -1)
+
+
+FILL_METHODS = ("linear", "locf")
+
+
+def fill_gaps(values: np.ndarray, method: str) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Fill interior gaps along the year axis: `linear` interpolates between the neighbouring
+    observations, `locf` carries the last observation forward. Leading and trailing gaps stay NaN.
+
+    Returns `(filled, estimated)` where `estimated` marks the cells that were filled.
+    """
+    if method not in FILL_METHODS:
+        raise ValueError(f"Unknown fill method: {method}")
+    observed = ~np.isnan(values)
+    size = values.shape[-1]
+    positions = np.arange(size)
+    previous = np.maximum.accumulate(np.where(observed, positions, -1), axis=-1)
+    following = np.flip(np.minimum.accumulate(np.flip(np.where(observed, positions, size), -1), axis=-1), -1)
+    estimated = ~observed & (previous >= 0) & (following < size)
+    if not estimated.any():
+        return values.copy(), estimated
+    before = np.take_along_axis(values, np.clip(previous, 0, size - 1), axis=-1)
+    if method == "locf":
+        return np.where(estimated, before, values), estimated
+    after = np.take_along_axis(values, np.clip(following, 0, size - 1), axis=-1)
+    span = np.where(estimated, following - previous, 1)
+    interpolated = before + (after - before) * (positions - previous) / span
+    return np.where(estimated, interpolated, values), estimated
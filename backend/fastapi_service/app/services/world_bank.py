@@ -1,4 +1,5 @@
 import time
+from concurrent.futures import ThreadPoolExecutor, wait
 
 import httpx
 
@@ -39,3 +40,21 @@ def fetch_indicator_series(country: str, indicator: str, per_page: int = 200):
         raise ValueError("Unexpected response format from World Bank API")
     entries = filter(None, (normalize_entry(row) for row in payload[1]))
     return sorted(entries, key=lambda row: row["year"])
+
+
+def fetch_indicator_series_many(
+    country_codes: list[str], indicator: str, deadline_seconds: float, max_workers: int
+) -> dict[str, list]:
+    """
+    Fetch one indicator for several countries concurrently.
+
+    Returns `{country: series}` for the fetches that succeeded within `deadline_seconds`;
+    failed and late countries are left out. Late requests are not waited for.
+    """
+    if not country_codes:
+        return {}
+    pool = ThreadPoolExecutor(max_workers=max(min(max_workers, len(country_codes)), 1))
+    futures = {pool.submit(fetch_indicator_series, code, indicator): code for code in country_codes}
+    done, _ = wait(futures, timeout=deadline_seconds)
+    pool.shutdown(wait=False, cancel_futures=True)
+    return {futures[future]: future.result() for future in done if future.exception() is None}
@@ -0,0 +1,80 @@
+"""Synthetic in-memory database used by the benchmark scripts."""
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db import Base
+from app.models import Country, Indicator, Observation
+
+
+def build_session(
+    countries: int,
+    indicator_codes: list[str],
+    years: int,
+    seed: int,
+    drop: float = 0.15,
+    last_year: int = 2024,
+):
+    """
+    Seed `countries` x `indicator_codes` random-walk-with-trend series and return a session.
+
+    The second indicator is correlated with the first so correlation benchmarks have signal.
+    About `drop` of the cells are left empty to exercise gap handling.
+    """
+    engine = create_engine(
+        "sqlite://",
+        future=True,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine, future=True, expire_on_commit=False)()
+
+    rng = np.random.default_rng(seed)
+    country_rows = [Country(code=f"C{idx:03d}", name=f"Country {idx}") for idx in range(countries)]
+    indicator_rows = [Indicator(code=code, name=code, source="bench") for code in indicator_codes]
+    session.add_all(country_rows + indicator_rows)
+    session.flush()
+
+    first_year = last_year - years + 1
+    base = rng.normal(size=(countries, years))
+    data = []
+    for idx in range(len(indicator_codes)):
+        if idx == 1:
+            noise = 0.6 * base + rng.normal(scale=0.8, size=(countries, years))
+        else:
+            noise = rng.normal(size=(countries, years)) if idx else base
+        trend = rng.normal(scale=0.2, size=(countries, 1)) * np.arange(years)[None, :]
+        data.append(trend + noise)
+    keep = rng.random((len(indicator_codes), countries, years)) > drop
+
+    mappings = []
+    for i_idx, indicator in enumerate(indicator_rows):
+        for c_idx, country in enumerate(country_rows):
+            for y_idx in np.flatnonzero(keep[i_idx, c_idx]):
+                mappings.append(
+                    {
+                        "country_id": country.id,
+                        "indicator_id": indicator.id,
+                        "year": first_year + int(y_idx),
+                        "value": float(data[i_idx][c_idx, y_idx]),
+                        "source": "bench",
+                    }
+                )
+    session.bulk_insert_mappings(Observation, mappings)
+    session.commit()
+    return session
+
+
+def timed(fn, repeat: int):
+    """Run `fn` `repeat` times; return the last result and the median wall time in ms."""
+    import time
+
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return result, float(np.median(samples))
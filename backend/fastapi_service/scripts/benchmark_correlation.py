@@ -0,0 +1,71 @@
+import argparse
+
+import numpy as np
+
+from app.models import Country, Indicator, Observation
+from app.services.correlation import bootstrap_interval, compute_correlation, cross_section_correlation
+from scripts.bench_data import build_session, timed
+
+INDICATOR_A = "BENCH.A"
+INDICATOR_B = "BENCH.B"
+
+
+def naive_cross_section(db, year: int, tolerance: int):
+    """Per-country lookups in the style of the original single-pair endpoint, for comparison."""
+    pairs = []
+    for country in db.query(Country).all():
+        picked = []
+        for code in (INDICATOR_A, INDICATOR_B):
+            indicator = db.query(Indicator).filter(Indicator.code == code).first()
+            rows = (
+                db.query(Observation)
+                .filter(Observation.country_id == country.id)
+                .filter(Observation.indicator_id == indicator.id)
+                .all()
+            )
+            candidates = [
+                row for row in rows if row.value is not None and abs(row.year - year) <= tolerance
+            ]
+            if not candidates:
+                break
+            picked.append(min(candidates, key=lambda row: (abs(row.year - year), row.year)).value)
+        if len(picked) == 2:
+            pairs.append((picked[0], picked[1]))
+    return compute_correlation(pairs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vectorised cross-sectional correlation.")
+    parser.add_argument("--countries", type=int, default=220)
+    parser.add_argument("--years", type=int, default=35)
+    parser.add_argument("--year", type=int, default=2019)
+    parser.add_argument("--tolerance", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--bootstrap", type=int, default=2000, help="Resamples for the bootstrap timing")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    db = build_session(args.countries, [INDICATOR_A, INDICATOR_B], args.years, args.seed)
+    vectorised, vectorised_ms = timed(
+        lambda: cross_section_correlation(db, INDICATOR_A, INDICATOR_B, args.year, args.tolerance, True),
+        args.repeat,
+    )
+    naive, naive_ms = timed(lambda: naive_cross_section(db, args.year, args.tolerance), args.repeat)
+
+    print(f"countries={args.countries} years={args.years} overlap={vectorised['points']}")
+    print(f"vectorised: r={vectorised['correlation']:.6f} rho={vectorised['spearman']:.6f} median={vectorised_ms:.2f} ms")
+    print(f"per-country: r={naive:.6f} median={naive_ms:.2f} ms")
+    print(f"speedup: {naive_ms / max(vectorised_ms, 1e-9):.1f}x")
+
+    points = sorted(vectorised["scatter"], key=lambda row: row["country"])
+    x = np.array([row["x"] for row in points])
+    y = np.array([row["y"] for row in points])
+    for label, sample in (("cross-section", len(x)), ("time-series", min(len(x), 30))):
+        (low, high), boot_ms = timed(
+            lambda: bootstrap_interval(x[:sample], y[:sample], args.bootstrap, 0.95, args.seed), args.repeat
+        )
+        print(f"bootstrap B={args.bootstrap} n={sample} ({label}): [{low:.4f}, {high:.4f}] median={boot_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import argparse
+
+import numpy as np
+
+from app.models_forecast import ForecastPoint, ForecastRun
+from app.services.compute import shutdown_executor, start_executor
+from app.services.forecasting import (
+    BACKTEST_MAX_HORIZON,
+    BACKTEST_MIN_TRAIN,
+    IntervalOptions,
+    _compute_chunk,
+    backtest_linear_panel,
+    compute_forecasts,
+    run_batch_forecast,
+    run_forecast,
+    sanitize_training_panel,
+)
+from app.services.panel import load_panel
+from scripts.bench_data import build_session, timed
+
+INDICATORS = ["BENCH.A", "BENCH.B", "BENCH.C"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batch vs per-series forecasting.")
+    parser.add_argument("--countries", type=int, default=220)
+    parser.add_argument("--years", type=int, default=35)
+    parser.add_argument("--horizon", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--paths", type=int, default=2000, help="Bootstrap paths per series")
+    args = parser.parse_args()
+
+    db = build_session(args.countries, INDICATORS, args.years, args.seed)
+    countries = [f"C{idx:03d}" for idx in range(args.countries)]
+
+    (forecasts, skipped), batch_ms = timed(
+        lambda: run_batch_forecast(db, countries, INDICATORS, args.horizon), args.repeat
+    )
+    print(f"series={len(countries) * len(INDICATORS)} forecasted={len(forecasts)} skipped={len(skipped)}")
+    print(f"batch: median={batch_ms:.1f} ms")
+
+    def per_series():
+        for country in countries:
+            for indicator in INDICATORS:
+                run_forecast(db, country, indicator, args.horizon)
+
+    _, single_ms = timed(per_series, 1)
+    print(f"per-series run_forecast: {single_ms:.1f} ms")
+    print(f"speedup: {single_ms / max(batch_ms, 1e-9):.1f}x")
+    print(f"stored runs={db.query(ForecastRun).count()} points={db.query(ForecastPoint).count()}")
+
+    panel = load_panel(db, countries, INDICATORS)
+    years = np.array(panel.years)
+    values = sanitize_training_panel(panel.values.reshape(-1, len(panel.years)))
+    (errors, _), engine_ms = timed(lambda: backtest_linear_panel(years, values), args.repeat)
+
+    def refit_each_origin():
+        for row in values:
+            keep = ~np.isnan(row)
+            x, y = years[keep], row[keep]
+            for origin in range(BACKTEST_MIN_TRAIN, len(y)):
+                slope, intercept = np.polyfit(x[:origin], y[:origin], deg=1)
+                for h in range(1, BACKTEST_MAX_HORIZON + 1):
+                    if origin + h - 1 < len(y):
+                        _ = y[origin + h - 1] - (slope * x[origin + h - 1] + intercept)
+
+    _, refit_ms = timed(refit_each_origin, 1)
+    evaluated = int((~np.isnan(errors)).sum())
+    print(f"backtest errors evaluated={evaluated} (all origins, h=1..{BACKTEST_MAX_HORIZON})")
+    print(f"prefix-sum engine: median={engine_ms:.1f} ms; polyfit per origin: {refit_ms:.1f} ms")
+
+    series = [(years[~np.isnan(row)], row[~np.isnan(row)]) for row in values if (~np.isnan(row)).sum() >= 8]
+    _, linear_ms = timed(lambda: _compute_chunk(series, args.horizon, "linear_trend"), args.repeat)
+    _, auto_serial_ms = timed(lambda: _compute_chunk(series, args.horizon, "auto"), args.repeat)
+    start_executor()
+    try:
+        chosen, auto_pool_ms = timed(lambda: compute_forecasts(series, args.horizon, "auto"), args.repeat)
+    finally:
+        shutdown_executor()
+    winners = {}
+    for item in chosen:
+        winners[item["model_name"]] = winners.get(item["model_name"], 0) + 1
+    print(f"per-series linear_trend: {linear_ms:.1f} ms; auto in-process: {auto_serial_ms:.1f} ms; auto pooled: {auto_pool_ms:.1f} ms")
+    print(f"auto winners: {winners}")
+
+    for refit in (False, True):
+        options = IntervalOptions(method="bootstrap", quantiles=(0.1, 0.5, 0.9), paths=args.paths, refit=refit)
+        _, boot_ms = timed(lambda: _compute_chunk(series, args.horizon, "linear_trend", options), args.repeat)
+        added = (boot_ms - linear_ms) / max(len(series), 1)
+        print(
+            f"bootstrap paths={args.paths} refit={refit}: {boot_ms:.1f} ms "
+            f"(+{added:.2f} ms per series over normal intervals)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import argparse
+
+from app.models import Country
+from app.services.groups import POPULATION_INDICATOR, groups_for_country, load_group_catalog, refresh_group_aggregates
+from scripts.bench_data import build_session, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the country group aggregate refresh.")
+    parser.add_argument("--indicators", type=int, default=10)
+    parser.add_argument("--years", type=int, default=35)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    members = load_group_catalog()["WLD"]["members"]
+    codes = [POPULATION_INDICATOR] + [f"BENCH.{idx}" for idx in range(args.indicators - 1)]
+    db = build_session(len(members), codes, args.years, args.seed)
+    # Synthetic countries take the catalog's codes so that every group has members.
+    for country, code in zip(db.query(Country).order_by(Country.id), members):
+        country.code = code
+    db.flush()
+
+    written, full_ms = timed(lambda: refresh_group_aggregates(db), args.repeat)
+    groups = groups_for_country("KZ")
+    _, pair_ms = timed(lambda: refresh_group_aggregates(db, [2], groups), args.repeat)
+    _, population_ms = timed(lambda: refresh_group_aggregates(db, None, groups), args.repeat)
+    db.rollback()
+
+    print(f"groups={len(load_group_catalog())} countries={len(members)} indicators={len(codes)} rows={written}")
+    print(f"full rebuild: median={full_ms:.1f} ms")
+    print(f"one ingested pair ({len(groups)} groups): median={pair_ms:.1f} ms; population update: {population_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import argparse
+
+from app.api.v1.inequality import GINI_INDICATOR, _stored_values_for_year
+from app.models import Country, Indicator, Observation
+from scripts.bench_data import build_session, timed
+
+
+def per_country_ranking(db, year: int):
+    """Per-country series loads plus a linear scan, in the style of the original ranking endpoint."""
+    values = {}
+    for country in db.query(Country).all():
+        country_row = db.query(Country).filter(Country.code == country.code).first()
+        indicator_row = db.query(Indicator).filter(Indicator.code == GINI_INDICATOR).first()
+        observations = (
+            db.query(Observation)
+            .filter(Observation.country_id == country_row.id)
+            .filter(Observation.indicator_id == indicator_row.id)
+            .order_by(Observation.year)
+            .all()
+        )
+        values[country.code] = next((row.value for row in observations if row.year == year), None)
+    return values
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the single-query Gini ranking.")
+    parser.add_argument("--countries", type=int, default=220)
+    parser.add_argument("--years", type=int, default=35)
+    parser.add_argument("--year", type=int, default=2019)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    db = build_session(args.countries, [GINI_INDICATOR], args.years, args.seed)
+    ranked, query_ms = timed(lambda: _stored_values_for_year(db, GINI_INDICATOR, args.year, None), args.repeat)
+    naive, naive_ms = timed(lambda: per_country_ranking(db, args.year), args.repeat)
+
+    assert ranked == naive
+    known = sum(value is not None for value in ranked.values())
+    print(f"countries={args.countries} years={args.years} ranked={known}")
+    print(f"single query: median={query_ms:.2f} ms; per-country: median={naive_ms:.2f} ms")
+    print(f"speedup: {naive_ms / max(query_ms, 1e-9):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import argparse
+
+import numpy as np
+
+from app.services.panel import load_panel
+from app.services.similarity import build_feature_index, feature_index, nearest_countries
+from app.services.snapshot import refresh_snapshots
+from scripts.bench_data import build_session, timed
+
+
+def per_country_profiles(db, codes: list[str], target: str, k: int):
+    """Latest value per series from full panels, then a Python distance loop, as a client would."""
+    panel = load_panel(db, None, codes)
+    profiles = {}
+    for row, country in enumerate(panel.countries):
+        latest = []
+        for series in panel.values[row]:
+            observed = series[~np.isnan(series)]
+            latest.append(observed[-1] if len(observed) else np.nan)
+        if not np.isnan(latest).any():
+            profiles[country] = np.array(latest)
+    matrix = np.array(list(profiles.values()))
+    mean, spread = matrix.mean(axis=0), matrix.std(axis=0)
+    scaled = {country: (values - mean) / spread for country, values in profiles.items()}
+    distances = sorted(
+        (float(np.linalg.norm(values - scaled[target])), country)
+        for country, values in scaled.items()
+        if country != target
+    )
+    return [country for _, country in distances[:k]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark country similarity search.")
+    parser.add_argument("--countries", type=int, default=220)
+    parser.add_argument("--indicators", type=int, default=8)
+    parser.add_argument("--years", type=int, default=35)
+    parser.add_argument("--year", type=int, default=2024)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    codes = [f"BENCH.{idx}" for idx in range(args.indicators)]
+    db = build_session(args.countries, codes, args.years, args.seed)
+    refresh_snapshots(db)
+    db.commit()
+
+    index, build_ms = timed(lambda: build_feature_index(db, codes, args.year), 3)
+    target = index.countries[0]
+
+    def query():
+        cached_index, _ = feature_index(db, codes, args.year)
+        return [cached_index.countries[position] for position, _ in nearest_countries(cached_index, target, args.k)]
+
+    neighbours, query_ms = timed(query, args.repeat)
+    naive, naive_ms = timed(lambda: per_country_profiles(db, codes, target, args.k), 3)
+
+    assert neighbours == naive
+    print(f"countries={len(index.countries)} indicators={args.indicators} k={args.k}")
+    print(f"index build: median={build_ms:.2f} ms; cached query: median={query_ms:.2f} ms")
+    print(f"client-style panel scan: median={naive_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -41,6 +41,13 @@ def list_runs(client: httpx.Client, base_url: str):
     return response.json()
 
 
+def precompute_forecasts(client: httpx.Client, base_url: str, timeout: float | None):
+    # The whole panel is forecast within this one request, which can outlast the ingestion timeout.
+    response = client.post(f"{base_url}/forecast/precompute", timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
 def main():
     parser = argparse.ArgumentParser(description="Ingest baseline indicators into FastAPI.")
     parser.add_argument("--base-url", default="http://127.0.0.1:8001/api/v1")
@@ -52,6 +59,17 @@ def main():
         action="store_true",
         help="Continue ingestion after a failed request",
     )
+    parser.add_argument(
+        "--skip-precompute",
+        action="store_true",
+        help="Do not precompute forecasts after the ingestion cycle (requires admin token)",
+    )
+    parser.add_argument(
+        "--precompute-timeout",
+        type=float,
+        default=None,
+        help="Seconds to wait for the forecast precompute response (no limit by default)",
+    )
     args = parser.parse_args()
 
     headers = build_headers(args.token)
@@ -83,6 +101,25 @@ def main():
             print(
                 f"Most recent run {latest['id']} status={latest['status']} missing={latest['missing']}"
             )
+        if not args.skip_precompute:
+            print("Precomputing forecasts...")
+            try:
+                job = precompute_forecasts(client, args.base_url, args.precompute_timeout)
+            except httpx.HTTPStatusError as exc:
+                print(f"Forecast precompute failed: {exc.response.status_code}")
+            except httpx.HTTPError as exc:
+                # The server-side job may still be running; its result appears in /forecast/precompute/runs.
+                print(
+                    f"Forecast precompute request failed: {exc!r}. "
+                    "Run `python -m scripts.precompute_forecasts` on the server to precompute directly."
+                )
+            else:
+                coverage = job["coverage"]
+                print(
+                    f"Precompute {job['status']}: {job['forecasted']} / {job['series_total']} series "
+                    f"(coverage {coverage if coverage is not None else 'n/a'}), "
+                    f"created {job['created']}, reused {job['reused']}, {job['duration_ms']:.0f} ms"
+                )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,36 @@
+import argparse
+import sys
+
+from app.core.config import FORECAST_PRECOMPUTE_HORIZON, FORECAST_PRECOMPUTE_MODEL
+from app.db import Base, SessionLocal, engine
+from app.services.compute import shutdown_executor, start_executor
+from app.services.forecasting import precompute_forecasts
+import app.models_forecast  # noqa: F401
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute stored forecasts for every series (cron/nightly).")
+    parser.add_argument("--horizon", type=int, default=FORECAST_PRECOMPUTE_HORIZON)
+    parser.add_argument("--model", default=FORECAST_PRECOMPUTE_MODEL)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    start_executor()
+    try:
+        with SessionLocal() as db:
+            job = precompute_forecasts(db, horizon=args.horizon, model_name=args.model)
+    finally:
+        shutdown_executor()
+    coverage = f"{job.coverage:.1%}" if job.coverage is not None else "n/a"
+    print(
+        f"Precompute run {job.id} status={job.status} model={job.model_name} horizon={job.horizon_years} "
+        f"series={job.series_total} forecasted={job.forecasted} (created {job.created}, reused {job.reused}) "
+        f"skipped={job.skipped} coverage={coverage} duration={job.duration_ms:.0f} ms"
+    )
+    if job.status != "completed":
+        print(f"Error: {job.error}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+from app.db import Base, SessionLocal, engine
+from app.services.anomalies import refresh_anomalies
+
+
+def main():
+    """Rescan every stored series for anomalies (ingestion keeps the table current afterwards)."""
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        written = refresh_anomalies(db)
+        db.commit()
+    print(f"Anomalies rebuilt: {written} flagged observations")
+
+
+if __name__ == "__main__":
+    main()
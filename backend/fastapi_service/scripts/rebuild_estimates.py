@@ -0,0 +1,16 @@
+from app.core.config import INGEST_FILL_METHOD
+from app.db import Base, SessionLocal, engine
+from app.services.estimates import refresh_estimates
+
+
+def main():
+    """Backfill stored gap-fill estimates with INGEST_FILL_METHOD (ingestion keeps them current afterwards)."""
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        written = refresh_estimates(db, INGEST_FILL_METHOD)
+        db.commit()
+    print(f"Estimates rebuilt ({INGEST_FILL_METHOD}): {written} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+from app.db import Base, SessionLocal, engine
+from app.services.groups import refresh_group_aggregates
+
+
+def main():
+    """Recompute every country group aggregate (ingestion keeps the table current afterwards)."""
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        written = refresh_group_aggregates(db)
+        db.commit()
+    print(f"Group aggregates rebuilt: {written} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+from app.db import Base, SessionLocal, engine
+from app.services.snapshot import refresh_snapshots
+
+
+def main():
+    """Backfill the latest-value snapshot from all stored observations (ingestion keeps it current afterwards)."""
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        written = refresh_snapshots(db)
+        db.commit()
+    print(f"Snapshot rebuilt: {written} rows")
+
+
+if __name__ == "__main__":
+    main()
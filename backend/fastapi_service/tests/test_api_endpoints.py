@@ -1,20 +1,40 @@
 import json
 import os
 import tempfile
+import time
 import unittest
+from datetime import datetime, timezone
 from types import SimpleNamespace
 from unittest.mock import patch
 
+import httpx
+import numpy as np
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 
 from app.db import Base, get_db
+from app.db_upgrade import upgrade_schema
 from app.deps import require_agreement
 from app.main import app
 from app.models import Country, Indicator, Observation
 from app.models_analytics import LorenzResult
 from app.models_forecast import ForecastPoint, ForecastRun
+from app.services.anomalies import refresh_anomalies
+from app.services.compute import ComputeTimeout, shutdown_executor, start_executor
+from app.services.forecast_models import fit_pooled_trends
+from app.services.forecasting import (
+    FORECAST_MODELS,
+    IntervalOptions,
+    compact_forecast_runs,
+    compute_forecast,
+    precompute_forecasts,
+    rolling_origin_backtest,
+    run_forecast,
+    sanitize_training_series,
+)
+from app.services.ingestion import ingest_indicator
+from app.services.snapshot import refresh_snapshots
 
 
 def _disable_rate_limit_middleware():
@@ -87,6 +107,32 @@ class FastApiBaseTestCase(unittest.TestCase):
             db.commit()
             return indicator
 
+    def _seed_observations(self, series: dict[tuple[str, str], dict[int, float]]):
+        """Seed {(country_code, indicator_code): {year: value}} creating catalog rows on demand."""
+        with self.SessionLocal() as db:
+            countries = {row.code: row for row in db.query(Country).all()}
+            indicators = {row.code: row for row in db.query(Indicator).all()}
+            for country_code, indicator_code in series:
+                if country_code not in countries:
+                    countries[country_code] = Country(code=country_code, name=country_code)
+                    db.add(countries[country_code])
+                if indicator_code not in indicators:
+                    indicators[indicator_code] = Indicator(code=indicator_code, name=indicator_code, source="test")
+                    db.add(indicators[indicator_code])
+            db.flush()
+            for (country_code, indicator_code), points in series.items():
+                for year, value in points.items():
+                    db.add(
+                        Observation(
+                            country_id=countries[country_code].id,
+                            indicator_id=indicators[indicator_code].id,
+                            year=year,
+                            value=value,
+                            source="test",
+                        )
+                    )
+            db.commit()
+
 
 class HealthAndCatalogTests(FastApiBaseTestCase):
     def test_healthcheck_returns_ok(self):
@@ -230,8 +276,325 @@ class ObservationApiTests(FastApiBaseTestCase):
 
         self.assertEqual(response.status_code, 422)
 
+    def test_snapshot_returns_latest_value_per_country_with_source_year(self):
+        self._seed_observations(
+            {
+                ("KZ", "NY.GDP.PCAP.CD"): {2015: 1.0, 2018: 2.0},
+                ("US", "NY.GDP.PCAP.CD"): {2010: 5.0},
+                ("DE", "NY.GDP.PCAP.CD"): {2021: 7.0},
+            }
+        )
+        # Materialised in 2022; the following years are still covered by the forward rows.
+        with patch("app.services.snapshot.datetime") as clock, self.SessionLocal() as db:
+            clock.now.return_value = datetime(2022, 6, 1, tzinfo=timezone.utc)
+            refresh_snapshots(db)
+            db.commit()
+
+        response = self.client.get("/api/v1/snapshot", params={"indicator": "NY.GDP.PCAP.CD", "year": 2020})
+        recent = self.client.get(
+            "/api/v1/snapshot", params={"indicator": "NY.GDP.PCAP.CD", "year": 2020, "max_lag": 5}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(item["country"], item["value"], item["source_year"]) for item in response.json()["items"]],
+            [("KZ", 2.0, 2018), ("US", 5.0, 2010)],
+        )
+        self.assertEqual([item["country"] for item in recent.json()["items"]], ["KZ"])
+        future = self.client.get("/api/v1/snapshot", params={"indicator": "NY.GDP.PCAP.CD", "year": 2024})
+        self.assertEqual(
+            [(item["country"], item["source_year"]) for item in future.json()["items"]],
+            [("DE", 2021), ("KZ", 2018), ("US", 2010)],
+        )
+
+        with patch("app.services.ingestion.fetch_indicator_series", return_value=[{"year": 2019, "value": 6.0}]):
+            with self.SessionLocal() as db:
+                ingest_indicator(db, "US", "NY.GDP.PCAP.CD")
+
+        updated = self.client.get("/api/v1/snapshot", params={"indicator": "NY.GDP.PCAP.CD", "year": 2020}).json()
+        self.assertEqual(updated["items"][1], {"country": "US", "value": 6.0, "source_year": 2019})
+
+
+    def test_observations_apply_transforms_using_history_before_the_bounds(self):
+        self._seed_observations({("KZ", "NY.GDP.MKTP.CD"): {2018: 100.0, 2019: 110.0, 2020: 121.0, 2021: 133.1}})
+        base = {"country": "KZ", "indicator": "NY.GDP.MKTP.CD", "start_year": 2019, "end_year": 2021}
+
+        def values(**params):
+            response = self.client.get("/api/v1/observations", params={**base, **params})
+            return response, [(row["year"], round(row["value"], 6)) for row in response.json()]
+
+        _, growth = values(transform="pct_change")
+        _, indexed = values(transform="rebase", base_year=2020)
+        _, averaged = values(transform="avg", window=2)
+        response, compound = values(transform="cagr")
+        missing_base = self.client.get("/api/v1/observations", params={**base, "transform": "rebase"})
+
+        self.assertEqual(growth, [(2019, 10.0), (2020, 10.0), (2021, 10.0)])
+        self.assertEqual(indexed, [(2019, round(110 / 1.21, 6)), (2020, 100.0), (2021, 110.0)])
+        self.assertEqual(averaged, [(2019, 105.0), (2020, 115.5), (2021, 127.05)])
+        self.assertEqual(compound, [(2021, 10.0)])
+        self.assertEqual(response.json()[0]["period_start"], 2019)
+        self.assertNotIn("X-Period-Start", response.headers)
+        self.assertEqual(missing_base.status_code, 400)
+
+    def test_batch_observations_transform_the_whole_panel(self):
+        self._seed_observations(
+            {
+                ("KZ", "NY.GDP.MKTP.CD"): {2019: 100.0, 2020: 90.0, 2021: 99.0},
+                ("US", "NY.GDP.MKTP.CD"): {2019: 200.0, 2021: 220.0},
+                ("KZ", "SP.POP.TOTL"): {2020: 19.0, 2021: 19.5},
+            }
+        )
+        params = {"countries": "KZ,US", "indicators": "NY.GDP.MKTP.CD,SP.POP.TOTL", "start_year": 2020}
+
+        raw = self.client.get("/api/v1/observations/batch", params=params)
+        yoy = self.client.get("/api/v1/observations/batch", params={**params, "transform": "yoy"})
+        compound = self.client.get("/api/v1/observations/batch", params={"transform": "cagr", **params})
+
+        self.assertEqual(raw.status_code, 200)
+        self.assertEqual(
+            [(item["country"], item["indicator"], len(item["points"])) for item in raw.json()],
+            [
+                ("KZ", "NY.GDP.MKTP.CD", 2),
+                ("KZ", "SP.POP.TOTL", 2),
+                ("US", "NY.GDP.MKTP.CD", 1),
+                ("US", "SP.POP.TOTL", 0),
+            ],
+        )
+        kz_gdp, kz_pop, us_gdp, _ = yoy.json()
+        self.assertEqual([point["value"] for point in kz_gdp["points"]], [-10.0, 9.0])
+        self.assertEqual([point["value"] for point in kz_pop["points"]], [None, 0.5])
+        self.assertEqual(us_gdp["points"], [{"year": 2021, "value": None, "is_estimate": False}])
+        kz_cagr = compound.json()[0]
+        self.assertEqual((kz_cagr["period_start"], kz_cagr["points"][0]["year"]), (2020, 2021))
+        self.assertAlmostEqual(kz_cagr["points"][0]["value"], 10.0)
+
+    def test_fill_interpolates_interior_gaps_and_marks_estimates(self):
+        self._seed_observations(
+            {
+                ("KZ", "NY.GDP.MKTP.CD"): {2016: 100.0, 2019: 130.0, 2020: 140.0},
+                ("US", "NY.GDP.MKTP.CD"): {2018: 5.0, 2020: 7.0},
+            }
+        )
+        base = {"country": "KZ", "indicator": "NY.GDP.MKTP.CD", "start_year": 2017}
+
+        def rows(**params):
+            payload = self.client.get("/api/v1/observations", params={**base, **params}).json()
+            return [(row["year"], row["value"], row["is_estimate"]) for row in payload]
+
+        self.assertEqual(rows(), [(2019, 130.0, False), (2020, 140.0, False)])
+        self.assertEqual(
+            rows(fill="linear"),
+            [(2017, 110.0, True), (2018, 120.0, True), (2019, 130.0, False), (2020, 140.0, False)],
+        )
+        self.assertEqual([value for _, value, _ in rows(fill="locf", end_year=2018)], [100.0, 100.0])
+        self.assertEqual(self.client.get("/api/v1/observations", params={**base, "fill": "spline"}).status_code, 422)
+
+        batch = self.client.get(
+            "/api/v1/observations/batch",
+            params={"countries": "KZ,US", "indicators": "NY.GDP.MKTP.CD", "start_year": 2018, "fill": "linear"},
+        ).json()
+        self.assertEqual(
+            [(point["year"], point["value"], point["is_estimate"]) for point in batch[1]["points"]],
+            [(2018, 5.0, False), (2019, 6.0, True), (2020, 7.0, False)],
+        )
+
+    def test_ingestion_stores_estimates_that_only_fill_reads_return(self):
+        series = [{"year": 2015, "value": 1.0}, {"year": 2018, "value": 4.0}]
+        with patch("app.services.ingestion.INGEST_FILL_METHOD", "linear"):
+            with patch("app.services.ingestion.fetch_indicator_series", return_value=series):
+                with self.SessionLocal() as db:
+                    ingest_indicator(db, "KZ", "SP.POP.TOTL")
+            with self.SessionLocal() as db:
+                stored = db.query(Observation).filter(Observation.is_estimate.is_(True)).order_by(Observation.year)
+                self.assertEqual(
+                    [(row.year, row.value, row.source) for row in stored],
+                    [(2016, 2.0, "fill_linear"), (2017, 3.0, "fill_linear")],
+                )
+
+            params = {"country": "KZ", "indicator": "SP.POP.TOTL"}
+            raw = self.client.get("/api/v1/observations", params=params).json()
+            filled = self.client.get("/api/v1/observations", params={**params, "fill": "linear"}).json()
+            self.assertEqual([row["year"] for row in raw], [2015, 2018])
+            self.assertEqual(
+                [(row["year"], row["is_estimate"]) for row in filled],
+                [(2015, False), (2016, True), (2017, True), (2018, False)],
+            )
+
+            # A measured value arriving later replaces the estimate for that year.
+            with patch("app.services.ingestion.fetch_indicator_series", return_value=[{"year": 2016, "value": 9.0}]):
+                with self.SessionLocal() as db:
+                    ingest_indicator(db, "KZ", "SP.POP.TOTL")
+            with self.SessionLocal() as db:
+                rows = db.query(Observation).order_by(Observation.year).all()
+                self.assertEqual(
+                    [(row.year, row.value, row.is_estimate) for row in rows],
+                    [(2015, 1.0, False), (2016, 9.0, False), (2017, 6.5, True), (2018, 4.0, False)],
+                )
+
+    def test_ingestion_flags_typos_and_unit_changes_as_anomalies(self):
+        years = range(2000, 2020)
+        steady = {year: 100.0 * 1.03 ** (year - 2000) * (1 + 0.002 * (-1) ** year) for year in years}
+        typo = {**steady, 2010: steady[2010] * 10}
+        rescaled = {year: value * (1000 if year >= 2015 else 1) for year, value in steady.items()}
+        self._seed_observations({("US", "NY.GDP.MKTP.CD"): steady, ("DE", "NY.GDP.MKTP.CD"): rescaled})
+        with patch(
+            "app.services.ingestion.fetch_indicator_series",
+            return_value=[{"year": year, "value": value} for year, value in typo.items()],
+        ):
+            with self.SessionLocal() as db:
+                ingest_indicator(db, "KZ", "NY.GDP.MKTP.CD")
+        after_ingest = self.client.get("/api/v1/observations/anomalies", params={"indicator": "NY.GDP.MKTP.CD"})
+        with self.SessionLocal() as db:
+            self.assertEqual(refresh_anomalies(db), 2)
+            db.commit()
+
+        response = self.client.get("/api/v1/observations/anomalies", params={"indicator": "NY.GDP.MKTP.CD"})
+        flagged = self.client.get(
+            "/api/v1/observations",
+            params={"country": "KZ", "indicator": "NY.GDP.MKTP.CD", "start_year": 2009, "flag_anomalies": True},
+        ).json()
+        plain = self.client.get("/api/v1/observations", params={"country": "KZ", "indicator": "NY.GDP.MKTP.CD"})
+
+        self.assertEqual([(item["country"], item["year"]) for item in after_ingest.json()], [("KZ", 2010)])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(item["country"], item["year"]) for item in response.json()], [("DE", 2015), ("KZ", 2010)])
+        self.assertGreater(response.json()[1]["rolling_score"], 5)
+        self.assertEqual([row["year"] for row in flagged if row["is_anomaly"]], [2010])
+        self.assertIsNone(plain.json()[0]["is_anomaly"])
+
+    def test_ingestion_precomputes_group_aggregates_served_as_pseudo_countries(self):
+        self._seed_observations(
+            {
+                ("KZ", "FP.CPI.TOTL.ZG"): {2019: 10.0, 2020: 20.0},
+                ("UZ", "FP.CPI.TOTL.ZG"): {2019: 30.0},
+                ("KZ", "SP.POP.TOTL"): {2019: 1.0, 2020: 1.0},
+                ("UZ", "SP.POP.TOTL"): {2019: 3.0},
+                ("TJ", "SP.POP.TOTL"): {2019: 1.0},
+            }
+        )
+        with patch(
+            "app.services.ingestion.fetch_indicator_series",
+            return_value=[{"year": 2019, "value": 2.0}, {"year": 2020, "value": 4.0}],
+        ):
+            with self.SessionLocal() as db:
+                ingest_indicator(db, "TJ", "FP.CPI.TOTL.ZG")
+
+        # CAS has five members: three report in 2019 and two in 2020, below the default coverage.
+        covered = self.client.get("/api/v1/observations", params={"country": "CAS", "indicator": "FP.CPI.TOTL.ZG"})
+        params = {"country": "CAS", "indicator": "FP.CPI.TOTL.ZG", "min_coverage": 0.4}
+        weighted = self.client.get("/api/v1/observations", params=params)
+        mean = self.client.get("/api/v1/observations", params={**params, "aggregate": "mean"}).json()
+        median = self.client.get("/api/v1/observations", params={**params, "aggregate": "median"}).json()
+        yoy = self.client.get("/api/v1/observations", params={**params, "transform": "yoy", "start_year": 2020}).json()
+        groups = self.client.get("/api/v1/country-groups").json()
+
+        self.assertEqual(weighted.headers["X-Data-Source"], "group_aggregate")
+        self.assertEqual([(row["year"], row["members"]) for row in covered.json()], [(2019, 3)])
+        # TJ has no 2020 population, so the 2020 weighted mean rests on KZ alone.
+        self.assertEqual(
+            [(row["year"], round(row["value"], 6), row["members"]) for row in weighted.json()],
+            [(2019, 20.4, 3), (2020, 20.0, 2)],
+        )
+        self.assertEqual([row["value"] for row in mean], [14.0, 12.0])
+        self.assertEqual([row["value"] for row in median], [10.0, 12.0])
+        self.assertEqual([(row["year"], round(row["value"], 6), row["members"]) for row in yoy], [(2020, -0.4, 2)])
+        self.assertIn(
+            {"code": "CAS", "name": "Central Asia", "type": "subregion", "members": ["KG", "KZ", "TJ", "TM", "UZ"]},
+            groups,
+        )
+
+    def test_derived_observations_evaluate_expression_over_panel_and_cache_by_data_version(self):
+        self._seed_observations(
+            {
+                ("KZ", "SI.DST.05TH.20"): {2018: 40.0, 2019: 42.0, 2020: 44.0},
+                ("KZ", "SI.DST.FRST.20"): {2018: 8.0, 2019: 7.0, 2020: 8.0},
+                ("US", "SI.DST.05TH.20"): {2019: 50.0},
+                ("US", "SI.DST.FRST.20"): {2019: 5.0},
+            }
+        )
+        params = {"expr": "[SI.DST.05TH.20] / [SI.DST.FRST.20]", "start_year": 2019}
+
+        first = self.client.get("/api/v1/observations/derived", params=params)
+        second = self.client.get("/api/v1/observations/derived", params=params)
+        growth = self.client.get(
+            "/api/v1/observations/derived",
+            params={"expr": "pct_change([SI.DST.05TH.20]) - diff([SI.DST.FRST.20])", "countries": "KZ"},
+        )
+
+        self.assertEqual(first.status_code, 200)
+        payload = first.json()
+        self.assertEqual(payload["indicators"], ["SI.DST.05TH.20", "SI.DST.FRST.20"])
+        self.assertEqual(
+            {item["country"]: [(p["year"], p["value"]) for p in item["points"]] for item in payload["series"]},
+            {"KZ": [(2019, 6.0), (2020, 5.5)], "US": [(2019, 10.0)]},
+        )
+        self.assertFalse(payload["cached"])
+        self.assertTrue(second.json()["cached"])
+        self.assertEqual(
+            [(p["year"], round(p["value"], 6)) for p in growth.json()["series"][0]["points"]],
+            [(2019, 6.0), (2020, round(100 * 2 / 42 - 1.0, 6))],
+        )
+
+        self._seed_observations({("DE", "SI.DST.05TH.20"): {2019: 45.0}, ("DE", "SI.DST.FRST.20"): {2019: 9.0}})
+        refreshed = self.client.get("/api/v1/observations/derived", params=params).json()
+        self.assertFalse(refreshed["cached"])
+        self.assertEqual([item["country"] for item in refreshed["series"]], ["DE", "KZ", "US"])
+
+    def test_derived_observations_reject_unsafe_or_invalid_expressions(self):
+        expressions = (
+            "__import__('os').system('id')",
+            "[SP.POP.TOTL].real",
+            "foo([SP.POP.TOTL])",
+            "rebase([SP.POP.TOTL])",
+            "2 + 3",
+            "[SP.POP.TOTL] * 1" + "0" * 330,
+        )
+        for expr in expressions:
+            response = self.client.get("/api/v1/observations/derived", params={"expr": expr})
+            self.assertEqual(response.status_code, 400, expr)
+
 
 class ForecastApiTests(FastApiBaseTestCase):
+    def test_schema_upgrade_adds_forecast_columns_to_existing_tables(self):
+        # Tables as created before fingerprints and quantiles were stored.
+        with self.engine.begin() as connection:
+            connection.execute(text("DROP TABLE forecast_points"))
+            connection.execute(text("DROP TABLE forecast_runs"))
+            connection.execute(
+                text(
+                    "CREATE TABLE forecast_runs (id INTEGER PRIMARY KEY, country_id INTEGER NOT NULL, "
+                    "target_indicator_id INTEGER NOT NULL, model_name VARCHAR(128) NOT NULL, "
+                    "horizon_years INTEGER NOT NULL, assumptions TEXT, metrics TEXT)"
+                )
+            )
+            connection.execute(
+                text(
+                    "CREATE TABLE forecast_points (id INTEGER PRIMARY KEY, run_id INTEGER NOT NULL, "
+                    "year INTEGER NOT NULL, value FLOAT NOT NULL, lower FLOAT, upper FLOAT)"
+                )
+            )
+            connection.execute(
+                text(
+                    "INSERT INTO forecast_runs (country_id, target_indicator_id, model_name, horizon_years) "
+                    "VALUES (1, 1, 'linear_trend', 2)"
+                )
+            )
+
+        added = upgrade_schema(self.engine)
+        again = upgrade_schema(self.engine)
+
+        self.assertIn("forecast_runs.fingerprint", added)
+        self.assertIn("forecast_runs.params_digest", added)
+        self.assertIn("forecast_points.quantiles", added)
+        self.assertEqual(again, [])
+        with self.SessionLocal() as db:
+            run = db.query(ForecastRun).one()
+            self.assertIsNone(run.fingerprint)
+            db.add(ForecastPoint(run_id=run.id, year=2025, value=1.0))
+            db.commit()
+            self.assertIsNone(db.query(ForecastPoint).one().quantiles)
+
     def test_create_forecast_uses_cached_run_when_available(self):
         fake_result = SimpleNamespace(
             run=SimpleNamespace(
@@ -321,6 +684,312 @@ class ForecastApiTests(FastApiBaseTestCase):
         self.assertEqual(response.status_code, 400)
         self.assertEqual(response.json()["detail"], "Not enough data to forecast")
 
+    def test_batch_forecast_matches_single_series_forecast(self):
+        self._seed_observations(
+            {
+                ("KZ", "FP.CPI.TOTL.ZG"): {2000 + idx: 5.0 + 0.4 * idx + (0.3 if idx % 3 else -0.2) for idx in range(14)},
+                ("US", "FP.CPI.TOTL.ZG"): {1995 + idx: 2.0 + 0.1 * idx + (40.0 if idx == 6 else 0.0) for idx in range(30)},
+                ("DE", "FP.CPI.TOTL.ZG"): {2020: 1.0, 2021: 2.0, 2022: 3.0},
+            }
+        )
+
+        response = self.client.post(
+            "/api/v1/forecast/batch",
+            json={"countries": ["kz", "US", "DE"], "indicators": ["FP.CPI.TOTL.ZG"], "horizon_years": 3},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual([row["country"] for row in payload["forecasts"]], ["KZ", "US"])
+        self.assertEqual(payload["skipped"], [
+            {"country": "DE", "indicator": "FP.CPI.TOTL.ZG", "reason": "Not enough data to forecast"}
+        ])
+
+        for batch in payload["forecasts"]:
+            single = self.client.post(
+                "/api/v1/forecast",
+                params={"country": batch["country"], "indicator": "FP.CPI.TOTL.ZG", "horizon_years": 3},
+            ).json()
+            self.assertEqual(batch["metrics"], single["metrics"])
+            for batch_point, single_point in zip(batch["points"], single["points"]):
+                self.assertEqual(batch_point["year"], single_point["year"])
+                self.assertAlmostEqual(batch_point["value"], single_point["value"], places=6)
+                self.assertAlmostEqual(batch_point["lower"], single_point["lower"], places=6)
+
+        with self.SessionLocal() as db:
+            # Single-series POSTs hit the runs stored by the batch (same fingerprint).
+            self.assertEqual(db.query(ForecastRun).count(), 2)
+            self.assertEqual(db.query(ForecastPoint).count(), 6)
+
+    def test_auto_forecast_picks_lowest_backtest_rmse(self):
+        series = {2000 + idx: 50.0 + 2.0 * idx + (1.5 if idx % 2 else -1.5) * (idx % 5) for idx in range(16)}
+        self._seed_observations({("KZ", "FP.CPI.TOTL.ZG"): series})
+
+        response = self.client.post(
+            "/api/v1/forecast",
+            params={"country": "KZ", "indicator": "FP.CPI.TOTL.ZG", "horizon_years": 4, "model": "auto"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertIn(payload["model_name"], FORECAST_MODELS)
+        self.assertEqual([point["year"] for point in payload["points"]], [2016, 2017, 2018, 2019])
+        ranked = payload["metrics"].split("auto_rmse: ")[1].split(", ")
+        self.assertEqual(len(ranked), len(FORECAST_MODELS))
+        self.assertEqual(ranked[0].split("=")[0], payload["model_name"])
+
+    def test_forecast_rejects_unknown_model(self):
+        response = self.client.post(
+            "/api/v1/forecast",
+            params={"country": "KZ", "indicator": "FP.CPI.TOTL.ZG", "model": "prophet"},
+        )
+
+        self.assertEqual(response.status_code, 422)
+
+    def test_batch_forecast_uses_requested_model(self):
+        series = {2000 + idx: 1.0 + 0.5 * idx + (0.2 if idx % 2 else 0.0) for idx in range(12)}
+        self._seed_observations({("KZ", "FP.CPI.TOTL.ZG"): series})
+
+        response = self.client.post(
+            "/api/v1/forecast/batch",
+            json={"countries": ["KZ"], "indicators": ["FP.CPI.TOTL.ZG"], "horizon_years": 2, "model": "holt"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        forecast = response.json()["forecasts"][0]
+        self.assertEqual(forecast["model_name"], "holt")
+        expected = compute_forecast(*sanitize_training_series(list(series), list(series.values())), 2, "holt")
+        self.assertEqual(forecast["metrics"], expected["metrics"])
+        self.assertEqual(forecast["points"], expected["points"])
+
+    def test_bootstrap_forecast_returns_stored_quantiles(self):
+        series = {2000 + idx: 10.0 + 0.7 * idx + (0.9 if idx % 3 else -1.1) for idx in range(15)}
+        self._seed_observations({("KZ", "FP.CPI.TOTL.ZG"): series})
+        params = {
+            "country": "KZ",
+            "indicator": "FP.CPI.TOTL.ZG",
+            "horizon_years": 3,
+            "interval": "bootstrap",
+            "quantiles": "0.9,0.1,0.5",
+            "paths": 500,
+        }
+
+        first = self.client.post("/api/v1/forecast", params=params)
+        second = self.client.post("/api/v1/forecast", params=params)
+        normal = self.client.post("/api/v1/forecast", params={**params, "interval": "normal", "quantiles": ""})
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json(), second.json())
+        for point in first.json()["points"]:
+            self.assertEqual(list(point["quantiles"]), ["0.1", "0.5", "0.9"])
+            self.assertLess(point["quantiles"]["0.1"], point["quantiles"]["0.9"])
+            self.assertLess(point["lower"], point["upper"])
+        self.assertIsNone(normal.json()["points"][0]["quantiles"])
+        with self.SessionLocal() as db:
+            self.assertEqual(db.query(ForecastRun).count(), 2)
+
+    def test_bootstrap_forecast_rejects_invalid_quantiles(self):
+        response = self.client.post(
+            "/api/v1/forecast",
+            params={"country": "KZ", "indicator": "FP.CPI.TOTL.ZG", "interval": "bootstrap", "quantiles": "0.5,1.5"},
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_panel_forecast_gives_short_series_a_shrunken_trend(self):
+        series = {
+            (code, "SI.POV.GINI"): {2000 + idx: base + slope * idx + (0.3 if idx % 2 else -0.3) for idx in range(12)}
+            for code, base, slope in (("US", 40.0, 0.5), ("DE", 30.0, 0.4), ("FR", 32.0, 0.6), ("IT", 35.0, 0.5))
+        }
+        series[("KZ", "SI.POV.GINI")] = {2015: 28.0, 2017: 27.0, 2019: 26.0}
+        self._seed_observations(series)
+
+        response = self.client.post(
+            "/api/v1/forecast",
+            params={"country": "KZ", "indicator": "SI.POV.GINI", "horizon_years": 2, "model": "panel"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual(payload["model_name"], "panel")
+        self.assertIn("group_countries=5", payload["metrics"])
+        self.assertEqual([point["year"] for point in payload["points"]], [2020, 2021])
+        step = payload["points"][1]["value"] - payload["points"][0]["value"]
+        # Own slope is -0.5/yr, the group's about +0.5/yr; the short series is pulled between them.
+        self.assertGreater(step, -0.5)
+        self.assertLess(step, 0.5)
+
+        batch = self.client.post(
+            "/api/v1/forecast/batch",
+            json={"countries": ["KZ", "US"], "indicators": ["SI.POV.GINI"], "horizon_years": 2, "model": "panel"},
+        ).json()
+        self.assertEqual([item["country"] for item in batch["forecasts"]], ["KZ", "US"])
+        self.assertEqual(batch["forecasts"][0]["points"], payload["points"])
+
+    def test_panel_forecast_rejects_bootstrap_intervals(self):
+        response = self.client.post(
+            "/api/v1/forecast",
+            params={"country": "KZ", "indicator": "SI.POV.GINI", "model": "panel", "interval": "bootstrap"},
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_arx_forecast_recovers_driver_effect_and_applies_scenario(self):
+        series = {}
+        for code, shift in (("KZ", 0.0), ("US", 1.0)):
+            driver = {2000 + idx: 2.0 + shift + np.sin(idx) + 0.1 * idx for idx in range(20)}
+            target = {2000: 5.0}
+            for year in range(2001, 2020):
+                target[year] = 1.0 + 0.5 * target[year - 1] + 2.0 * driver[year - 1]
+            series[(code, "NY.GDP.MKTP.KD.ZG")] = driver
+            series[(code, "FP.CPI.TOTL.ZG")] = target
+        self._seed_observations(series)
+        payload = {
+            "countries": ["KZ", "US"],
+            "indicators": ["FP.CPI.TOTL.ZG"],
+            "horizon_years": 2,
+            "model": "arx",
+            "drivers": ["NY.GDP.MKTP.KD.ZG"],
+        }
+
+        base = self.client.post("/api/v1/forecast/batch", json=payload)
+        shocked = self.client.post(
+            "/api/v1/forecast/batch", json={**payload, "scenario": {"NY.GDP.MKTP.KD.ZG": {"2020": 10.0}}}
+        )
+
+        self.assertEqual(base.status_code, 200)
+        forecasts = base.json()["forecasts"]
+        self.assertEqual([item["country"] for item in forecasts], ["KZ", "US"])
+        self.assertEqual(forecasts[0]["model_name"], "arx")
+        self.assertIn("NY.GDP.MKTP.KD.ZG_lag1=2.0000", forecasts[0]["metrics"])
+        self.assertIn("y_lag1=0.5000", forecasts[0]["metrics"])
+        target = series[("KZ", "FP.CPI.TOTL.ZG")]
+        driver = series[("KZ", "NY.GDP.MKTP.KD.ZG")]
+        self.assertAlmostEqual(
+            forecasts[0]["points"][0]["value"], 1.0 + 0.5 * target[2019] + 2.0 * driver[2019], places=4
+        )
+        # The 2020 driver override only reaches the target from 2021 on.
+        shocked_points = shocked.json()["forecasts"][0]["points"]
+        self.assertAlmostEqual(shocked_points[0]["value"], forecasts[0]["points"][0]["value"], places=6)
+        self.assertNotAlmostEqual(shocked_points[1]["value"], forecasts[0]["points"][1]["value"], places=2)
+
+        single = self.client.post(
+            "/api/v1/forecast",
+            params={
+                "country": "KZ",
+                "indicator": "FP.CPI.TOTL.ZG",
+                "horizon_years": 2,
+                "model": "arx",
+                "drivers": "NY.GDP.MKTP.KD.ZG",
+            },
+        )
+        self.assertEqual(single.json()["points"], forecasts[0]["points"])
+
+    def test_arx_forecast_requires_distinct_drivers(self):
+        missing = self.client.post(
+            "/api/v1/forecast", params={"country": "KZ", "indicator": "FP.CPI.TOTL.ZG", "model": "arx"}
+        )
+        same = self.client.post(
+            "/api/v1/forecast/batch",
+            json={"countries": ["KZ"], "indicators": ["FP.CPI.TOTL.ZG"], "model": "arx", "drivers": ["FP.CPI.TOTL.ZG"]},
+        )
+
+        self.assertEqual(missing.status_code, 400)
+        self.assertEqual(same.status_code, 400)
+
+    def test_create_forecast_reuses_run_with_identical_inputs(self):
+        series = {2000 + idx: 3.0 + 0.5 * idx for idx in range(10)}
+        self._seed_observations({("KZ", "FP.CPI.TOTL.ZG"): series})
+        params = {"country": "KZ", "indicator": "FP.CPI.TOTL.ZG", "horizon_years": 2}
+
+        first = self.client.post("/api/v1/forecast", params=params)
+        second = self.client.post("/api/v1/forecast", params=params)
+        other_horizon = self.client.post("/api/v1/forecast", params={**params, "horizon_years": 3})
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(len(other_horizon.json()["points"]), 3)
+        with self.SessionLocal() as db:
+            self.assertEqual(db.query(ForecastRun).count(), 2)
+
+        self._seed_observations({("KZ", "FP.CPI.TOTL.ZG"): {2010: 9.0}})
+        refreshed = self.client.post("/api/v1/forecast", params=params)
+
+        self.assertEqual(refreshed.json()["points"][0]["year"], 2011)
+        with self.SessionLocal() as db:
+            self.assertEqual(db.query(ForecastRun).count(), 3)
+
+    def test_compact_forecasts_keeps_latest_run_per_series(self):
+        series = {2000 + idx: 3.0 + 0.5 * idx for idx in range(10)}
+        self._seed_observations({("KZ", "FP.CPI.TOTL.ZG"): series})
+        params = {"country": "KZ", "indicator": "FP.CPI.TOTL.ZG", "horizon_years": 2}
+        self.client.post("/api/v1/forecast", params=params)
+        self._seed_observations({("KZ", "FP.CPI.TOTL.ZG"): {2010: 9.0}})
+        latest = self.client.post("/api/v1/forecast", params=params).json()
+
+        with self.SessionLocal() as db:
+            result = compact_forecast_runs(db, keep=1)
+
+        self.assertEqual(result, {"deleted_runs": 1, "deleted_points": 2})
+        response = self.client.get("/api/v1/forecast/latest", params={"country": "KZ", "indicator": "FP.CPI.TOTL.ZG"})
+        self.assertEqual(response.json()["points"], latest["points"])
+
+    def test_compact_forecasts_keeps_each_parameter_variant(self):
+        series = {2000 + idx: 3.0 + 0.5 * idx for idx in range(10)}
+        self._seed_observations({("KZ", "FP.CPI.TOTL.ZG"): series})
+        params = {"country": "KZ", "indicator": "FP.CPI.TOTL.ZG", "horizon_years": 2}
+        self.client.post("/api/v1/forecast", params=params)
+        self._seed_observations({("KZ", "FP.CPI.TOTL.ZG"): {2010: 9.0}})
+        self.client.post("/api/v1/forecast", params=params)
+        self.client.post("/api/v1/forecast", params={**params, "interval": "bootstrap", "paths": 200})
+
+        with self.SessionLocal() as db:
+            result = compact_forecast_runs(db, keep=1)
+            remaining = db.query(ForecastRun).order_by(ForecastRun.id).all()
+
+        self.assertEqual(result, {"deleted_runs": 1, "deleted_points": 2})
+        self.assertEqual([run.id for run in remaining], [2, 3])
+        self.assertEqual(len({run.params_digest for run in remaining}), 2)
+
+    def test_precompute_forecasts_covers_series_and_serves_default_requests(self):
+        self._seed_observations(
+            {
+                ("KZ", "FP.CPI.TOTL.ZG"): {2000 + idx: 3.0 + 0.5 * idx for idx in range(12)},
+                ("US", "NY.GDP.PCAP.CD"): {2000 + idx: 100.0 + 4.0 * idx for idx in range(10)},
+                ("DE", "FP.CPI.TOTL.ZG"): {2020: 1.0, 2021: 2.0},
+            }
+        )
+
+        with self.SessionLocal() as db:
+            job = precompute_forecasts(db)
+            self.assertEqual(job.status, "completed")
+            self.assertEqual((job.series_total, job.forecasted, job.created, job.skipped), (3, 2, 2, 1))
+            self.assertAlmostEqual(job.coverage, 2 / 3)
+            self.assertIsNotNone(job.duration_ms)
+
+        latest = self.client.get("/api/v1/forecast/latest", params={"country": "US", "indicator": "NY.GDP.PCAP.CD"})
+        self.assertEqual(latest.status_code, 200)
+        self.assertEqual(len(latest.json()["points"]), 5)
+        response = self.client.post("/api/v1/forecast", params={"country": "KZ", "indicator": "FP.CPI.TOTL.ZG"})
+        self.assertEqual(response.status_code, 200)
+
+        with self.SessionLocal() as db:
+            self.assertEqual(db.query(ForecastRun).count(), 2)
+            rerun = precompute_forecasts(db)
+            self.assertEqual((rerun.created, rerun.reused), (0, 2))
+
+    def test_precomputed_run_is_reused_for_a_winsorised_series(self):
+        noisy = [5.25, 4.74, 6.28, 5.21, 3.93, 5.72, 7.61, 6.89, 3.59, 2.47, 3.75, 5.08, 0.35, 4.56, 2.51]
+        self._seed_observations({("KZ", "FP.CPI.TOTL.ZG"): {2000 + idx: value for idx, value in enumerate(noisy)}})
+        years, values = sanitize_training_series(range(2000, 2015), noisy)
+        self.assertNotEqual(values, noisy)
+
+        with self.SessionLocal() as db:
+            self.assertEqual(precompute_forecasts(db).created, 1)
+            result = run_forecast(db, "KZ", "FP.CPI.TOTL.ZG", 5)
+            self.assertTrue(result.reused)
+            self.assertEqual(db.query(ForecastRun).count(), 1)
+
     def test_latest_forecast_returns_404_for_unknown_country_or_indicator(self):
         response = self.client.get(
             "/api/v1/forecast/latest",
@@ -372,6 +1041,150 @@ class ForecastApiTests(FastApiBaseTestCase):
         self.assertEqual(payload["points"][1]["year"], 2026)
 
 
+class ComputePoolTests(FastApiBaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(shutdown_executor)
+
+    def test_forecast_on_compute_pool_matches_in_process_result(self):
+        series = {2000 + idx: 4.0 + 0.3 * idx + (0.2 if idx % 2 else -0.2) for idx in range(14)}
+        self._seed_observations({("KZ", "FP.CPI.TOTL.ZG"): series})
+        params = {"country": "KZ", "indicator": "FP.CPI.TOTL.ZG", "horizon_years": 3, "model": "holt"}
+        years, values = sanitize_training_series(list(series), list(series.values()))
+        expected = compute_forecast(years, values, 3, "holt")
+
+        start_executor(workers=1, max_queue=2)
+        response = self.client.post("/api/v1/forecast", params=params)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["metrics"], expected["metrics"])
+        self.assertEqual(self.client.get("/api/v1/health/compute").json()["completed"], 1)
+
+    def test_saturated_pool_rejects_forecasts_with_retry_after(self):
+        executor = start_executor(workers=1, max_queue=1, retry_after=7)
+        busy = executor.submit_all(time.sleep, [(1.0,), (1.0,)])
+
+        stats = self.client.get("/api/v1/health/compute").json()
+        response = self.client.post(
+            "/api/v1/forecast", params={"country": "KZ", "indicator": "FP.CPI.TOTL.ZG", "model": "holt"}
+        )
+
+        self.assertEqual((stats["running"], stats["queue_depth"]), (1, 1))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers["Retry-After"], "7")
+        for future in busy:
+            future.result()
+        self.assertFalse(executor.saturated())
+
+    def test_saturated_pool_still_serves_stored_runs(self):
+        series = {2000 + idx: 4.0 + 0.3 * idx for idx in range(12)}
+        self._seed_observations({("KZ", "FP.CPI.TOTL.ZG"): series, ("US", "FP.CPI.TOTL.ZG"): series})
+        params = {"country": "KZ", "indicator": "FP.CPI.TOTL.ZG", "horizon_years": 2}
+        stored = self.client.post("/api/v1/forecast", params=params).json()
+
+        executor = start_executor(workers=1, max_queue=0, retry_after=7)
+        busy = executor.submit_all(time.sleep, [(1.0,)])
+        reused = self.client.post("/api/v1/forecast", params=params)
+        batch = self.client.post(
+            "/api/v1/forecast/batch", json={"countries": ["KZ"], "indicators": ["FP.CPI.TOTL.ZG"], "horizon_years": 2}
+        )
+        uncached = self.client.post("/api/v1/forecast", params={**params, "country": "US"})
+        for future in busy:
+            future.result()
+
+        self.assertEqual(reused.status_code, 200)
+        self.assertEqual(reused.json()["points"], stored["points"])
+        self.assertEqual(batch.status_code, 200)
+        self.assertEqual(uncached.status_code, 503)
+        self.assertEqual(uncached.headers["Retry-After"], "7")
+
+    def test_job_past_deadline_raises_timeout(self):
+        executor = start_executor(workers=1, max_queue=0)
+
+        with self.assertRaises(ComputeTimeout):
+            executor.map(time.sleep, [(0.5,)], timeout=0.05)
+        self.assertEqual(executor.stats()["timed_out"], 1)
+
+
+class ForecastingServiceTests(unittest.TestCase):
+    def test_rolling_origin_backtest_matches_refitting_each_origin(self):
+        years = [1990 + idx for idx in range(20) if idx not in (4, 9)]
+        values = [100.0 + 1.5 * idx + ((-1) ** idx) * (idx % 4) for idx in range(len(years))]
+
+        result = rolling_origin_backtest(values, years, max_horizon=2, min_train=5)
+
+        for horizon in (1, 2):
+            errors = []
+            for origin in range(5, len(values) - horizon + 1):
+                slope, intercept = np.polyfit(years[:origin], values[:origin], deg=1)
+                target = origin + horizon - 1
+                errors.append(values[target] - (slope * years[target] + intercept))
+            summary = result["horizons"][horizon - 1]
+            self.assertEqual(summary["points"], len(errors))
+            self.assertAlmostEqual(summary["mae"], float(np.mean(np.abs(errors))), places=8)
+            self.assertAlmostEqual(summary["rmse"], float(np.sqrt(np.mean(np.square(errors)))), places=8)
+        self.assertEqual(result["origins"], len(values) - 5)
+
+    def test_rolling_origin_backtest_returns_none_for_short_series(self):
+        self.assertIsNone(rolling_origin_backtest([1.0, 2.0, 3.0], [2000, 2001, 2002]))
+
+    def test_every_model_returns_horizon_points_with_intervals(self):
+        years = list(range(2000, 2015))
+        values = [10.0 + 0.8 * idx + 0.05 * idx * idx + (0.4 if idx % 3 else -0.6) for idx in range(15)]
+
+        for model_name in FORECAST_MODELS:
+            result = compute_forecast(years, values, 3, model_name)
+            self.assertEqual(result["model_name"], model_name)
+            self.assertEqual([point["year"] for point in result["points"]], [2015, 2016, 2017])
+            for point in result["points"]:
+                self.assertLessEqual(point["lower"], point["value"])
+                self.assertGreaterEqual(point["upper"], point["value"])
+
+    def test_bootstrap_intervals_match_normal_band_and_widen_for_step_models(self):
+        rng = np.random.default_rng(5)
+        years = list(range(1990, 2015))
+        values = (2.0 * np.arange(25) + rng.normal(0.0, 1.0, 25)).tolist()
+        options = IntervalOptions(method="bootstrap", quantiles=(0.5,), paths=20000)
+
+        normal = compute_forecast(years, values, 3, "linear_trend")
+        boot = compute_forecast(years, values, 3, "linear_trend", options)
+        for plain, sampled in zip(normal["points"], boot["points"]):
+            self.assertEqual(plain["value"], sampled["value"])
+            self.assertAlmostEqual(sampled["quantiles"]["0.5"], sampled["value"], delta=0.3)
+            self.assertAlmostEqual(sampled["upper"] - sampled["lower"], plain["upper"] - plain["lower"], delta=1.0)
+
+        drift = compute_forecast(years, values, 4, "drift", options)["points"]
+        widths = [point["upper"] - point["lower"] for point in drift]
+        self.assertEqual(widths, sorted(widths))
+
+    def test_pooled_trends_shrink_short_series_towards_group_slope(self):
+        years = np.arange(2000, 2016)
+        values = np.full((5, 16), np.nan)
+        for row, slope in enumerate((1.0, 1.2, 0.8, 1.1)):
+            values[row] = 5.0 + slope * np.arange(16) + np.where(np.arange(16) % 2, 0.4, -0.4)
+        values[4, [10, 13]] = [20.0, 17.0]
+
+        fit = fit_pooled_trends(years, values)
+
+        observed = ~np.isnan(values)
+        centred_x = np.where(observed, years - np.nanmean(np.where(observed, years, np.nan), axis=1)[:, None], 0.0)
+        centred_y = np.where(observed, values - np.nanmean(values, axis=1)[:, None], 0.0)
+        pooled = (centred_x * centred_y).sum() / (centred_x * centred_x).sum()
+        self.assertAlmostEqual(fit["pooled_slope"], pooled, places=10)
+        self.assertLess(fit["weight"][4], fit["weight"][0])
+        self.assertGreater(fit["slope"][4], -1.0)
+        self.assertIsNone(fit_pooled_trends(years, values[:2]))
+
+    def test_trend_models_extrapolate_exact_line(self):
+        years = list(range(2000, 2012))
+        values = [4.0 + 3.0 * idx for idx in range(12)]
+
+        for model_name in ("linear_trend", "holt", "ar", "drift"):
+            predictions = [point["value"] for point in compute_forecast(years, values, 2, model_name)["points"]]
+            self.assertAlmostEqual(predictions[0], 40.0, places=5, msg=model_name)
+            self.assertAlmostEqual(predictions[1], 43.0, places=5, msg=model_name)
+
+
 class AnalyticsAndInequalityTests(FastApiBaseTestCase):
     def test_chart_explain_returns_local_fallback_for_missing_openai_key(self):
         payload = {
@@ -407,6 +1220,92 @@ class AnalyticsAndInequalityTests(FastApiBaseTestCase):
         self.assertIn("Вопрос пользователя", data["answer"])
         self.assertIn("Причина", data["answer"])
 
+    def test_chart_explain_caches_provider_answers_by_question_and_data(self):
+        def payload(question, value=1.0):
+            return {
+                "question": question,
+                "language": "en",
+                "datasets": [
+                    {
+                        "indicator": "FP.CPI.TOTL.ZG",
+                        "series": [{"country": "KZ", "data": [{"year": 2022, "value": value}]}],
+                    }
+                ],
+            }
+
+        with patch("app.services.chart_explainer.CHART_EXPLAIN_PROVIDER", "openai"), patch(
+            "app.services.chart_explainer.OPENAI_API_KEY", "test-key"
+        ), patch("app.services.chart_explainer._openai_answer", return_value="Inflation is stable.") as provider, patch(
+            "app.services.explain_cache.CHART_EXPLAIN_CACHE_MAX_ENTRIES", 2
+        ):
+            first = self.client.post("/api/v1/analytics/chart/explain", json=payload("Explain the trend"))
+            repeat = self.client.post("/api/v1/analytics/chart/explain", json=payload("  explain   the TREND "))
+            self.assertEqual(provider.call_count, 1)
+            other_data = self.client.post("/api/v1/analytics/chart/explain", json=payload("Explain the trend", 2.0))
+            with patch("app.services.chart_explainer.OPENAI_MODEL", "gpt-other"):
+                other_model = self.client.post("/api/v1/analytics/chart/explain", json=payload("Explain the trend"))
+            # The first entry was least recently used when the third was stored, so it was evicted.
+            evicted = self.client.post("/api/v1/analytics/chart/explain", json=payload("Explain the trend"))
+
+        self.assertFalse(first.json()["cached"])
+        self.assertEqual(repeat.json(), {**first.json(), "cached": True})
+        self.assertFalse(other_data.json()["cached"])
+        self.assertFalse(other_model.json()["cached"])
+        self.assertFalse(evicted.json()["cached"])
+        self.assertEqual(provider.call_count, 4)
+
+    def test_chart_explain_stream_relays_provider_tokens_after_local_summary(self):
+        payload = {
+            "question": "Explain the trend",
+            "language": "en",
+            "datasets": [
+                {
+                    "indicator": "FP.CPI.TOTL.ZG",
+                    "series": [
+                        {"country": "KZ", "data": [{"year": 2022, "value": 1.0}, {"year": 2023, "value": 2.0}]}
+                    ],
+                }
+            ],
+        }
+        chunks = [{"choices": [{"delta": {"content": text}}]} for text in ["Inflation ", "doubled."]]
+        sse = "".join(f"data: {json.dumps(chunk)}\n\n" for chunk in chunks) + "data: [DONE]\n\n"
+        requests = []
+
+        def slow_openai(request):
+            requests.append(json.loads(request.content))
+            time.sleep(0.2)
+            return httpx.Response(200, text=sse, headers={"Content-Type": "text/event-stream"})
+
+        def events(response):
+            parsed = []
+            for block in response.text.strip().split("\n\n"):
+                fields = dict(line.split(": ", 1) for line in block.splitlines())
+                parsed.append((fields["event"], json.loads(fields["data"])))
+            return parsed
+
+        real_client = httpx.Client
+        with patch("app.services.chart_explainer.CHART_EXPLAIN_PROVIDER", "openai"), patch(
+            "app.services.chart_explainer.OPENAI_API_KEY", "test-key"
+        ), patch("app.services.chart_explainer.CHART_EXPLAIN_STREAM_FALLBACK_SECONDS", 0.05), patch(
+            "app.services.chart_explainer.SessionLocal", self.SessionLocal
+        ), patch(
+            "app.services.chart_explainer.httpx.Client",
+            lambda **kwargs: real_client(transport=httpx.MockTransport(slow_openai), **kwargs),
+        ):
+            first = self.client.post("/api/v1/analytics/chart/explain/stream", json=payload)
+            repeat = self.client.post("/api/v1/analytics/chart/explain/stream", json=payload)
+
+        self.assertEqual(first.headers["content-type"], "text/event-stream; charset=utf-8")
+        self.assertTrue(requests[0]["stream"])
+        self.assertEqual(len(requests), 1)
+        streamed = events(first)
+        self.assertEqual([name for name, _ in streamed], ["meta", "fallback", "token", "token", "done"])
+        self.assertIn("Explain the trend", streamed[1][1]["answer"])
+        self.assertIn("KZ", streamed[1][1]["answer"])
+        self.assertEqual([data["text"] for name, data in streamed if name == "token"], ["Inflation ", "doubled."])
+        self.assertEqual(streamed[-1][1]["answer"], "Inflation doubled.")
+        self.assertEqual(events(repeat), [("done", {**streamed[-1][1], "cached": True})])
+
     def test_chart_explain_rejects_too_many_countries_per_indicator(self):
         payload = {
             "question": "Explain",
@@ -471,6 +1370,33 @@ class AnalyticsAndInequalityTests(FastApiBaseTestCase):
         self.assertEqual(len(payload["points"]), 2)
         self.assertEqual(payload["points"][1]["yoy_change"], -2.0)
 
+    def test_gini_trends_bounds_years_in_query_and_fetches_misses_live(self):
+        self._seed_observations(
+            {
+                ("KZ", "SI.POV.GINI"): {2015: 27.0, 2017: 28.0, 2018: 27.5, 2022: 30.0},
+                ("US", "SI.POV.GINI"): {2010: 40.0},
+            }
+        )
+        live = [{"year": 2016, "value": 33.0}, {"year": 2017, "value": 32.0}, {"year": 2019, "value": 31.5}]
+
+        with patch("app.services.world_bank.fetch_indicator_series", return_value=live) as fetch:
+            response = self.client.get(
+                "/api/v1/inequality/gini/trends",
+                params={"countries": "KZ,DE,US", "start_year": 2016, "end_year": 2020},
+            )
+
+        self.assertEqual(response.status_code, 200)
+        kz, de, us = response.json()
+        self.assertEqual(
+            [(row["year"], row["value"], row["yoy_change"]) for row in kz["points"]],
+            [(2017, 28.0, None), (2018, 27.5, -0.5)],
+        )
+        self.assertEqual(kz["meta"]["source"], "cache_db")
+        self.assertEqual((us["points"], us["meta"]["source"]), ([], "cache_db"))
+        self.assertEqual(de["meta"]["source"], "world_bank_live")
+        self.assertEqual([row["yoy_change"] for row in de["points"]], [None, -1.0, -0.5])
+        fetch.assert_called_once_with("DE", "SI.POV.GINI")
+
     def test_gini_ranking_sorts_known_values_descending(self):
         with self.SessionLocal() as db:
             gini = Indicator(code="SI.POV.GINI", name="Gini Index", source="world_bank")
@@ -508,6 +1434,43 @@ class AnalyticsAndInequalityTests(FastApiBaseTestCase):
         self.assertEqual(payload[0]["country"], "US")
         self.assertEqual(payload[0]["value"], 41.0)
 
+    def test_gini_ranking_covers_all_stored_countries_without_a_list(self):
+        self._seed_observations(
+            {
+                ("KZ", "SI.POV.GINI"): {2020: 29.0, 2021: 31.0},
+                ("US", "SI.POV.GINI"): {2021: 41.0},
+                ("DE", "SI.POV.GINI"): {2019: 30.0},
+            }
+        )
+
+        with patch("app.services.world_bank.fetch_indicator_series") as fetch:
+            response = self.client.get("/api/v1/inequality/gini/ranking", params={"year": 2021})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(row["country"], row["value"]) for row in response.json()], [("US", 41.0), ("KZ", 31.0)])
+        fetch.assert_not_called()
+
+    def test_gini_ranking_fetches_only_misses_live_within_deadline(self):
+        self._seed_observations({("KZ", "SI.POV.GINI"): {2019: 28.0}, ("US", "SI.POV.GINI"): {2021: 41.0}})
+
+        def fake_fetch(country, indicator):
+            if country == "FR":
+                time.sleep(0.5)
+            return [{"year": 2021, "value": 33.0}]
+
+        with patch("app.services.world_bank.fetch_indicator_series", side_effect=fake_fetch) as fetch, patch(
+            "app.api.v1.inequality.WORLD_BANK_LIVE_DEADLINE_SECONDS", 0.1
+        ):
+            response = self.client.get(
+                "/api/v1/inequality/gini/ranking", params={"year": 2021, "countries": "kz,US,DE,FR"}
+            )
+
+        self.assertEqual(
+            [(row["country"], row["value"]) for row in response.json()],
+            [("US", 41.0), ("DE", 33.0), ("KZ", None), ("FR", None)],
+        )
+        self.assertEqual(sorted(call.args[0] for call in fetch.call_args_list), ["DE", "FR"])
+
     def test_correlation_returns_expected_overlap(self):
         with self.SessionLocal() as db:
             country = Country(code="KZ", name="Kazakhstan")
@@ -548,6 +1511,235 @@ class AnalyticsAndInequalityTests(FastApiBaseTestCase):
         self.assertEqual(payload["points"], 3)
         self.assertAlmostEqual(payload["correlation"], 1.0, places=6)
 
+    def test_correlation_fill_recovers_overlap_lost_to_gaps(self):
+        self._seed_observations(
+            {
+                ("KZ", "A.TEST"): {2018: 1.0, 2020: 3.0, 2022: 5.0},
+                ("KZ", "B.TEST"): {2018: 2.0, 2019: 4.0, 2021: 8.0, 2022: 10.0},
+            }
+        )
+        params = {"country": "KZ", "indicator_a": "A.TEST", "indicator_b": "B.TEST"}
+
+        raw = self.client.get("/api/v1/correlation", params=params).json()
+        filled = self.client.get("/api/v1/correlation", params={**params, "fill": "linear"}).json()
+
+        self.assertEqual((raw["points"], raw["correlation"]), (2, None))
+        self.assertEqual((filled["points"], filled["estimated_points"]), (5, 3))
+        self.assertAlmostEqual(filled["correlation"], 1.0, places=6)
+
+    def test_correlation_returns_fisher_and_bootstrap_intervals(self):
+        a = [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0, 9.0, 10.0]
+        b = [1.2, 1.9, 3.4, 3.8, 5.5, 5.7, 7.4, 7.9, 9.6, 9.8]
+        self._seed_observations(
+            {
+                ("KZ", "A.TEST"): {2010 + idx: value for idx, value in enumerate(a)},
+                ("KZ", "B.TEST"): {2010 + idx: value for idx, value in enumerate(b)},
+            }
+        )
+
+        response = self.client.get(
+            "/api/v1/correlation",
+            params={
+                "country": "KZ",
+                "indicator_a": "A.TEST",
+                "indicator_b": "B.TEST",
+                "confidence": 0.9,
+                "bootstrap": 2000,
+            },
+        )
+
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual(payload["confidence"], 0.9)
+        self.assertLess(payload["ci_low"], payload["correlation"])
+        self.assertGreater(payload["ci_high"], payload["correlation"])
+        self.assertLess(payload["p_value"], 0.001)
+        self.assertEqual(payload["bootstrap_resamples"], 2000)
+        self.assertLessEqual(payload["bootstrap_ci_low"], payload["bootstrap_ci_high"])
+        self.assertLessEqual(payload["bootstrap_ci_high"], 1.0)
+
+    def test_correlation_matrix_uses_pairwise_complete_overlap(self):
+        self._seed_observations(
+            {
+                ("KZ", "A.TEST"): {2018: 1.0, 2019: 2.0, 2020: 3.0, 2021: 4.0},
+                ("KZ", "B.TEST"): {2018: 2.0, 2019: 4.0, 2020: 6.0, 2021: 8.0},
+                ("KZ", "C.TEST"): {2019: 3.0, 2020: 2.0, 2021: 1.0},
+                ("US", "A.TEST"): {2018: 1.0, 2019: 2.0},
+            }
+        )
+
+        response = self.client.get(
+            "/api/v1/correlation/matrix",
+            params={"countries": "kz,US", "indicators": "A.TEST,B.TEST,C.TEST"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual([row["country"] for row in payload], ["KZ", "US"])
+        kz = payload[0]
+        self.assertEqual(kz["indicators"], ["A.TEST", "B.TEST", "C.TEST"])
+        self.assertAlmostEqual(kz["correlation"][0][1], 1.0, places=6)
+        self.assertAlmostEqual(kz["correlation"][0][2], -1.0, places=6)
+        self.assertEqual(kz["points"][0][1], 4)
+        self.assertEqual(kz["points"][1][2], 3)
+        self.assertIsNone(payload[1]["correlation"][0][1])
+
+    def test_correlation_matrix_requires_two_indicators(self):
+        response = self.client.get(
+            "/api/v1/correlation/matrix",
+            params={"countries": "KZ", "indicators": "A.TEST"},
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_cross_section_correlation_uses_nearest_year_within_tolerance(self):
+        self._seed_observations(
+            {
+                ("KZ", "A.TEST"): {2019: 1.0},
+                ("KZ", "B.TEST"): {2019: 10.0},
+                ("US", "A.TEST"): {2019: 2.0},
+                ("US", "B.TEST"): {2018: 20.0, 2021: 99.0},
+                ("DE", "A.TEST"): {2020: 3.0},
+                ("DE", "B.TEST"): {2019: 40.0},
+                ("FR", "A.TEST"): {2015: 4.0},
+                ("FR", "B.TEST"): {2019: 50.0},
+            }
+        )
+
+        response = self.client.get(
+            "/api/v1/correlation/cross-section",
+            params={
+                "indicator_a": "A.TEST",
+                "indicator_b": "B.TEST",
+                "year": 2019,
+                "tolerance": 1,
+                "include_points": True,
+            },
+        )
+
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual(payload["points"], 3)
+        self.assertAlmostEqual(payload["spearman"], 1.0, places=6)
+        self.assertGreater(payload["correlation"], 0.9)
+        by_country = {row["country"]: row for row in payload["scatter"]}
+        self.assertNotIn("FR", by_country)
+        self.assertEqual(by_country["US"]["y"], 20.0)
+        self.assertEqual(by_country["US"]["year_b"], 2018)
+        self.assertEqual(by_country["DE"]["year_a"], 2020)
+
+    def test_rolling_correlation_tracks_sign_change(self):
+        a = {year: float(year - 2000) for year in range(2000, 2010)}
+        b = {year: float(year - 2000) if year < 2005 else float(2015 - year) for year in range(2000, 2010)}
+        self._seed_observations({("KZ", "A.TEST"): a, ("KZ", "B.TEST"): b})
+
+        response = self.client.get(
+            "/api/v1/correlation/rolling",
+            params={"country": "KZ", "indicator_a": "A.TEST", "indicator_b": "B.TEST", "window": 4},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        points = response.json()["points"]
+        self.assertEqual(len(points), 7)
+        self.assertEqual((points[0]["start_year"], points[0]["end_year"]), (2000, 2003))
+        self.assertAlmostEqual(points[0]["correlation"], 1.0, places=6)
+        self.assertAlmostEqual(points[-1]["correlation"], -1.0, places=6)
+        self.assertEqual(points[-1]["points"], 4)
+
+    def test_lag_correlation_detects_leading_indicator(self):
+        values = [1.0, 4.0, 2.0, 8.0, 5.0, 7.0, 3.0, 9.0, 6.0, 2.0, 5.0, 1.0]
+        a = {2000 + idx: value for idx, value in enumerate(values)}
+        b = {2000 + idx + 2: value for idx, value in enumerate(values)}
+        self._seed_observations({("KZ", "A.TEST"): a, ("KZ", "B.TEST"): b})
+
+        response = self.client.get(
+            "/api/v1/correlation/lag",
+            params={"country": "KZ", "indicator_a": "A.TEST", "indicator_b": "B.TEST", "max_lag": 3},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual(payload["best_lag"], 2)
+        self.assertEqual([row["lag"] for row in payload["lags"]], [-3, -2, -1, 0, 1, 2, 3])
+        by_lag = {row["lag"]: row for row in payload["lags"]}
+        self.assertAlmostEqual(by_lag[2]["correlation"], 1.0, places=6)
+        self.assertEqual(by_lag[2]["points"], 12)
+
+    def test_movers_rank_change_with_nearest_year_tolerance_and_cache(self):
+        self._seed_observations(
+            {
+                ("KZ", "SL.UEM.TOTL.ZS"): {2015: 5.0, 2022: 4.0},
+                ("RU", "SL.UEM.TOTL.ZS"): {2016: 5.0, 2022: 9.0},
+                ("US", "SL.UEM.TOTL.ZS"): {2015: 4.0, 2021: 6.0},
+                ("DE", "SL.UEM.TOTL.ZS"): {2015: 0.0, 2022: 3.0},
+                ("FR", "SL.UEM.TOTL.ZS"): {2022: 9.0},
+            }
+        )
+        params = {"indicator": "SL.UEM.TOTL.ZS", "start_year": 2015, "end_year": 2022}
+
+        exact = self.client.get("/api/v1/movers", params=params)
+        tolerant = self.client.get("/api/v1/movers", params={**params, "tolerance": 1})
+        again = self.client.get("/api/v1/movers", params={**params, "tolerance": 1, "order": "asc", "limit": 2})
+        pct = self.client.get("/api/v1/movers", params={**params, "tolerance": 1, "metric": "pct"})
+        invalid = self.client.get("/api/v1/movers", params={**params, "end_year": 2015})
+
+        self.assertEqual(exact.status_code, 200)
+        self.assertEqual(
+            [(item["country"], item["change"]) for item in exact.json()["items"]], [("DE", 3.0), ("KZ", -1.0)]
+        )
+        payload = tolerant.json()
+        self.assertEqual([item["country"] for item in payload["items"]], ["RU", "DE", "US", "KZ"])
+        self.assertEqual((payload["items"][0]["source_start_year"], payload["ranked"]), (2016, 4))
+        self.assertFalse(payload["cached"])
+        self.assertTrue(again.json()["cached"])
+        self.assertEqual([item["country"] for item in again.json()["items"]], ["KZ", "US"])
+        self.assertEqual([item["country"] for item in pct.json()["items"]], ["RU", "US", "KZ"])
+        self.assertEqual(invalid.status_code, 400)
+
+    def test_similar_countries_rank_standardised_profiles_and_rebuild_on_new_data(self):
+        profiles = {"KZ": (10.0, 5.0), "RU": (11.0, 5.5), "US": (60.0, 3.0), "DE": (50.0, 3.5), "UZ": (2.0, 9.0)}
+        series = {}
+        for code, (gdp, unemployment) in profiles.items():
+            series[(code, "NY.GDP.PCAP.CD")] = {2019: gdp}
+            series[(code, "SL.UEM.TOTL.ZS")] = {2018: unemployment}
+        series[("FR", "NY.GDP.PCAP.CD")] = {2019: 40.0}
+        self._seed_observations(series)
+        with self.SessionLocal() as db:
+            refresh_snapshots(db)
+            db.commit()
+        params = {"indicators": "NY.GDP.PCAP.CD,SL.UEM.TOTL.ZS", "year": 2020, "k": 3}
+
+        first = self.client.get("/api/v1/countries/kz/similar", params=params)
+        repeat = self.client.get("/api/v1/countries/KZ/similar", params={**params, "metric": "cosine"})
+        missing = self.client.get("/api/v1/countries/FR/similar", params=params)
+
+        self.assertEqual(first.status_code, 200)
+        payload = first.json()
+        self.assertEqual((payload["country"], payload["values"], payload["candidates"]), ("KZ", [10.0, 5.0], 5))
+        self.assertEqual([item["country"] for item in payload["neighbours"]], ["RU", "DE", "UZ"])
+        self.assertFalse(payload["cached"])
+        self.assertTrue(repeat.json()["cached"])
+        self.assertEqual(repeat.json()["neighbours"][0]["country"], "RU")
+        self.assertEqual(missing.status_code, 404)
+
+        with patch("app.services.ingestion.fetch_indicator_series", return_value=[{"year": 2019, "value": 10.5}]):
+            with self.SessionLocal() as db:
+                ingest_indicator(db, "KG", "NY.GDP.PCAP.CD")
+            with patch(
+                "app.services.ingestion.fetch_indicator_series", return_value=[{"year": 2019, "value": 5.1}]
+            ):
+                with self.SessionLocal() as db:
+                    ingest_indicator(db, "KG", "SL.UEM.TOTL.ZS")
+        rebuilt = self.client.get("/api/v1/countries/KZ/similar", params=params).json()
+        self.assertFalse(rebuilt["cached"])
+        self.assertEqual(rebuilt["neighbours"][0]["country"], "KG")
+
+        with self.SessionLocal() as db:
+            refresh_snapshots(db)
+            db.commit()
+        after_rebuild = self.client.get("/api/v1/countries/KZ/similar", params=params).json()
+        self.assertFalse(after_rebuild["cached"])
+
     def test_lorenz_and_gini_return_cached_result(self):
         with self.SessionLocal() as db:
             country = Country(code="KZ", name="Kazakhstan")
@@ -29,6 +29,7 @@ export default [
         localStorage: "readonly",
         navigator: "readonly",
         fetch: "readonly",
+        TextDecoder: "readonly",
         IntersectionObserver: "readonly",
       },
     },
@@ -36,6 +36,13 @@ export const fetchGiniTrend = async (params) => {
   return res.data;
 };
 
+export const fetchGiniTrends = async ({ countries, start_year, end_year }) => {
+  const res = await fastapiClient.get("/inequality/gini/trends", {
+    params: { countries: countries.join(","), start_year, end_year },
+  });
+  return res.data;
+};
+
 export const fetchGiniRanking = async ({ year, countries }) => {
   const res = await fastapiClient.get("/inequality/gini/ranking", {
     params: { year, countries: countries.join(",") },
@@ -59,3 +66,52 @@ export const explainChart = async (payload) => {
   const res = await fastapiClient.post("/analytics/chart/explain", payload);
   return res.data;
 };
+
+/* Server-sent events from /analytics/chart/explain/stream. `onEvent(name, data)` receives
+   `meta`, `fallback`, `token` and `done` events as they arrive; resolves with the `done` payload. */
+export const explainChartStream = async (payload, onEvent, { signal } = {}) => {
+  const authorization = fastapiClient.defaults.headers.common.Authorization;
+  const res = await fetch(`${fastapiClient.defaults.baseURL}/analytics/chart/explain/stream`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+      Accept: "text/event-stream",
+      ...(authorization ? { Authorization: authorization } : {}),
+    },
+    body: JSON.stringify(payload),
+    signal,
+  });
+  if (!res.ok || !res.body) {
+    throw new Error(`Explain stream failed: ${res.status}`);
+  }
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  let result = null;
+  for (;;) {
+    const { value, done } = await reader.read();
+    buffer += decoder.decode(value, { stream: !done });
+    let boundary = buffer.indexOf("\n\n");
+    while (boundary >= 0) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf("\n\n");
+      let name = "message";
+      let data = "";
+      block.split("\n").forEach((line) => {
+        if (line.startsWith("event:")) name = line.slice(6).trim();
+        if (line.startsWith("data:")) data += line.slice(5).trim();
+      });
+      if (!data) continue;
+      const parsed = JSON.parse(data);
+      if (name === "done") result = parsed;
+      onEvent(name, parsed);
+    }
+    if (done) break;
+  }
+  if (!result) {
+    throw new Error("Explain stream ended without a result");
+  }
+  return result;
+};
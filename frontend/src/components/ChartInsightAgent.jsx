@@ -1,6 +1,6 @@
 import React, { useContext, useEffect, useMemo, useRef, useState } from "react";
 
-import { explainChart } from "../api/analyticsApi";
+import { explainChart, explainChartStream } from "../api/analyticsApi";
 import AuthContext from "../context/AuthContext";
 import { useI18n } from "../context/I18nContext";
 import { useUI } from "../context/UIContext";
@@ -38,6 +38,8 @@ export default function ChartInsightAgent({
       return;
     }
     setStatus({ loading: true, error: "" });
+    setAnswer("");
+    setMeta({ provider: "", model: "", warning: "" });
     try {
       const payload = {
         question: question.trim(),
@@ -56,7 +58,23 @@ export default function ChartInsightAgent({
           })),
         })),
       };
-      const response = await explainChart(payload);
+      let response;
+      try {
+        // Tokens are shown as they arrive; the local summary fills in while the provider starts.
+        let streamed = "";
+        response = await explainChartStream(payload, (event, data) => {
+          if (event === "meta") {
+            setMeta({ provider: data.provider || "", model: data.model || "", warning: "" });
+          } else if (event === "fallback" && !streamed) {
+            setAnswer(data.answer || "");
+          } else if (event === "token") {
+            streamed += data.text;
+            setAnswer(streamed);
+          }
+        });
+      } catch {
+        response = await explainChart(payload);
+      }
       setAnswer(response.answer || "");
       setMeta({
         provider: response.provider || "",
@@ -138,7 +156,7 @@ export default function ChartInsightAgent({
       </div>
 
       {/* Loading skeleton while AI is processing */}
-      {status.loading && (
+      {status.loading && !answer && (
         <div className="surface p-4 space-y-3" aria-busy="true" aria-label="Analyzing">
           <div className="skeleton skeleton-text w-32" />
           <div className="skeleton skeleton-text w-full" />
@@ -148,7 +166,7 @@ export default function ChartInsightAgent({
       )}
 
       {/* Answer panel with soft entrance */}
-      {answer && !status.loading && (
+      {answer && (
         <div className="surface p-4 space-y-2 ai-answer-enter">
           <p className="text-xs uppercase tracking-[0.2em] text-faint">{t("ai.explanationTitle")}</p>
           <p className="text-sm whitespace-pre-wrap">{answer}</p>
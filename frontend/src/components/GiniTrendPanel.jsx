@@ -1,6 +1,6 @@
 import React, { useMemo, useState } from "react";
 
-import { fetchGiniTrend } from "../api/analyticsApi";
+import { fetchGiniTrends } from "../api/analyticsApi";
 import { useI18n } from "../context/I18nContext";
 import ChartDisplay from "./ChartDisplay";
 
@@ -26,13 +26,12 @@ export default function GiniTrendPanel({ canAccess, countries, startYear, endYea
     }
     setStatus({ loading: true, error: "" });
     try {
-      const results = await Promise.all(
-        countries.map(async (country) => {
-          const payload = await fetchGiniTrend({ country, start_year: startYear, end_year: endYear });
-          const points = (payload.points || []).map((row) => ({ year: row.year, value: row.value }));
-          return { country, data: points, meta: payload.meta };
-        })
-      );
+      const payload = await fetchGiniTrends({ countries, start_year: startYear, end_year: endYear });
+      const results = payload.map((item) => ({
+        country: item.country,
+        data: (item.points || []).map((row) => ({ year: row.year, value: row.value })),
+        meta: item.meta,
+      }));
       setDatasets(results);
       setStatus({ loading: false, error: "" });
     } catch (err) {
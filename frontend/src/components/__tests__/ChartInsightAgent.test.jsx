@@ -5,9 +5,10 @@ import { beforeEach, describe, expect, it, vi } from "vitest";
 
 vi.mock("../../api/analyticsApi", () => ({
   explainChart: vi.fn(),
+  explainChartStream: vi.fn(),
 }));
 
-import { explainChart } from "../../api/analyticsApi";
+import { explainChart, explainChartStream } from "../../api/analyticsApi";
 import ChartInsightAgent from "../ChartInsightAgent";
 import { I18nProvider } from "../../context/I18nContext";
 import AuthContext from "../../context/AuthContext";
@@ -44,6 +45,7 @@ describe("ChartInsightAgent", () => {
   });
 
   it("sends chart payload with selected language and renders AI response", async () => {
+    explainChartStream.mockRejectedValue(new Error("stream unavailable"));
     explainChart.mockResolvedValue({
       answer: "Trend is mostly stable with moderate volatility.",
       provider: "local-fallback",
@@ -119,4 +121,40 @@ describe("ChartInsightAgent", () => {
     ).toBeInTheDocument();
     expect(explainChart).not.toHaveBeenCalled();
   });
+
+  it("renders streamed tokens and skips the blocking request", async () => {
+    explainChart.mockClear();
+    explainChartStream.mockImplementation(async (_payload, onEvent) => {
+      const done = {
+        answer: "Inflation doubled.",
+        provider: "openai",
+        model: "gpt-4o-mini",
+        warning: null,
+        cached: false,
+      };
+      onEvent("meta", { provider: "openai", model: "gpt-4o-mini" });
+      onEvent("token", { text: "Inflation " });
+      onEvent("token", { text: "doubled." });
+      onEvent("done", done);
+      return done;
+    });
+
+    renderAgent({
+      datasets: [
+        {
+          indicator: "FP.CPI.TOTL.ZG",
+          series: [{ country: "KZ", data: [{ year: 2022, value: 1 }, { year: 2023, value: 2 }] }],
+        },
+      ],
+      indicators: [{ code: "FP.CPI.TOTL.ZG", label: "Inflation (annual %)" }],
+      startYear: 2022,
+      endYear: 2023,
+    });
+
+    await userEvent.click(screen.getByRole("button", { name: /Explain chart/i }));
+
+    expect(await screen.findByText("Inflation doubled.")).toBeInTheDocument();
+    expect(screen.getByText(/Provider: openai/i)).toBeInTheDocument();
+    expect(explainChart).not.toHaveBeenCalled();
+  });
 });
@@ -8,7 +8,7 @@
  */
 import React, { useCallback, useContext, useMemo, useRef, useState } from "react";
 
-import { fetchGiniRanking, fetchGiniTrend } from "../api/analyticsApi";
+import { fetchGiniRanking, fetchGiniTrends } from "../api/analyticsApi";
 import ChartDisplay from "../components/ChartDisplay";
 import ChartInsightAgent from "../components/ChartInsightAgent";
 import CountryMultiSelect from "../components/CountryMultiSelect";
@@ -145,20 +145,20 @@ export default function AnalysisPage() {
     }
     setStatus({ loading: true, error: "" });
     try {
-      const results = await Promise.all(
-        ineqCountries.map(async (country) => {
-          const payload = await fetchGiniTrend({ country, start_year: startYear, end_year: endYear });
-          return {
-            country,
-            data: (payload.points || []).map((p) => ({
-              year: p.year,
-              value: p.value,
-              yoy_change: p.yoy_change,
-            })),
-            meta: payload.meta,
-          };
-        })
-      );
+      const payload = await fetchGiniTrends({
+        countries: ineqCountries,
+        start_year: startYear,
+        end_year: endYear,
+      });
+      const results = payload.map((item) => ({
+        country: item.country,
+        data: (item.points || []).map((p) => ({
+          year: p.year,
+          value: p.value,
+          yoy_change: p.yoy_change,
+        })),
+        meta: item.meta,
+      }));
       setDatasets(results);
 
       // Ranking for end year (non-blocking)